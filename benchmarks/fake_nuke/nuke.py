@@ -0,0 +1,132 @@
+"""Stand-in for the `nuke` module to benchmark nuketesting without a Nuke installation.
+
+Only the parts of the API that the benchmarks use are implemented.
+Nodes output a constant color inside their bounding box, so sampling costs almost nothing
+and the benchmarks measure the overhead of nuketesting itself.
+"""
+
+# ruff: noqa: INP001, N802
+
+from __future__ import annotations
+
+NUKE_VERSION_STRING = "0.0v0"
+
+_current_frame = 1
+
+
+def frame(value: int | None = None) -> int:
+    """Get or set the current frame."""
+    global _current_frame  # noqa: PLW0603
+    if value is not None:
+        _current_frame = value
+    return _current_frame
+
+
+def tprint(*args: object) -> None:
+    """Print to the terminal like Nuke does."""
+    print(*args)  # noqa: T201
+
+
+class Format:
+    """Image format with the origin at zero."""
+
+    def __init__(self, width: int, height: int):
+        self._width = width
+        self._height = height
+
+    def x(self) -> int:
+        return 0
+
+    def y(self) -> int:
+        return 0
+
+    def r(self) -> int:
+        return self._width
+
+    def t(self) -> int:
+        return self._height
+
+    def width(self) -> int:
+        return self._width
+
+    def height(self) -> int:
+        return self._height
+
+
+class BBox:
+    """Bounding box with position and size."""
+
+    def __init__(self, x: int, y: int, w: int, h: int):
+        self._values = (x, y, w, h)
+
+    def x(self) -> int:
+        return self._values[0]
+
+    def y(self) -> int:
+        return self._values[1]
+
+    def w(self) -> int:
+        return self._values[2]
+
+    def h(self) -> int:
+        return self._values[3]
+
+
+class Knob:
+    """Knob with a fixed value."""
+
+    def __init__(self, value: object):
+        self._value = value
+
+    def value(self) -> object:
+        return self._value
+
+    def toScript(self) -> str:
+        return str(self._value)
+
+
+class Node:
+    """Node that outputs a constant color over its whole format."""
+
+    def __init__(
+        self,
+        name: str,
+        color: tuple[float, float, float, float] = (0.5, 0.5, 0.5, 1.0),
+        width: int = 1920,
+        height: int = 1080,
+        knobs: dict[str, object] | None = None,
+    ):
+        self._name = name
+        self._color = dict(zip(("rgba.red", "rgba.green", "rgba.blue", "rgba.alpha"), color))
+        self._format = Format(width, height)
+        self._knobs = {name: Knob(value) for name, value in (knobs or {}).items()}
+
+    def Class(self) -> str:
+        return "Constant"
+
+    def name(self) -> str:
+        return self._name
+
+    def fullName(self) -> str:
+        return self._name
+
+    def knobs(self) -> dict[str, Knob]:
+        return self._knobs
+
+    def inputs(self) -> int:
+        return 0
+
+    def input(self, index: int) -> Node | None:
+        return None
+
+    def format(self) -> Format:
+        return self._format
+
+    def bbox(self) -> BBox:
+        return BBox(0, 0, self._format.width(), self._format.height())
+
+    def channels(self) -> list[str]:
+        return list(self._color)
+
+    def sample(self, channel: str, x: float, y: float, dx: float = 1, dy: float = 1, frame: int = 0) -> float:  # noqa: PLR0913
+        return self._color.get(channel, 0.0)
@@ -0,0 +1,28 @@
+"""Stand-in for the Nuke executable that runs scripts in terminal mode.
+
+Call it like Nuke: `python fake_nuke_executable.py -t script.py arguments...`.
+The fake `nuke` module is imported before the script runs, like Nuke does.
+"""
+
+# ruff: noqa: INP001
+
+from __future__ import annotations
+
+import runpy
+import sys
+from pathlib import Path
+
+
+def main() -> None:
+    """Run the script after the -t argument with the remaining arguments."""
+    arguments = sys.argv[1:]
+    script_index = arguments.index("-t") + 1
+    sys.path.insert(0, str(Path(__file__).parent / "fake_nuke"))
+    import nuke  # noqa: F401
+
+    sys.argv = arguments[script_index:]
+    runpy.run_path(arguments[script_index], run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Benchmarks for the overhead of nuketesting itself.
+
+The benchmarks run on any system without Nuke. A fake `nuke` module and a fake Nuke executable
+stand in for Nuke, so only the time spent in nuketesting, pytest and the bootstrap is measured.
+
+Every run appends its results with the current git revision to a JSON lines history file and
+compares them against the latest run of another revision:
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --fail-on-regression --threshold 0.3
+"""
+
+# ruff: noqa: INP001, T201
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+BENCHMARKS_FOLDER = Path(__file__).parent
+REPOSITORY_FOLDER = BENCHMARKS_FOLDER.parent
+sys.path.insert(0, str(BENCHMARKS_FOLDER / "fake_nuke"))
+sys.path.insert(1, str(REPOSITORY_FOLDER / "src"))
+
+import nuke
+
+from nuketesting.benchmark.measure import BenchmarkStatistics, find_regression, measure, summarize
+from nuketesting.image_checks.render_cache import DEFAULT_RENDER_CACHE
+from nuketesting.image_checks.sample_comparator import SampleComparator
+from nuketesting.runner.configuration import find_configuration, load_runners
+from nuketesting.runner.runner import Runner
+
+DEFAULT_HISTORY = REPOSITORY_FOLDER / ".benchmarks" / "self_benchmarks.jsonl"
+
+Benchmark = Callable[[], object]
+
+
+def create_fake_executable(directory: Path) -> Path:
+    """Create an executable that runs the fake Nuke executable with the current interpreter."""
+    executable = directory / "nuke"
+    executable.write_text(
+        f'#!/bin/sh\nexec "{sys.executable}" "{BENCHMARKS_FOLDER / "fake_nuke_executable.py"}" "$@"\n'
+    )
+    executable.chmod(0o755)
+    return executable
+
+
+def create_benchmarks(directory: Path) -> dict[str, tuple[Benchmark, int]]:
+    """Create all benchmarks with their files in the directory.
+
+    Returns:
+        The benchmark functions and their number of repeats by name.
+    """
+    executable = create_fake_executable(directory)
+
+    config = directory / "runners.json"
+    config.write_text(json.dumps({f"nuke{index}": {"exe": str(executable), "args": ["-x"]} for index in range(50)}))
+    nested_folder = directory.joinpath(*(f"level{index}" for index in range(20)))
+    nested_folder.mkdir(parents=True)
+
+    test_folder = directory / "tests"
+    test_folder.mkdir()
+    (test_folder / "test_pass.py").write_text("def test_pass():\n    assert True\n")
+    runner = Runner(executable, pytest_args=("-q", "-p", "no:cacheprovider"))
+
+    node_a = nuke.Node("A", width=2048, height=2048, knobs={"seed": 1})
+    node_b = nuke.Node("B", width=2048, height=2048, knobs={"seed": 2})
+    comparator = SampleComparator(use_fingerprint=False)
+
+    def compare() -> None:
+        DEFAULT_RENDER_CACHE.clear()
+        comparator.assert_equal(node_a, node_b)
+
+    return {
+        "runner_construction": (lambda: Runner(executable, ["-x", "-t", ""], ("-v",)), 200),
+        "load_runners": (lambda: load_runners(config), 50),
+        "find_configuration": (lambda: find_configuration(nested_folder), 200),
+        "argument_building": (lambda: runner._build_arguments(test_folder), 200),  # noqa: SLF001
+        "bootstrap_to_pytest": (lambda: runner.execute_tests(test_folder), 5),
+        "sample_comparator_2k": (compare, 5),
+    }
+
+
+def get_revision() -> str:
+    """Get the current git revision with a "-dirty" suffix for uncommitted changes."""
+
+    def git(*arguments: str) -> str:
+        return subprocess.check_output(["git", *arguments], cwd=REPOSITORY_FOLDER, text=True).strip()
+
+    try:
+        revision = git("rev-parse", "--short", "HEAD")
+        return f"{revision}-dirty" if git("status", "--porcelain", "--untracked-files=no") else revision
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_history(filepath: Path) -> list[dict]:
+    """Load all runs of the history file."""
+    if not filepath.exists():
+        return []
+    return [json.loads(line) for line in filepath.read_text().splitlines() if line.strip()]
+
+
+def run(filter_text: str = "") -> dict[str, BenchmarkStatistics]:
+    """Run all benchmarks with the filter text in their name."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="nuketesting_benchmarks_") as directory:
+        for name, (benchmark, repeats) in create_benchmarks(Path(directory)).items():
+            if filter_text not in name:
+                continue
+            results[name] = summarize(measure(benchmark, warmup=1, repeats=repeats))
+            print(f"{name:<28} median {results[name].median * 1000:>10.3f}ms  IQR {results[name].iqr * 1000:>9.3f}ms")
+    return results
+
+
+def main() -> int:
+    """Run the benchmarks, compare them to the previous revision and append them to the history."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY, help="JSON lines file with all runs.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown of the median.")
+    parser.add_argument("--filter", default="", help="Only run benchmarks with this text in their name.")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with 1 if a benchmark regressed.")
+    parser.add_argument("--no-save", action="store_true", help="Don't append the results to the history.")
+    arguments = parser.parse_args()
+
+    revision = get_revision()
+    results = run(arguments.filter)
+
+    previous = next(
+        (entry for entry in reversed(load_history(arguments.history)) if entry["revision"] != revision), None
+    )
+    regressions = []
+    if previous:
+        print(f"\nCompared to {previous['revision']}:")
+        for name, statistics in results.items():
+            if name not in previous["results"]:
+                continue
+            message = find_regression(
+                statistics, BenchmarkStatistics.from_dict(previous["results"][name]), arguments.threshold
+            )
+            print(f"{name:<28} {message or 'ok'}")
+            if message:
+                regressions.append(name)
+
+    if not arguments.no_save:
+        arguments.history.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "revision": revision,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": "{}.{}.{}".format(*sys.version_info[:3]),
+            "results": {name: statistics.to_dict() for name, statistics in results.items()},
+        }
+        with arguments.history.open("a") as history:
+            history.write(json.dumps(entry) + "\n")
+
+    return 1 if regressions and arguments.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,29 @@
 
 from __future__ import annotations
 
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Sequence
+
 import nuke
 
+from nuketesting.frames import at_frame
+
+
+def get_bbox(node: nuke.Node) -> list[int]:
+    """Get the bounding box of the node.
+
+    Args:
+        node: the node to read the bounding box from.
+
+    Returns:
+        Four values representing left, bottom, right and top of the bounding box.
+    """
+    bbox = node.bbox()
+    left = bbox.x()
+    bottom = bbox.y()
+    return [left, bottom, left + bbox.w(), bottom + bbox.h()]
+
 
 def assert_same_bbox(node_a: nuke.Node, node_b: nuke.Node) -> None:
     """Assert that both nodes have the same bounding box.
@@ -15,10 +36,8 @@ def assert_same_bbox(node_a: nuke.Node, node_b: nuke.Node) -> None:
     Raises:
         AssertionError: The bounding boxed do not match.
     """
-    bbox_a = node_a.bbox()
-    bbox_b = node_b.bbox()
-    values_a = [bbox_a.x(), bbox_a.y(), bbox_a.x() + bbox_a.w(), bbox_a.y() + bbox_a.h()]
-    values_b = [bbox_b.x(), bbox_b.y(), bbox_b.x() + bbox_b.w(), bbox_b.y() + bbox_b.h()]
+    values_a = get_bbox(node_a)
+    values_b = get_bbox(node_b)
 
     all_messages = __get_missmatching_information(values_a, values_b)
 
@@ -45,18 +64,16 @@ def __get_missmatching_information(values_a: list[int], values_b: list[int]) ->
     return all_messages
 
 
-def assert_bbox_shape(node: nuke.Node, shape: list[int] | nuke.Box | str) -> None:
-    """Assert that the node bbox matches the provided shape.
+def _parse_shape(shape: list[int] | nuke.Box | str) -> list[int]:
+    """Convert a bounding box shape into a list of values.
 
     Args:
-        node: The node to check.
         shape: A bounding box shape in the order [left, bottom, right, top]
             Strings are supported but need to follow the same ordering. Each value separated by a whitespace.
-    """
-    bbox_a = node.bbox()
-    values_a = [bbox_a.x(), bbox_a.y(), bbox_a.x() + bbox_a.w(), bbox_a.y() + bbox_a.h()]
-    values_b = []
 
+    Returns:
+        Four values representing left, bottom, right and top of the bounding box.
+    """
     required_value_count = 4
     if isinstance(shape, list):
         if len(shape) != required_value_count:
@@ -66,24 +83,36 @@ def assert_bbox_shape(node: nuke.Node, shape: list[int] | nuke.Box | str) -> Non
         if not all(isinstance(entry, int) for entry in shape):
             msg = f"Only list of ints supported, you provided: '{shape}'"
             raise TypeError(msg)
-        values_b = shape
+        return shape
 
-    elif isinstance(shape, nuke.Box):
-        values_b = [shape.x(), shape.y(), shape.r(), shape.t()]
+    if isinstance(shape, nuke.Box):
+        return [shape.x(), shape.y(), shape.r(), shape.t()]
 
-    elif isinstance(shape, str):
+    if isinstance(shape, str):
         split = shape.split(" ")
         if len(split) != required_value_count:
             msg = f"Expected four values for bounding box check, you provided {len(split)}."
             raise ValueError(msg)
         try:
-            values_b = [int(elem) for elem in split]
+            return [int(elem) for elem in split]
         except ValueError as e:
             msg = f"Expected string containing only numeric values. You provided '{shape}'"
             raise TypeError(msg) from e
-    else:
-        msg = f"The type '{type(shape)}' is not supported."
-        raise TypeError(msg)
+
+    msg = f"The type '{type(shape)}' is not supported."
+    raise TypeError(msg)
+
+
+def assert_bbox_shape(node: nuke.Node, shape: list[int] | nuke.Box | str) -> None:
+    """Assert that the node bbox matches the provided shape.
+
+    Args:
+        node: The node to check.
+        shape: A bounding box shape in the order [left, bottom, right, top]
+            Strings are supported but need to follow the same ordering. Each value separated by a whitespace.
+    """
+    values_a = get_bbox(node)
+    values_b = _parse_shape(shape)
 
     all_messages = __get_missmatching_information(values_a, values_b)
 
@@ -94,3 +123,138 @@ def assert_bbox_shape(node: nuke.Node, shape: list[int] | nuke.Box | str) -> Non
             f"The missmatches are: {' and '.join(all_messages)}"
         )
         raise AssertionError(msg)
+
+
+BBOX_SIZE = 4
+"""Number of values of a bounding box: left, bottom, right and top."""
+
+
+@dataclass(frozen=True)
+class BBoxTable:
+    """Bounding boxes of multiple nodes over multiple frames stored in a flat integer array.
+
+    The values are stored frame by frame. Each frame holds the left, bottom, right and top
+    values of all nodes in the order of `nodes`.
+    """
+
+    nodes: tuple[str, ...]
+    """Full names of the nodes."""
+    frames: tuple[int, ...]
+    """The evaluated frames."""
+    data: array
+    """Flat integer array of the size frames * nodes * 4."""
+
+    def get(self, node: str, frame: int) -> list[int]:
+        """Get the bounding box of a node at a frame.
+
+        Args:
+            node: full name of the node.
+            frame: one of the evaluated frames.
+
+        Returns:
+            Four values representing left, bottom, right and top of the bounding box.
+        """
+        offset = (self.frames.index(frame) * len(self.nodes) + self.nodes.index(node)) * BBOX_SIZE
+        return self.data[offset : offset + BBOX_SIZE].tolist()
+
+
+def collect_bboxes(nodes: Sequence[nuke.Node], frames: Iterable[int] | None = None) -> BBoxTable:
+    """Evaluate the bounding boxes of all nodes in one pass over the frames.
+
+    The frame is only changed once per frame and not once per node.
+
+    Args:
+        nodes: the nodes to evaluate.
+        frames: the frames to evaluate. Defaults to the current frame.
+
+    Returns:
+        The bounding boxes of all nodes at all frames.
+    """
+    frames = (nuke.frame(),) if frames is None else tuple(frames)
+    data = array("i")
+    with at_frame(frames[0] if frames else None):
+        for frame in frames:
+            nuke.frame(frame)
+            for node in nodes:
+                data.extend(get_bbox(node))
+    return BBoxTable(nodes=tuple(node.fullName() for node in nodes), frames=frames, data=data)
+
+
+def assert_same_bboxes(
+    nodes_a: Sequence[nuke.Node],
+    nodes_b: Sequence[nuke.Node],
+    frames: Iterable[int] | None = None,
+) -> None:
+    """Assert that pairs of nodes have the same bounding boxes at all frames.
+
+    In contrast to `assert_same_bbox`, all mismatches are collected and reported at once.
+
+    Args:
+        nodes_a: the first node of each pair.
+        nodes_b: the second node of each pair, in the same order as `nodes_a`.
+        frames: the frames to check. Defaults to the current frame.
+
+    Raises:
+        AssertionError: at least one pair of bounding boxes does not match.
+    """
+    if len(nodes_a) != len(nodes_b):
+        msg = f"Expected the same number of nodes, you provided {len(nodes_a)} and {len(nodes_b)}."
+        raise ValueError(msg)
+
+    table = collect_bboxes([*nodes_a, *nodes_b], frames)
+    pair_count = len(nodes_a)
+    all_messages = []
+    for frame_index, frame in enumerate(table.frames):
+        frame_offset = frame_index * 2 * pair_count
+        for pair, (node_a, node_b) in enumerate(zip(nodes_a, nodes_b)):
+            values_a = _get_values(table, frame_offset + pair)
+            values_b = _get_values(table, frame_offset + pair_count + pair)
+            mismatches = __get_missmatching_information(values_a, values_b)
+            if mismatches:
+                all_messages.append(
+                    f"Frame {frame}: node '{node_a.name()}' {values_a} and node '{node_b.name()}' {values_b} "
+                    f"have mismatches in their bbox: {' and '.join(mismatches)}"
+                )
+
+    if all_messages:
+        msg = f"{len(all_messages)} bounding boxes do not match:\n" + "\n".join(all_messages)
+        raise AssertionError(msg)
+
+
+def assert_bbox_shapes(
+    shapes: Mapping[nuke.Node, list[int] | nuke.Box | str],
+    frames: Iterable[int] | None = None,
+) -> None:
+    """Assert that the bounding boxes of all nodes match their shapes at all frames.
+
+    In contrast to `assert_bbox_shape`, all mismatches are collected and reported at once.
+
+    Args:
+        shapes: the expected shape of each node. See `assert_bbox_shape` for the supported shapes.
+        frames: the frames to check. Defaults to the current frame.
+
+    Raises:
+        AssertionError: at least one bounding box does not match its shape.
+    """
+    nodes = list(shapes)
+    expected = [_parse_shape(shapes[node]) for node in nodes]
+    table = collect_bboxes(nodes, frames)
+    all_messages = []
+    for frame_index, frame in enumerate(table.frames):
+        for index, (node, values_b) in enumerate(zip(nodes, expected)):
+            values_a = _get_values(table, frame_index * len(nodes) + index)
+            mismatches = __get_missmatching_information(values_a, values_b)
+            if mismatches:
+                all_messages.append(
+                    f"Frame {frame}: node '{node.name()}' BBox '{values_a}' != '{values_b}'. "
+                    f"The missmatches are: {' and '.join(mismatches)}"
+                )
+
+    if all_messages:
+        msg = f"{len(all_messages)} bounding boxes do not match the required shapes:\n" + "\n".join(all_messages)
+        raise AssertionError(msg)
+
+
+def _get_values(table: BBoxTable, position: int) -> list[int]:
+    """Get the bounding box at a position of the table, counted in bounding boxes."""
+    return table.data[position * BBOX_SIZE : (position + 1) * BBOX_SIZE].tolist()
@@ -0,0 +1,164 @@
+"""Module for comparing the bounding boxes of a whole script against a stored snapshot.
+
+A snapshot stores the bounding box of every image node of a script or group for some frames.
+Comparing against it reports all changed bounding boxes at once, which makes it easy to spot
+nodes whose bounding box grows unexpectedly and slows down renders.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from array import array
+from dataclasses import replace
+from pathlib import Path
+from typing import Iterable
+
+import nuke
+
+from nuketesting.bbox_checks.bbox_checker import BBOX_SIZE, BBoxTable, collect_bboxes
+from nuketesting.datamodel.constants import UPDATE_SNAPSHOTS_ENV
+
+
+def take_bbox_snapshot(group: nuke.Node | None = None, frames: Iterable[int] | None = None) -> BBoxTable:
+    """Collect the bounding boxes of all image nodes inside a group, including nested groups.
+
+    Args:
+        group: the group or gizmo to snapshot. Defaults to the root of the script.
+        frames: the frames to evaluate. Defaults to the current frame.
+
+    Returns:
+        The bounding boxes with node names relative to the group, sorted by name.
+    """
+    group = group or nuke.root()
+    nodes = nuke.allNodes(group=group, recurseGroups=True)
+    nodes = sorted((node for node in nodes if node.channels()), key=lambda node: node.fullName())
+    table = collect_bboxes(nodes, frames)
+
+    prefix = f"{group.fullName()}."
+    return replace(table, nodes=tuple(name[len(prefix) :] if name.startswith(prefix) else name for name in table.nodes))
+
+
+def save_bbox_snapshot(table: BBoxTable, filepath: Path) -> None:
+    """Store the bounding boxes as JSON file with one line per node.
+
+    Args:
+        table: the bounding boxes to store.
+        filepath: the file to write.
+    """
+    lines = [
+        f"{json.dumps(node)}: {json.dumps(_get_node_values(table, index))}" for index, node in enumerate(table.nodes)
+    ]
+    filepath.write_text(
+        '{\n"frames": ' + json.dumps(list(table.frames)) + ',\n"bboxes": {\n' + ",\n".join(lines) + "\n}\n}\n"
+    )
+
+
+def load_bbox_snapshot(filepath: Path) -> BBoxTable:
+    """Load bounding boxes that were stored with `save_bbox_snapshot`.
+
+    Args:
+        filepath: the file to read.
+    """
+    content = json.loads(filepath.read_text())
+    frames = tuple(content["frames"])
+    nodes = tuple(content["bboxes"])
+    data = array("i", bytes(len(frames) * len(nodes) * BBOX_SIZE * array("i").itemsize))
+    for node_index, node_values in enumerate(content["bboxes"].values()):
+        for frame_index, values in enumerate(node_values):
+            offset = (frame_index * len(nodes) + node_index) * BBOX_SIZE
+            data[offset : offset + BBOX_SIZE] = array("i", values)
+    return BBoxTable(nodes=nodes, frames=frames, data=data)
+
+
+def diff_bbox_snapshots(expected: BBoxTable, actual: BBoxTable) -> list[str]:
+    """Get messages about all differences between two snapshots.
+
+    Args:
+        expected: the stored snapshot.
+        actual: the current snapshot.
+
+    Returns:
+        One message per missing or new node and per changed bounding box. Empty if both snapshots are equal.
+    """
+    if expected.frames != actual.frames:
+        return [f"Frames {list(expected.frames)} != {list(actual.frames)}"]
+    if expected.nodes == actual.nodes and expected.data == actual.data:
+        return []
+
+    actual_index = {node: index for index, node in enumerate(actual.nodes)}
+    expected_names = set(expected.nodes)
+    messages = [f"Missing node '{node}'" for node in expected.nodes if node not in actual_index]
+    messages.extend(f"New node '{node}'" for node in actual.nodes if node not in expected_names)
+    for expected_position, node in enumerate(expected.nodes):
+        if node not in actual_index:
+            continue
+        expected_values = _get_node_values(expected, expected_position)
+        actual_values = _get_node_values(actual, actual_index[node])
+        messages.extend(
+            f"Frame {frame} '{node}': {before} -> {after}{_describe_growth(before, after)}"
+            for frame, before, after in zip(expected.frames, expected_values, actual_values)
+            if before != after
+        )
+    return messages
+
+
+def assert_bbox_snapshot(
+    filepath: Path | str,
+    group: nuke.Node | None = None,
+    frames: Iterable[int] | None = None,
+    update: bool | None = None,
+) -> None:
+    """Assert that the bounding boxes of all nodes match the snapshot file.
+
+    Args:
+        filepath: the snapshot file.
+        group: the group or gizmo to check. Defaults to the root of the script.
+        frames: the frames to check. Defaults to the frames of the snapshot or the current frame for new snapshots.
+        update: write the current bounding boxes into the snapshot instead of comparing them.
+            Defaults to the `NUKE_TESTING_UPDATE_SNAPSHOTS` environment variable.
+
+    Raises:
+        AssertionError: the snapshot does not exist or does not match the bounding boxes.
+    """
+    filepath = Path(filepath)
+    if update is None:
+        update = os.getenv(UPDATE_SNAPSHOTS_ENV) == "1"
+
+    if update:
+        save_bbox_snapshot(take_bbox_snapshot(group, frames), filepath)
+        return
+
+    if not filepath.exists():
+        msg = f"The snapshot '{filepath}' does not exist. Set {UPDATE_SNAPSHOTS_ENV}=1 to create it."
+        raise AssertionError(msg)
+
+    expected = load_bbox_snapshot(filepath)
+    actual = take_bbox_snapshot(group, expected.frames if frames is None else frames)
+    messages = diff_bbox_snapshots(expected, actual)
+    if messages:
+        msg = f"{len(messages)} differences to the snapshot '{filepath}':\n" + "\n".join(messages)
+        raise AssertionError(msg)
+
+
+def _get_node_values(table: BBoxTable, node_index: int) -> list[list[int]]:
+    """Get the bounding boxes of a node for all frames of the table."""
+    values = []
+    for frame_index in range(len(table.frames)):
+        offset = (frame_index * len(table.nodes) + node_index) * BBOX_SIZE
+        values.append(table.data[offset : offset + BBOX_SIZE].tolist())
+    return values
+
+
+def _describe_growth(before: list[int], after: list[int]) -> str:
+    """Describe how much the area of a bounding box changed.
+
+    Examples:
+        >>> _describe_growth([0, 0, 10, 10], [-5, -5, 15, 15])
+        ' (area x4.00)'
+    """
+    area_before = max(before[2] - before[0], 0) * max(before[3] - before[1], 0)
+    area_after = max(after[2] - after[0], 0) * max(after[3] - after[1], 0)
+    if not area_before:
+        return ""
+    return f" (area x{area_after / area_before:.2f})"
@@ -0,0 +1,119 @@
+"""Module for storing benchmark results per runner and Nuke version."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+
+from nuketesting.benchmark.measure import BenchmarkStatistics
+from nuketesting.datamodel.constants import RUNNER_NAME_ENV
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+LOCK_TIMEOUT = 30.0
+"""Seconds to wait for other processes that save the same baseline file."""
+
+
+def get_environment_key() -> str:
+    """Get the key that separates results of different runners and Nuke versions.
+
+    For example, tests of a runner named "nuke15" in Nuke 15.1v1 use the key "nuke15/15.1v1".
+
+    Returns:
+        The runner name and the Nuke version, or the python version if Nuke is not loaded.
+    """
+    runner_name = os.getenv(RUNNER_NAME_ENV) or "default"
+    nuke = sys.modules.get("nuke")
+    version = getattr(nuke, "NUKE_VERSION_STRING", None) or "python{}.{}".format(*sys.version_info[:2])
+    return f"{runner_name}/{version}"
+
+
+class BaselineStore:
+    """Benchmark statistics by environment key and test id, stored in a JSON file."""
+
+    def __init__(self, filepath: Path):
+        """Initialize the store.
+
+        Args:
+            filepath: the JSON file with the baselines. It is created on the first save.
+        """
+        self.filepath = filepath
+        self._data: dict[str, dict[str, dict]] = json.loads(filepath.read_text()) if filepath.exists() else {}
+        self._changes: dict[tuple[str, str], dict] = {}
+
+    def get(self, test_id: str, environment: str) -> BenchmarkStatistics | None:
+        """Get the baseline of a test.
+
+        Args:
+            test_id: the id of the benchmark, usually the pytest node id.
+            environment: the environment key, see `get_environment_key`.
+
+        Returns:
+            The stored statistics or None if there is no baseline.
+        """
+        data = self._data.get(environment, {}).get(test_id)
+        return BenchmarkStatistics.from_dict(data) if data else None
+
+    def set(self, test_id: str, environment: str, statistics: BenchmarkStatistics) -> None:
+        """Replace the baseline of a test. Call `save` to write the changes.
+
+        Args:
+            test_id: the id of the benchmark, usually the pytest node id.
+            environment: the environment key, see `get_environment_key`.
+            statistics: the new baseline.
+        """
+        self._data.setdefault(environment, {})[test_id] = statistics.to_dict()
+        self._changes[(environment, test_id)] = statistics.to_dict()
+
+    def save(self) -> None:
+        """Write the changed baselines into the file.
+
+        Other processes may have saved baselines into the same file since it was loaded, for example parallel
+        workers. The file is read again under a lock and only the baselines that were set here are replaced.
+        """
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock():
+            self._data = json.loads(self.filepath.read_text()) if self.filepath.exists() else {}
+            for (environment, test_id), data in self._changes.items():
+                self._data.setdefault(environment, {})[test_id] = data
+            temporary_file = self.filepath.with_name(f".{self.filepath.name}.{os.getpid()}.tmp")
+            temporary_file.write_text(json.dumps(self._data, indent=2, sort_keys=True))
+            temporary_file.replace(self.filepath)
+        self._changes.clear()
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        """Lock the baseline file against other processes with an exclusively created lock file.
+
+        Raises:
+            TimeoutError: another process holds the lock for longer than `LOCK_TIMEOUT`.
+        """
+        lock_file = self.filepath.with_name(f"{self.filepath.name}.lock")
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while not _create_exclusive(lock_file):
+            if time.monotonic() > deadline:
+                msg = f"The baseline file '{self.filepath}' is locked by '{lock_file}'."
+                raise TimeoutError(msg)
+            time.sleep(0.05)
+        try:
+            yield
+        finally:
+            lock_file.unlink()
+
+
+def _create_exclusive(filepath: Path) -> bool:
+    """Create the empty file if it doesn't exist yet.
+
+    Returns:
+        True if the file was created, False if it already existed.
+    """
+    with contextlib.suppress(FileExistsError):
+        os.close(os.open(filepath, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return True
+    return False
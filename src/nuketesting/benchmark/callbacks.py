@@ -0,0 +1,171 @@
+"""Module for timing the callbacks that run while creating and changing nodes.
+
+This module does not need Nuke, so recorded callbacks can be evaluated anywhere.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Iterator, TypeVar
+
+if TYPE_CHECKING:
+    from nuketesting.benchmark.measure import BenchmarkStatistics
+
+_Function = TypeVar("_Function", bound=Callable)
+
+
+@dataclass
+class CallbackTiming:
+    """Callback invocations that were triggered by changing a single knob."""
+
+    knob: str
+    """Name of the changed knob."""
+    durations: list[float] = field(default_factory=list)
+    """Duration of each callback invocation in seconds."""
+
+    @property
+    def calls(self) -> int:
+        """Number of callback invocations."""
+        return len(self.durations)
+
+    @property
+    def total(self) -> float:
+        """Duration of all callback invocations in seconds."""
+        return sum(self.durations)
+
+
+class CallbackRecorder:
+    """Records callback invocations and assigns them to the knob change that triggered them.
+
+    Examples:
+        >>> recorder = CallbackRecorder()
+        >>> callback = recorder.wrap(lambda: None)
+        >>> with recorder.trigger("size"):
+        ...     callback()
+        >>> recorder.timings["size"].calls
+        1
+    """
+
+    def __init__(self):
+        """Initialize the recorder without any recorded invocation."""
+        self.timings: dict[str, CallbackTiming] = {}
+        """Recorded invocations by the name of the changed knob."""
+        self._trigger: str | None = None
+
+    @contextmanager
+    def trigger(self, knob: str) -> Iterator[None]:
+        """Record all callback invocations of the context for the knob."""
+        self.timings.setdefault(knob, CallbackTiming(knob))
+        self._trigger = knob
+        try:
+            yield
+        finally:
+            self._trigger = None
+
+    def wrap(self, function: _Function) -> _Function:
+        """Get a function that calls the function and records its duration while a knob change is recorded."""
+
+        def timed(*args: object, **kwargs: object) -> object:
+            trigger = self._trigger
+            if trigger is None:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.timings[trigger].durations.append(time.perf_counter() - start)
+
+        return timed
+
+
+@dataclass
+class GizmoProfile:
+    """Creation time and callback costs of a gizmo or group.
+
+    The assertions fail the test with a descriptive message:
+
+        >>> profile.assert_creation_below(50)
+        >>> profile.assert_callback_calls_at_most(1, knob="size")
+    """
+
+    node_class: str
+    """Class of the profiled node."""
+    creation: BenchmarkStatistics
+    """Statistics of the durations for creating the node."""
+    callbacks: dict[str, CallbackTiming] = field(default_factory=dict)
+    """The callback invocations by the name of the changed knob."""
+
+    @property
+    def callback_calls(self) -> int:
+        """Number of callback invocations of all knob changes."""
+        return sum(timing.calls for timing in self.callbacks.values())
+
+    def _get_timings(self, knob: str | None) -> list[CallbackTiming]:
+        """Get the timings of the knob or of all knobs."""
+        if knob is None:
+            return list(self.callbacks.values())
+        if knob not in self.callbacks:
+            msg = f"The knob '{knob}' of {self.node_class} was not changed. Changed knobs: {', '.join(self.callbacks)}"
+            raise KeyError(msg)
+        return [self.callbacks[knob]]
+
+    def assert_creation_below(self, milliseconds: float) -> None:
+        """Assert that the median creation time is below the limit.
+
+        Raises:
+            AssertionError: the creation is too slow.
+        """
+        median = self.creation.median * 1000
+        if median >= milliseconds:
+            msg = f"Creating {self.node_class} takes {median:.2f} ms, which is not below {milliseconds} ms."
+            raise AssertionError(msg)
+
+    def assert_callback_calls_at_most(self, count: int, knob: str | None = None) -> None:
+        """Assert that changing a knob doesn't trigger more callback invocations than allowed.
+
+        Args:
+            count: the allowed number of invocations for a single knob change.
+            knob: the knob to check. Defaults to every changed knob.
+
+        Raises:
+            AssertionError: a knob change triggered too many invocations.
+        """
+        exceeded = [timing for timing in self._get_timings(knob) if timing.calls > count]
+        if exceeded:
+            msg = "Callbacks fire too often: " + ", ".join(
+                f"'{timing.knob}' triggers {timing.calls} calls (limit {count})" for timing in exceeded
+            )
+            raise AssertionError(msg)
+
+    def assert_callback_time_below(self, milliseconds: float, knob: str | None = None) -> None:
+        """Assert that the callbacks of a single knob change take less time than the limit.
+
+        Args:
+            milliseconds: the limit for all invocations of a single knob change.
+            knob: the knob to check. Defaults to every changed knob.
+
+        Raises:
+            AssertionError: the callbacks of a knob change are too slow.
+        """
+        exceeded = [timing for timing in self._get_timings(knob) if timing.total * 1000 >= milliseconds]
+        if exceeded:
+            msg = "Callbacks are too slow: " + ", ".join(
+                f"'{timing.knob}' takes {timing.total * 1000:.2f} ms (limit {milliseconds} ms)" for timing in exceeded
+            )
+            raise AssertionError(msg)
+
+    def format(self) -> str:
+        """Format the creation time and the callbacks of each changed knob as table."""
+        lines = [
+            f"{self.node_class}: creation median {self.creation.median * 1000:.2f} ms "
+            f"({self.creation.rounds} rounds), {self.callback_calls} callback calls",
+            f"{'knob':<30} {'calls':>6} {'total ms':>10}",
+        ]
+        lines.extend(
+            f"{timing.knob:<30} {timing.calls:>6} {timing.total * 1000:>10.2f}"
+            for timing in sorted(self.callbacks.values(), key=lambda timing: timing.total, reverse=True)
+            if timing.calls
+        )
+        return "\n".join(lines)
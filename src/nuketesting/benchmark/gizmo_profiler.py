@@ -0,0 +1,134 @@
+"""Module for profiling the creation of gizmos and groups and their knobChanged callbacks in Nuke."""
+
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Mapping
+
+import nuke
+
+from nuketesting.benchmark.callbacks import CallbackRecorder, GizmoProfile
+from nuketesting.benchmark.measure import summarize
+from nuketesting.datamodel.constants import UI_KNOBS
+
+
+def _get_changed_value(knob: nuke.Knob) -> object | None:
+    """Get a value that differs from the current value of the knob or None if the knob can't be changed."""
+    if isinstance(knob, nuke.Boolean_Knob):
+        return not knob.value()
+    if isinstance(knob, nuke.Enumeration_Knob):
+        values = knob.values()
+        return values[(int(knob.getValue()) + 1) % len(values)] if len(values) > 1 else None
+    if isinstance(knob, nuke.Array_Knob):
+        return knob.getValue() + 1
+    if isinstance(knob, nuke.String_Knob):
+        return f"{knob.value()}_changed"
+    return None
+
+
+@contextmanager
+def _callback_context(node: nuke.Node, knob: nuke.Knob) -> Iterator[None]:
+    """Let `nuke.thisNode`, `nuke.thisKnob` and `nuke.thisClass` return the changed node and knob."""
+    originals = {name: getattr(nuke, name) for name in ("thisNode", "thisKnob", "thisClass")}
+    nuke.thisNode = lambda: node
+    nuke.thisKnob = lambda: knob
+    nuke.thisClass = node.Class
+    try:
+        yield
+    finally:
+        for name, function in originals.items():
+            setattr(nuke, name, function)
+
+
+def run_knob_changed(node: nuke.Node, knob: nuke.Knob, recorder: CallbackRecorder) -> int:
+    """Run and time the knobChanged script of the node and the knobChanged callbacks registered for its class.
+
+    Nuke only runs these callbacks itself while the control panel of the node is open,
+    which never happens in terminal mode. So they are run explicitly for every knob change.
+    Like in Nuke, the knobChanged script runs in the namespace of `__main__`.
+
+    Args:
+        node: the changed node.
+        knob: the changed knob.
+        recorder: the recorder of the invocations.
+
+    Returns:
+        The number of invoked callbacks.
+    """
+    script = node["knobChanged"].value() if "knobChanged" in node.knobs() else ""
+    callbacks = [
+        (function, args, kwargs)
+        for node_class in (node.Class(), "*")
+        for function, args, kwargs, callback_node in nuke.callbacks.knobChangeds.get(node_class, [])
+        if callback_node is None or callback_node is node
+    ]
+    with _callback_context(node, knob):
+        if script:
+            recorder.wrap(exec)(script, sys.modules["__main__"].__dict__)
+        for function, args, kwargs in callbacks:
+            recorder.wrap(function)(*args, **kwargs)
+    return len(callbacks) + bool(script)
+
+
+def profile_gizmo(
+    create: str | Callable[[], nuke.Node],
+    repeats: int = 5,
+    warmup: int = 1,
+    knob_values: Mapping[str, object] | None = None,
+) -> GizmoProfile:
+    """Measure the creation time of a gizmo or group and the callbacks of each knob change.
+
+    The node is created repeatedly and deleted after each creation. The first creations are not measured,
+    as they load the gizmo file and its plugins. Afterward, each knob of a new node is changed in turn
+    while its knobChanged callbacks are timed and counted, see `run_knob_changed`. Knobs are restored
+    after each change.
+
+    Args:
+        create: the class of the node or a function that creates it, for example by pasting a group.
+        repeats: number of measured creations.
+        warmup: number of creations before measuring.
+        knob_values: the values to set by knob name. Defaults to a changed value for every knob
+            that is not a pure UI knob.
+
+    Returns:
+        The creation time and the callback invocations by knob name.
+    """
+    create_node = (lambda: nuke.createNode(create, inpanel=False)) if isinstance(create, str) else create
+
+    durations = []
+    for index in range(warmup + repeats):
+        start = time.perf_counter()
+        node = create_node()
+        duration = time.perf_counter() - start
+        if index >= warmup:
+            durations.append(duration)
+        nuke.delete(node)
+
+    node = create_node()
+    recorder = CallbackRecorder()
+    try:
+        values = knob_values if knob_values is not None else _get_default_values(node)
+        for name, value in values.items():
+            knob = node[name]
+            original = knob.toScript()
+            with recorder.trigger(name):
+                knob.setValue(value)
+                run_knob_changed(node, knob, recorder)
+            knob.fromScript(original)
+        return GizmoProfile(node.Class(), summarize(durations), recorder.timings)
+    finally:
+        nuke.delete(node)
+
+
+def _get_default_values(node: nuke.Node) -> dict[str, object]:
+    """Get a changed value for every knob of the node that is not a pure UI knob."""
+    values = {}
+    for name, knob in node.knobs().items():
+        if name in UI_KNOBS:
+            continue
+        value = _get_changed_value(knob)
+        if value is not None:
+            values[name] = value
+    return values
@@ -0,0 +1,142 @@
+"""Module for repeated time measurements and their robust statistics.
+
+This module does not need Nuke, so measurements can be evaluated anywhere.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Sequence
+
+
+@dataclass(frozen=True)
+class BenchmarkStatistics:
+    """Robust statistics of repeated time measurements in seconds."""
+
+    median: float
+    """The median duration."""
+    q1: float
+    """The first quartile of the durations."""
+    q3: float
+    """The third quartile of the durations."""
+    minimum: float
+    """The fastest duration."""
+    maximum: float
+    """The slowest duration."""
+    rounds: int
+    """Number of measurements."""
+
+    @property
+    def iqr(self) -> float:
+        """The interquartile range of the durations."""
+        return self.q3 - self.q1
+
+    def to_dict(self) -> dict:
+        """Convert the statistics into a JSON serializable dictionary."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> BenchmarkStatistics:
+        """Create statistics from a dictionary created by `to_dict`."""
+        return cls(**data)
+
+
+def percentile(sorted_samples: Sequence[float], fraction: float) -> float:
+    """Get a percentile of sorted samples with linear interpolation.
+
+    Examples:
+        >>> percentile([1.0, 2.0, 3.0, 4.0], 0.5)
+        2.5
+
+    Args:
+        sorted_samples: the samples in ascending order.
+        fraction: the percentile between zero and one.
+    """
+    position = (len(sorted_samples) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    weight = position - lower
+    return sorted_samples[lower] * (1 - weight) + sorted_samples[upper] * weight
+
+
+def summarize(samples: Sequence[float]) -> BenchmarkStatistics:
+    """Compute the statistics of measured durations.
+
+    Args:
+        samples: the measured durations in seconds. At least one is required.
+    """
+    ordered = sorted(samples)
+    return BenchmarkStatistics(
+        median=percentile(ordered, 0.5),
+        q1=percentile(ordered, 0.25),
+        q3=percentile(ordered, 0.75),
+        minimum=ordered[0],
+        maximum=ordered[-1],
+        rounds=len(ordered),
+    )
+
+
+def measure(
+    function: Callable[[], object],
+    warmup: int = 1,
+    repeats: int = 5,
+    setup: Callable[[], object] | None = None,
+) -> list[float]:
+    """Measure the duration of a function.
+
+    Args:
+        function: the function to measure.
+        warmup: number of calls before measuring. They fill caches and load plugins.
+        repeats: number of measured calls.
+        setup: function that is called before every call without being measured, for example to clear caches.
+
+    Returns:
+        The duration of each measured call in seconds.
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        function()
+
+    durations = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def find_regression(current: BenchmarkStatistics, baseline: BenchmarkStatistics, threshold: float) -> str | None:
+    """Check if the current measurement is slower than the baseline.
+
+    A measurement only counts as regression if the median is slower by more than the threshold
+    and the middle halves of both measurements do not overlap. This prevents noisy measurements
+    from failing the tests.
+
+    Examples:
+        >>> baseline = BenchmarkStatistics(1.0, 0.9, 1.1, 0.8, 1.2, 5)
+        >>> find_regression(BenchmarkStatistics(1.5, 1.4, 1.6, 1.3, 1.7, 5), baseline, threshold=0.2)
+        'Median 1.5000s is 50.0% slower than the baseline median 1.0000s (threshold 20%).'
+        >>> find_regression(BenchmarkStatistics(1.5, 1.0, 2.0, 0.9, 2.1, 5), baseline, threshold=0.2) is None
+        True
+
+    Args:
+        current: statistics of the current measurement.
+        baseline: statistics of the stored baseline.
+        threshold: allowed relative slowdown of the median, for example 0.2 for 20%.
+
+    Returns:
+        A message describing the regression or None if the performance is fine.
+    """
+    if baseline.median <= 0:
+        return None
+    slowdown = current.median / baseline.median - 1
+    if slowdown <= threshold or current.q1 <= baseline.q3:
+        return None
+    return (
+        f"Median {current.median:.4f}s is {slowdown:.1%} slower than the baseline median "
+        f"{baseline.median:.4f}s (threshold {threshold:.0%})."
+    )
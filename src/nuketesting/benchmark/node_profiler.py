@@ -0,0 +1,56 @@
+"""Module for reading the per node performance timers of Nuke."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator
+
+import nuke
+
+from nuketesting.benchmark.node_timings import NodeProfile, NodeTiming, top_nodes
+
+_PROFILES = {
+    "store": nuke.PROFILE_STORE,
+    "validate": nuke.PROFILE_VALIDATE,
+    "request": nuke.PROFILE_REQUEST,
+    "engine": nuke.PROFILE_ENGINE,
+}
+
+
+@contextmanager
+def performance_timers() -> Iterator[None]:
+    """Enable the performance timers of Nuke and reset them before entering."""
+    nuke.resetPerformanceTimers()
+    nuke.startPerformanceTimers()
+    try:
+        yield
+    finally:
+        nuke.stopPerformanceTimers()
+
+
+def read_node_timings() -> list[NodeTiming]:
+    """Read the performance timers of all nodes in the script including nodes in groups.
+
+    The timers need to be started with `performance_timers` before the nodes are computed.
+    """
+    timings = []
+    for node in nuke.allNodes(recurseGroups=True):
+        values = {category: node.performanceInfo(profile) for category, profile in _PROFILES.items()}
+        timings.append(
+            NodeTiming(
+                name=node.fullName(),
+                node_class=node.Class(),
+                calls=values["engine"]["callCount"],
+                **{category: info["timeTakenWall"] for category, info in values.items()},
+            ),
+        )
+    return timings
+
+
+def read_node_profile(count: int) -> NodeProfile:
+    """Read the slowest nodes of the script and the memory usage of Nuke.
+
+    Args:
+        count: maximum number of nodes.
+    """
+    return NodeProfile(nodes=top_nodes(read_node_timings(), count), memory_usage=int(nuke.memory("usage")))
@@ -0,0 +1,86 @@
+"""Module for ranking the per node performance timers of Nuke.
+
+This module does not need Nuke, so collected timings can be evaluated anywhere.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+PROFILE_CATEGORIES = ("store", "validate", "request", "engine")
+"""Categories of the performance timers of Nuke."""
+
+
+@dataclass(frozen=True)
+class NodeTiming:
+    """Performance timers of a single node in microseconds."""
+
+    name: str
+    """Full name of the node including its parent groups."""
+    node_class: str
+    """Class of the node."""
+    store: int = 0
+    """Wall time for storing the knob values."""
+    validate: int = 0
+    """Wall time for validating the output format and channels."""
+    request: int = 0
+    """Wall time for requesting the image regions from the inputs."""
+    engine: int = 0
+    """Wall time for computing the pixels."""
+    calls: int = 0
+    """Number of engine calls."""
+
+    @property
+    def total(self) -> int:
+        """Wall time of all categories."""
+        return self.store + self.validate + self.request + self.engine
+
+
+def top_nodes(timings: Iterable[NodeTiming], count: int) -> list[NodeTiming]:
+    """Get the nodes that took the most time, slowest first.
+
+    Nodes without any measured time are ignored.
+
+    Args:
+        timings: timings of all nodes.
+        count: maximum number of returned nodes.
+    """
+    return sorted((timing for timing in timings if timing.total), key=lambda timing: timing.total, reverse=True)[:count]
+
+
+def format_timings(timings: Iterable[NodeTiming]) -> str:
+    """Format the timings as table with one line per node and times in milliseconds."""
+    lines = ["{:<40} {:<16} {:>10} {:>10} {:>10} {:>10} {:>8}".format("node", "class", *PROFILE_CATEGORIES, "calls")]
+    lines.extend(
+        f"{timing.name:<40} {timing.node_class:<16} {timing.store / 1000:>10.2f} {timing.validate / 1000:>10.2f} "
+        f"{timing.request / 1000:>10.2f} {timing.engine / 1000:>10.2f} {timing.calls:>8}"
+        for timing in timings
+    )
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class NodeProfile:
+    """The slowest nodes of a test."""
+
+    nodes: list[NodeTiming]
+    """Timings of the slowest nodes, slowest first."""
+    memory_usage: int = 0
+    """Memory used by Nuke after the test in bytes. Nuke only reports it for the whole process."""
+
+
+def save_profiles(profiles: dict[str, NodeProfile], filepath: Path) -> None:
+    """Store the node profiles of multiple tests as JSON file.
+
+    Args:
+        profiles: the profiles by test id.
+        filepath: the file to write.
+    """
+    content = {test_id: asdict(profile) for test_id, profile in profiles.items()}
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    filepath.write_text(json.dumps(content, indent=2))
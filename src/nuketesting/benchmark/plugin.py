@@ -0,0 +1,342 @@
+"""Pytest plugin that provides the `nuke_benchmark`, `nuke_gizmo_profiler` and `nuke_script_profiler` fixtures.
+
+The `nuke_benchmark` fixture measures the render time of nodes or the duration of functions and compares
+it against a stored baseline of the same runner and Nuke version:
+
+    def test_blur_performance(nuke_benchmark):
+        blur = nuke.nodes.Blur(inputs=[nuke.nodes.CheckerBoard2()], size=100)
+        nuke_benchmark(blur, frames=range(1, 11))
+
+The `nuke_gizmo_profiler` fixture measures the creation of gizmos and the knobChanged callbacks of each knob:
+
+    def test_gizmo_performance(nuke_gizmo_profiler):
+        profile = nuke_gizmo_profiler("MyGizmo")
+        profile.assert_creation_below(50)
+        profile.assert_callback_calls_at_most(1)
+
+The `nuke_script_profiler` fixture measures the load time, memory and first render time of scripts:
+
+    def test_template_performance(nuke_script_profiler):
+        profile = nuke_script_profiler("templates/comp.nk")
+        profile.assert_memory_below(200)
+
+Run the tests with `--benchmark-update` to store the current measurements as new baseline.
+Run the tests with `--node-profile` to find the slowest nodes of each test with the performance timers of Nuke.
+"""
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Mapping
+
+import pytest
+
+from nuketesting.benchmark.baseline import BaselineStore, get_environment_key
+from nuketesting.benchmark.measure import BenchmarkStatistics, find_regression, measure, summarize
+from nuketesting.benchmark.node_timings import NodeProfile, format_timings, save_profiles
+
+if TYPE_CHECKING:
+    import nuke
+    from _pytest.terminal import TerminalReporter
+
+    from nuketesting.benchmark.callbacks import GizmoProfile
+    from nuketesting.benchmark.script_load import ScriptProfile
+
+
+@dataclass
+class BenchmarkSession:
+    """Settings and results of all benchmarks in a test session."""
+
+    store: BaselineStore
+    """Stored baselines of all runners."""
+    environment: str
+    """The environment key of this session."""
+    update: bool = False
+    """Store the measurements as new baselines instead of comparing them."""
+    threshold: float = 0.2
+    """Allowed relative slowdown of the median."""
+    warmup: int = 1
+    """Number of calls before measuring."""
+    repeats: int = 5
+    """Number of measured calls."""
+    results: dict[str, tuple[BenchmarkStatistics, BenchmarkStatistics | None]] = field(default_factory=dict)
+    """Measured statistics and baseline statistics by benchmark id."""
+    node_profile_count: int = 0
+    """Number of the slowest nodes to report for every test. Zero disables the node profiling."""
+    node_profile_file: Path | None = None
+    """JSON file for the node profiles of all tests."""
+    node_profiles: dict[str, NodeProfile] = field(default_factory=dict)
+    """The node profiles by test id."""
+
+    def evaluate(self, benchmark_id: str, statistics: BenchmarkStatistics) -> str | None:
+        """Compare a measurement with its baseline or store it as new baseline.
+
+        Args:
+            benchmark_id: the id of the benchmark.
+            statistics: the measured statistics.
+
+        Returns:
+            A message describing the regression or None if the performance is fine.
+        """
+        baseline = self.store.get(benchmark_id, self.environment)
+        self.results[benchmark_id] = (statistics, baseline)
+        if self.update:
+            self.store.set(benchmark_id, self.environment, statistics)
+            return None
+        if baseline is None:
+            return None
+        return find_regression(statistics, baseline, self.threshold)
+
+
+BENCHMARK_SESSION = pytest.StashKey[BenchmarkSession]()
+
+
+class NukeBenchmark:
+    """Callable that measures nodes or functions and fails the test on performance regressions."""
+
+    def __init__(self, test_id: str, session: BenchmarkSession):
+        """Initialize the benchmark of a test.
+
+        Args:
+            test_id: the node id of the test.
+            session: the benchmark session with settings and baselines.
+        """
+        self._test_id = test_id
+        self._session = session
+        self._calls = 0
+
+    def __call__(
+        self, target: nuke.Node | Callable[[], object], frames: Iterable[int] | None = None
+    ) -> BenchmarkStatistics:
+        """Measure the target and compare it against the baseline.
+
+        Nodes are rendered through a temporary Write node and the RAM cache of Nuke is
+        cleared before every render. Functions are called without arguments.
+
+        Args:
+            target: the node to render or the function to call.
+            frames: the frames to render. Only used for nodes. Defaults to the current frame.
+
+        Returns:
+            The statistics of the measurement.
+        """
+        self._calls += 1
+        benchmark_id = self._test_id if self._calls == 1 else f"{self._test_id}#{self._calls}"
+        statistics = summarize(self._measure(target, frames))
+        message = self._session.evaluate(benchmark_id, statistics)
+        if message:
+            pytest.fail(f"Benchmark '{benchmark_id}' regressed: {message}")
+        return statistics
+
+    def _measure(self, target: nuke.Node | Callable[[], object], frames: Iterable[int] | None) -> list[float]:
+        """Measure the durations of the target."""
+        nuke = sys.modules.get("nuke")
+        if nuke is None or not isinstance(target, nuke.Node):
+            return measure(target, self._session.warmup, self._session.repeats)
+
+        from nuketesting.benchmark.render import clear_caches, render_function
+
+        with render_function(target, frames) as render:
+            return measure(render, self._session.warmup, self._session.repeats, setup=clear_caches)
+
+
+class NukeGizmoProfiler:
+    """Callable that profiles the creation and the callbacks of gizmos and fails the test on creation regressions."""
+
+    def __init__(self, test_id: str, session: BenchmarkSession):
+        """Initialize the gizmo profiler of a test.
+
+        Args:
+            test_id: the node id of the test.
+            session: the benchmark session with settings and baselines.
+        """
+        self._test_id = test_id
+        self._session = session
+
+    def __call__(
+        self,
+        create: str | Callable[[], nuke.Node],
+        knob_values: Mapping[str, object] | None = None,
+    ) -> GizmoProfile:
+        """Profile the gizmo and compare its creation time against the baseline.
+
+        Args:
+            create: the class of the node or a function that creates it, for example by pasting a group.
+            knob_values: the values to set by knob name. Defaults to a changed value for every knob.
+
+        Returns:
+            The profile with assertions for the creation time and the callbacks.
+        """
+        from nuketesting.benchmark.gizmo_profiler import profile_gizmo
+
+        profile = profile_gizmo(create, self._session.repeats, self._session.warmup, knob_values)
+        benchmark_id = f"{self._test_id}[create {profile.node_class}]"
+        message = self._session.evaluate(benchmark_id, profile.creation)
+        if message:
+            pytest.fail(f"Creating {profile.node_class} regressed: {message}")
+        return profile
+
+
+class NukeScriptProfiler:
+    """Callable that profiles the loading of scripts and fails the test on load or render regressions."""
+
+    def __init__(self, test_id: str, session: BenchmarkSession):
+        """Initialize the script profiler of a test.
+
+        Args:
+            test_id: the node id of the test.
+            session: the benchmark session with settings and baselines.
+        """
+        self._test_id = test_id
+        self._session = session
+
+    def __call__(self, path: Path | str, render: bool = True) -> ScriptProfile:
+        """Profile the script and compare its load time and first render time against the baselines.
+
+        Args:
+            path: the script to load.
+            render: measure the first render of the Write nodes.
+
+        Returns:
+            The profile with assertions for the load time, the node count, the memory and the first render.
+        """
+        from nuketesting.benchmark.script_profiler import profile_script
+
+        profile = profile_script(path, self._session.repeats, self._session.warmup, render)
+        name = Path(path).name
+        messages = [self._session.evaluate(f"{self._test_id}[load {name}]", profile.load)]
+        if profile.first_render:
+            messages.append(self._session.evaluate(f"{self._test_id}[first render {name}]", profile.first_render))
+        regressions = [message for message in messages if message]
+        if regressions:
+            pytest.fail(f"Script '{path}' regressed: {' '.join(regressions)}")
+        return profile
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the options of the benchmarks."""
+    group = parser.getgroup("nuke_benchmark", "Nuke benchmarks")
+    group.addoption(
+        "--benchmark-baseline",
+        default=None,
+        help="JSON file with the benchmark baselines. Defaults to '.benchmarks/baseline.json' in the rootdir.",
+    )
+    group.addoption(
+        "--benchmark-update",
+        action="store_true",
+        help="Store the measurements as new baselines instead of comparing them.",
+    )
+    group.addoption(
+        "--benchmark-threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative slowdown of the median before a benchmark fails. Defaults to 0.2.",
+    )
+    group.addoption("--benchmark-warmup", type=int, default=1, help="Number of calls before measuring.")
+    group.addoption("--benchmark-repeats", type=int, default=5, help="Number of measured calls.")
+    group.addoption(
+        "--node-profile",
+        action="store_true",
+        help="Enable the performance timers of Nuke and report the slowest nodes of each test.",
+    )
+    group.addoption(
+        "--node-profile-top",
+        type=int,
+        default=10,
+        help="Number of the slowest nodes to report per test. Defaults to 10.",
+    )
+    group.addoption(
+        "--node-profile-file",
+        default=None,
+        help="JSON file for the node profiles. Defaults to '.benchmarks/node_profile.json' in the rootdir.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Create the benchmark session."""
+    baseline = config.getoption("--benchmark-baseline")
+    filepath = Path(baseline) if baseline else config.rootpath / ".benchmarks" / "baseline.json"
+    node_profile_file = config.getoption("--node-profile-file")
+    config.stash[BENCHMARK_SESSION] = BenchmarkSession(
+        store=BaselineStore(filepath),
+        environment=get_environment_key(),
+        update=config.getoption("--benchmark-update"),
+        threshold=config.getoption("--benchmark-threshold"),
+        warmup=config.getoption("--benchmark-warmup"),
+        repeats=config.getoption("--benchmark-repeats"),
+        node_profile_count=config.getoption("--node-profile-top") if config.getoption("--node-profile") else 0,
+        node_profile_file=(
+            Path(node_profile_file) if node_profile_file else config.rootpath / ".benchmarks" / "node_profile.json"
+        ),
+    )
+
+
+@pytest.fixture
+def nuke_benchmark(request: pytest.FixtureRequest) -> NukeBenchmark:
+    """Get a callable that measures nodes or functions against the stored baseline."""
+    return NukeBenchmark(request.node.nodeid, request.config.stash[BENCHMARK_SESSION])
+
+
+@pytest.fixture
+def nuke_gizmo_profiler(request: pytest.FixtureRequest) -> NukeGizmoProfiler:
+    """Get a callable that profiles the creation and the knobChanged callbacks of gizmos."""
+    return NukeGizmoProfiler(request.node.nodeid, request.config.stash[BENCHMARK_SESSION])
+
+
+@pytest.fixture
+def nuke_script_profiler(request: pytest.FixtureRequest) -> NukeScriptProfiler:
+    """Get a callable that profiles the load time, memory and first render time of scripts."""
+    return NukeScriptProfiler(request.node.nodeid, request.config.stash[BENCHMARK_SESSION])
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item: pytest.Item) -> Iterator[None]:
+    """Profile the nodes of the test if the node profiling is enabled and Nuke is available."""
+    benchmark_session = item.config.stash[BENCHMARK_SESSION]
+    if not benchmark_session.node_profile_count or "nuke" not in sys.modules:
+        yield
+        return
+
+    from nuketesting.benchmark.node_profiler import performance_timers, read_node_profile
+
+    with performance_timers():
+        yield
+        profile = read_node_profile(benchmark_session.node_profile_count)
+    benchmark_session.node_profiles[item.nodeid] = profile
+    item.add_report_section("call", "node profile", format_profile(profile))
+
+
+def format_profile(profile: NodeProfile) -> str:
+    """Format the node profile of a test for the pytest report."""
+    return f"{format_timings(profile.nodes)}\nNuke memory usage: {profile.memory_usage / 1024**2:.1f} MB"
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """Write the updated baselines and the node profiles."""
+    benchmark_session = session.config.stash.get(BENCHMARK_SESSION, None)
+    if not benchmark_session:
+        return
+    if benchmark_session.update and benchmark_session.results:
+        benchmark_session.store.save()
+    if benchmark_session.node_profiles:
+        save_profiles(benchmark_session.node_profiles, benchmark_session.node_profile_file)
+
+
+def pytest_terminal_summary(terminalreporter: TerminalReporter) -> None:
+    """Print a table of all measured benchmarks."""
+    benchmark_session = terminalreporter.config.stash.get(BENCHMARK_SESSION, None)
+    if not benchmark_session or not benchmark_session.results:
+        return
+
+    terminalreporter.section(f"benchmarks ({benchmark_session.environment})")
+    for benchmark_id, (statistics, baseline) in benchmark_session.results.items():
+        line = f"{benchmark_id}: median {statistics.median:.4f}s, IQR {statistics.iqr:.4f}s"
+        if baseline and baseline.median > 0:
+            line += f", baseline {baseline.median:.4f}s ({statistics.median / baseline.median - 1:+.1%})"
+        elif not benchmark_session.update:
+            line += ", no baseline"
+        terminalreporter.write_line(line)
+    if benchmark_session.update:
+        terminalreporter.write_line(f"Updated baselines in '{benchmark_session.store.filepath}'.")
@@ -0,0 +1,52 @@
+"""Module for rendering nodes in benchmarks."""
+
+from __future__ import annotations
+
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+import nuke
+
+
+@contextmanager
+def render_function(node: nuke.Node, frames: Iterable[int] | None = None) -> Iterator[Callable[[], None]]:
+    """Create a function that renders the node for all frames.
+
+    The node is rendered through a temporary Write node into a temporary directory.
+    The written files are uncompressed, so the write overhead stays small and constant.
+
+    Examples:
+        >>> with render_function(node, frames=range(1, 11)) as render:
+        ...     render()
+
+    Args:
+        node: the node to render.
+        frames: the frames to render. Defaults to the current frame.
+
+    Yields:
+        A function without arguments that renders all frames.
+    """
+    frames = [nuke.frame()] if frames is None else list(frames)
+    with tempfile.TemporaryDirectory(prefix="nuke_benchmark_") as directory:
+        write = nuke.nodes.Write(
+            inputs=[node],
+            file=(Path(directory) / "render.####.exr").as_posix(),
+            file_type="exr",
+            compression="none",
+        )
+
+        def render() -> None:
+            for frame in frames:
+                nuke.execute(write, frame, frame)
+
+        try:
+            yield render
+        finally:
+            nuke.delete(write)
+
+
+def clear_caches() -> None:
+    """Clear the caches of Nuke, so every measurement computes the full image again."""
+    nuke.clearRAMCache()
@@ -0,0 +1,95 @@
+"""Module for the load time, size and first render time of Nuke scripts.
+
+This module does not need Nuke, so measured scripts can be evaluated anywhere.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from nuketesting.benchmark.measure import BenchmarkStatistics
+
+SCRIPT_SUFFIX = ".nk"
+
+
+@dataclass
+class ScriptProfile:
+    """Load time, node count, memory and first render time of a script.
+
+    The assertions fail the test with a descriptive message:
+
+        >>> profile.assert_load_below(500)
+        >>> profile.assert_memory_below(200)
+    """
+
+    path: str
+    """Path of the profiled script."""
+    load: BenchmarkStatistics
+    """Statistics of the durations for parsing the script and creating its nodes."""
+    node_count: int
+    """Number of nodes of the script, including the nodes inside of groups."""
+    memory_delta: int
+    """Increase of the memory usage of Nuke in bytes after loading the script into an empty script."""
+    first_render: BenchmarkStatistics | None = None
+    """Statistics of the durations for rendering the first frame of all Write nodes with empty caches.
+    None if the script has no Write nodes or rendering was skipped."""
+
+    def assert_load_below(self, milliseconds: float) -> None:
+        """Assert that the median load time is below the limit.
+
+        Raises:
+            AssertionError: the script loads too slowly.
+        """
+        median = self.load.median * 1000
+        if median >= milliseconds:
+            msg = f"Loading '{self.path}' takes {median:.2f} ms, which is not below {milliseconds} ms."
+            raise AssertionError(msg)
+
+    def assert_nodes_at_most(self, count: int) -> None:
+        """Assert that the script doesn't contain more nodes than allowed.
+
+        Raises:
+            AssertionError: the script contains too many nodes.
+        """
+        if self.node_count > count:
+            msg = f"'{self.path}' contains {self.node_count} nodes (limit {count})."
+            raise AssertionError(msg)
+
+    def assert_memory_below(self, megabytes: float) -> None:
+        """Assert that loading the script increases the memory usage of Nuke by less than the limit.
+
+        Raises:
+            AssertionError: the script uses too much memory.
+        """
+        delta = self.memory_delta / 1024**2
+        if delta >= megabytes:
+            msg = f"Loading '{self.path}' uses {delta:.1f} MB, which is not below {megabytes} MB."
+            raise AssertionError(msg)
+
+    def assert_first_render_below(self, milliseconds: float) -> None:
+        """Assert that the median time to render the first frame of all Write nodes is below the limit.
+
+        Raises:
+            AssertionError: the first frame renders too slowly or the render was not measured.
+        """
+        if self.first_render is None:
+            msg = f"The first render of '{self.path}' was not measured. The script has no Write nodes to render."
+            raise AssertionError(msg)
+        median = self.first_render.median * 1000
+        if median >= milliseconds:
+            msg = f"Rendering the first frame of '{self.path}' takes {median:.2f} ms, which is not below {milliseconds} ms."
+            raise AssertionError(msg)
+
+
+def format_profiles(profiles: Iterable[ScriptProfile]) -> str:
+    """Format the profiles of multiple scripts as table, slowest loading script first."""
+    lines = [f"{'script':<50} {'load ms':>10} {'nodes':>7} {'memory MB':>10} {'render ms':>10}"]
+    for profile in sorted(profiles, key=lambda profile: profile.load.median, reverse=True):
+        render = f"{profile.first_render.median * 1000:>10.2f}" if profile.first_render else f"{'-':>10}"
+        lines.append(
+            f"{profile.path:<50} {profile.load.median * 1000:>10.2f} {profile.node_count:>7} "
+            f"{profile.memory_delta / 1024**2:>10.1f} {render}"
+        )
+    return "\n".join(lines)
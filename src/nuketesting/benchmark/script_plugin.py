@@ -0,0 +1,94 @@
+"""Pytest plugin that collects Nuke scripts and profiles their loading as tests.
+
+The plugin is not loaded by default, so `.nk` files of test directories are ignored in normal test runs.
+Load it with `-p nuketesting.benchmark.script_plugin` and pass scripts or directories with scripts as test paths:
+
+    pytest -p nuketesting.benchmark.script_plugin templates/comp.nk templates/roto
+
+Every script is profiled by the `nuke_script_profiler` of the benchmark plugin. The test fails if the load time
+or the first render time regressed against the baseline or if the script exceeds the configured limits.
+The `profile-scripts` command of the `nuke-testrunner` runs this plugin inside Nuke.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator
+
+import pytest
+
+from nuketesting.benchmark.plugin import BENCHMARK_SESSION, NukeScriptProfiler
+from nuketesting.benchmark.script_load import SCRIPT_SUFFIX, ScriptProfile, format_profiles
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from _pytest.terminal import TerminalReporter
+
+SCRIPT_PROFILES = pytest.StashKey[list]()
+
+
+class ScriptFile(pytest.File):
+    """Nuke script that is collected as a single test."""
+
+    def collect(self) -> Iterator[ScriptItem]:
+        """Collect the profiling of the script."""
+        yield ScriptItem.from_parent(self, name="profile")
+
+
+class ScriptItem(pytest.Item):
+    """Test that profiles the loading of a script."""
+
+    def runtest(self) -> None:
+        """Profile the script and check it against the baselines and the limits."""
+        config = self.config
+        profiler = NukeScriptProfiler(self.nodeid, config.stash[BENCHMARK_SESSION])
+        profile = profiler(self.path, render=not config.getoption("--script-no-render"))
+        config.stash[SCRIPT_PROFILES].append(profile)
+
+        max_nodes = config.getoption("--script-max-nodes")
+        if max_nodes is not None:
+            profile.assert_nodes_at_most(max_nodes)
+        max_memory = config.getoption("--script-max-memory")
+        if max_memory is not None:
+            profile.assert_memory_below(max_memory)
+
+    def reportinfo(self) -> tuple[Path, int, str]:
+        """Get the location of the test for the report."""
+        return self.path, 0, f"profile {self.path.name}"
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the options of the script profiling."""
+    group = parser.getgroup("nuke_scripts", "Nuke script profiling")
+    group.addoption(
+        "--script-no-render",
+        action="store_true",
+        help="Only measure the loading of the scripts without rendering the first frame of the Write nodes.",
+    )
+    group.addoption("--script-max-nodes", type=int, default=None, help="Fail scripts with more nodes.")
+    group.addoption(
+        "--script-max-memory",
+        type=float,
+        default=None,
+        help="Fail scripts that increase the memory usage of Nuke by this many MB or more.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Prepare the list of measured profiles."""
+    config.stash[SCRIPT_PROFILES] = []
+
+
+def pytest_collect_file(file_path: Path, parent: pytest.Collector) -> ScriptFile | None:
+    """Collect Nuke scripts as tests."""
+    if file_path.suffix == SCRIPT_SUFFIX:
+        return ScriptFile.from_parent(parent, path=file_path)
+    return None
+
+
+def pytest_terminal_summary(terminalreporter: TerminalReporter) -> None:
+    """Print a table of all profiled scripts."""
+    profiles: list[ScriptProfile] = terminalreporter.config.stash.get(SCRIPT_PROFILES, [])
+    if profiles:
+        terminalreporter.section("script profiles")
+        terminalreporter.write_line(format_profiles(profiles))
@@ -0,0 +1,77 @@
+"""Module for profiling the load time, memory and first render time of Nuke scripts in Nuke."""
+
+from __future__ import annotations
+
+from contextlib import ExitStack
+from typing import TYPE_CHECKING, Callable
+
+import nuke
+
+from nuketesting.benchmark.measure import measure, summarize
+from nuketesting.benchmark.render import clear_caches, render_function
+from nuketesting.benchmark.script_load import ScriptProfile
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _clear_script() -> None:
+    """Close the current script and clear the caches, so the next load starts from scratch."""
+    nuke.scriptClear()
+    clear_caches()
+
+
+def profile_script(path: Path | str, repeats: int = 5, warmup: int = 1, render: bool = True) -> ScriptProfile:
+    """Measure the load time, the memory and the first render time of a script.
+
+    The script is loaded repeatedly into an empty script. The first loads are not measured, as they load
+    the plugins and gizmos of the script. Afterward, the first frame of the script is rendered for all
+    enabled Write nodes at the top level. Their inputs are rendered into a temporary directory, so the
+    configured output files of the Write nodes are never touched. The script is closed at the end.
+
+    Args:
+        path: the script to load.
+        repeats: number of measured loads and renders.
+        warmup: number of loads and renders before measuring.
+        render: measure the first render of the Write nodes.
+
+    Returns:
+        The measured load time, node count, memory increase and first render time.
+    """
+    path = str(path)
+    try:
+        load_durations = measure(lambda: nuke.scriptOpen(path), warmup, repeats, setup=_clear_script)
+
+        _clear_script()
+        memory_before = int(nuke.memory("usage"))
+        nuke.scriptOpen(path)
+        memory_delta = int(nuke.memory("usage")) - memory_before
+        node_count = len(nuke.allNodes(recurseGroups=True))
+
+        first_render = None
+        inputs = _get_write_inputs() if render else []
+        if inputs:
+            first_frame = int(nuke.root()["first_frame"].value())
+            with ExitStack() as stack:
+                renders = [stack.enter_context(render_function(node, [first_frame])) for node in inputs]
+                render_durations = measure(_render_all(renders), warmup, repeats, setup=clear_caches)
+            first_render = summarize(render_durations)
+    finally:
+        nuke.scriptClear()
+    return ScriptProfile(path, summarize(load_durations), node_count, memory_delta, first_render)
+
+
+def _get_write_inputs() -> list[nuke.Node]:
+    """Get the input nodes of all enabled Write nodes at the top level of the script."""
+    writes = nuke.allNodes("Write")
+    return [write.input(0) for write in writes if not write["disable"].value() and write.input(0)]
+
+
+def _render_all(renders: list[Callable[[], None]]) -> Callable[[], None]:
+    """Get a function that calls all render functions."""
+
+    def render() -> None:
+        for render_frames in renders:
+            render_frames()
+
+    return render
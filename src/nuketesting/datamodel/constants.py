@@ -3,3 +3,41 @@ from pathlib import Path
 NUKE_TESTING_FOLDER = Path(__file__).parent.parent
 
 RUN_TESTS_SCRIPT = NUKE_TESTING_FOLDER / "runner" / "run_pytest_bootstrapped.py"
+
+SEQUENCE_WORKER_SCRIPT = NUKE_TESTING_FOLDER / "image_checks" / "sequence_worker.py"
+
+UI_KNOBS = frozenset(
+    {
+        "name",
+        "label",
+        "note_font",
+        "note_font_size",
+        "note_font_color",
+        "selected",
+        "xpos",
+        "ypos",
+        "tile_color",
+        "gl_color",
+        "hide_input",
+        "postage_stamp",
+        "postage_stamp_frame",
+        "bookmark",
+        "dope_sheet",
+        "indicators",
+        "icon",
+        "help",
+        "onCreate",
+        "knobChanged",
+        "updateUI",
+        "autolabel",
+        "panel",
+        "cached",
+    }
+)
+"""Knobs that only affect the node graph UI and never the processed image."""
+
+UPDATE_SNAPSHOTS_ENV = "NUKE_TESTING_UPDATE_SNAPSHOTS"
+"""Environment variable that rewrites all snapshot files instead of comparing against them if set to "1"."""
+
+RUNNER_NAME_ENV = "NUKE_TESTING_RUNNER_NAME"
+"""Environment variable with the name of the runner configuration that runs the tests."""
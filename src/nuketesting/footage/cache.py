@@ -0,0 +1,274 @@
+"""Module for caching footage of network storages on the local disk.
+
+Test scripts often read their plates from a network storage. If many tests or many parallel Nuke processes
+read the same files, the storage becomes the bottleneck. The footage cache copies every file once into a
+local directory and all processes on the host read the local copy afterward.
+
+The cache directory contains:
+
+- `objects/`: the content of every file, stored under the SHA-256 of the content.
+  Identical files of different paths are stored once.
+- `files/`: one directory per source directory with hardlinks to the objects under the original file names,
+  so sequences keep their frame pattern. File systems without hardlinks get copies of the objects instead,
+  which count separately against the size budget. A hidden `.<name>.source` record next to each file stores the size and
+  modification time of the source. The file is copied again once the source changed.
+
+All files are written under temporary names and renamed afterward, so parallel processes can share the cache.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+DEFAULT_MAX_BYTES = 20 * 1024**3
+EVICTION_GRACE_PERIOD = 15 * 60  # seconds
+"""Files that were used more recently are never evicted, as other processes might still read them."""
+
+_CHUNK_SIZE = 1024 * 1024
+_PRINTF_TOKEN = re.compile(r"%(\d*)d")
+_HASH_TOKEN = re.compile(r"#+")
+
+
+def expand_sequence(pattern: str, frames: Iterable[int]) -> list[str]:
+    """Get the file paths of a sequence pattern.
+
+    Examples:
+        >>> expand_sequence("plate.%04d.exr", [1001, 1002])
+        ['plate.1001.exr', 'plate.1002.exr']
+        >>> expand_sequence("plate.###.exr", [7])
+        ['plate.007.exr']
+        >>> expand_sequence("still.exr", [1001, 1002])
+        ['still.exr']
+
+    Args:
+        pattern: path with a printf style (`%04d`) or hash style (`####`) frame number or a single file.
+        frames: the frame numbers.
+    """
+    if _PRINTF_TOKEN.search(pattern) or _HASH_TOKEN.search(pattern):
+        return [_insert_frame(pattern, frame) for frame in frames]
+    return [pattern]
+
+
+def _insert_frame(pattern: str, frame: int) -> str:
+    """Replace the frame number token of the pattern with the padded frame."""
+    if _PRINTF_TOKEN.search(pattern):
+        return _PRINTF_TOKEN.sub(lambda match: f"{frame:0{match.group(1) or 1}d}", pattern)
+    return _HASH_TOKEN.sub(lambda match: f"{frame:0{len(match.group())}d}", pattern)
+
+
+def _remove(path: Path) -> None:
+    """Remove the file if it exists."""
+    with contextlib.suppress(FileNotFoundError):
+        path.unlink()
+
+
+def _stat(path: Path) -> os.stat_result | None:
+    """Get the status of the file or None if another process removed it."""
+    try:
+        return path.stat()
+    except FileNotFoundError:
+        return None
+
+
+class FootageCache:
+    """Content addressed cache of footage files with a size budget.
+
+    Examples:
+        >>> cache = FootageCache(Path("/tmp/footage"))
+        >>> cache.localize(Path("/mnt/projects/show/plate.1001.exr"))
+        PosixPath('/tmp/footage/files/2f6b4c.../plate.1001.exr')
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Initialize the cache.
+
+        Args:
+            directory: the local cache directory. Processes that share the directory share the cache.
+            max_bytes: the size of all cached files after an eviction.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._objects = directory / "objects"
+        self._files = directory / "files"
+
+    @property
+    def nbytes(self) -> int:
+        """The size of all cached files. Objects and their hardlinks are counted once, copies count on their own."""
+        sizes = {}
+        for path in [*self._objects.glob("*/*"), *self._files.glob("*/[!.]*")]:
+            path_stat = _stat(path)
+            if path_stat:
+                sizes[path_stat.st_dev, path_stat.st_ino] = path_stat.st_size
+        return sum(sizes.values())
+
+    def get_local_directory(self, source_directory: Path) -> Path:
+        """Get the directory that contains the local copies of the files of the source directory."""
+        return self._files / hashlib.sha1(str(source_directory).encode()).hexdigest()[:16]
+
+    def localize(self, source: Path) -> Path:
+        """Get the local copy of the file and copy it if it isn't cached yet or changed.
+
+        Args:
+            source: the original file.
+
+        Returns:
+            The local copy with the same file name as the source.
+        """
+        source = source.absolute()
+        source_stat = source.stat()
+        local_file = self.get_local_directory(source.parent) / source.name
+        record_file = local_file.with_name(f".{source.name}.source")
+        record = {"source": str(source), "size": source_stat.st_size, "mtime_ns": source_stat.st_mtime_ns}
+
+        if local_file.exists() and self._read_record(record_file, record):
+            # The modification time of the record marks the last use for the eviction.
+            os.utime(record_file)
+            return local_file
+
+        digest = self._store(source)
+        record["digest"] = digest
+        local_file.parent.mkdir(parents=True, exist_ok=True)
+        self._link(self._get_object(digest), local_file)
+        self._write_atomic(record_file, json.dumps(record).encode())
+        return local_file
+
+    def localize_sequence(self, pattern: str, frames: Iterable[int]) -> str | None:
+        """Localize all existing files of the sequence.
+
+        Args:
+            pattern: the path of the sequence, see `expand_sequence`.
+            frames: the frame numbers of the sequence.
+
+        Returns:
+            The local pattern or None if no file of the sequence exists.
+        """
+        source_pattern = Path(pattern).absolute()
+        paths = [Path(path) for path in expand_sequence(str(source_pattern), frames)]
+        existing = [path for path in paths if path.is_file()]
+        if not existing:
+            return None
+        for path in existing:
+            self.localize(path)
+        return (self.get_local_directory(source_pattern.parent) / source_pattern.name).as_posix()
+
+    def evict(self, grace_period: float = EVICTION_GRACE_PERIOD) -> int:
+        """Remove the least recently used files until the cache fits into the size budget.
+
+        Args:
+            grace_period: seconds since the last use during which files are kept anyway.
+
+        Returns:
+            The number of removed bytes.
+        """
+        if not self.directory.exists():
+            return 0
+        now = time.time()
+        removed = 0
+        # Parallel processes evict the same cache, so every file might be gone by the time it is read.
+        entries = []
+        for record_file in self._files.glob("*/.*.source"):
+            with contextlib.suppress(FileNotFoundError):
+                mtime = record_file.stat().st_mtime
+                entries.append((mtime, record_file, json.loads(record_file.read_text())["digest"]))
+        entries.sort()
+        references = Counter(digest for _, _, digest in entries)
+        # Objects without any file are left over from interrupted processes.
+        # Copies don't raise the link count of their object, so the records are checked as well.
+        for object_file in self._objects.glob("*/*"):
+            object_stat = _stat(object_file)
+            if (
+                object_stat
+                and object_stat.st_nlink <= 1
+                and not references[object_file.name]
+                and now - object_stat.st_mtime > grace_period
+            ):
+                _remove(object_file)
+                removed += object_stat.st_size
+
+        total = self.nbytes
+        for _, record_file, digest in entries:
+            if total <= self.max_bytes:
+                break
+            record_stat = _stat(record_file)
+            if record_stat and now - record_stat.st_mtime < grace_period:
+                break
+            local_file = record_file.with_name(record_file.name[1 : -len(".source")])
+            local_stat = _stat(local_file)
+            if local_stat and local_stat.st_nlink <= 1:
+                # A copy of the object that takes space on its own.
+                total -= local_stat.st_size
+                removed += local_stat.st_size
+            _remove(local_file)
+            _remove(record_file)
+            references[digest] -= 1
+            object_file = self._get_object(digest)
+            object_stat = _stat(object_file)
+            if not references[digest] and object_stat and object_stat.st_nlink <= 1:
+                _remove(object_file)
+                total -= object_stat.st_size
+                removed += object_stat.st_size
+        return removed
+
+    def clear(self) -> None:
+        """Remove all cached files."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _get_object(self, digest: str) -> Path:
+        """Get the path of the content with the digest."""
+        return self._objects / digest[:2] / digest
+
+    @staticmethod
+    def _read_record(record_file: Path, expected: dict) -> bool:
+        """Check if the record exists and matches the expected source."""
+        try:
+            record = json.loads(record_file.read_text())
+        except (OSError, ValueError):
+            return False
+        return all(record.get(key) == value for key, value in expected.items())
+
+    def _store(self, source: Path) -> str:
+        """Copy the file into the objects and get the digest of its content."""
+        self._objects.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        handle, temporary_name = tempfile.mkstemp(dir=self._objects, prefix=".")
+        temporary_file = Path(temporary_name)
+        try:
+            with source.open("rb") as reader, os.fdopen(handle, "wb") as writer:
+                for chunk in iter(lambda: reader.read(_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    writer.write(chunk)
+            object_file = self._get_object(digest.hexdigest())
+            if not object_file.exists():
+                object_file.parent.mkdir(exist_ok=True)
+                temporary_file.replace(object_file)
+        finally:
+            _remove(temporary_file)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _link(target: Path, path: Path) -> None:
+        """Replace the path with a hardlink to the target or a copy if the file system doesn't support links."""
+        temporary_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        _remove(temporary_file)
+        try:
+            os.link(target, temporary_file)
+        except OSError:
+            shutil.copyfile(target, temporary_file)
+        temporary_file.replace(path)
+
+    @staticmethod
+    def _write_atomic(path: Path, content: bytes) -> None:
+        """Write the file under a temporary name and rename it afterward."""
+        temporary_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temporary_file.write_bytes(content)
+        temporary_file.replace(path)
@@ -0,0 +1,59 @@
+"""Module for pointing the Read nodes of a script to the footage cache."""
+
+from __future__ import annotations
+
+import contextlib
+from typing import TYPE_CHECKING, Iterable
+
+import nuke
+
+if TYPE_CHECKING:
+    from nuketesting.footage.cache import FootageCache
+
+FOOTAGE_NODE_CLASSES = ("Read", "DeepRead", "ReadGeo2")
+
+
+def find_footage_nodes() -> list[nuke.Node]:
+    """Get all nodes that read files, including the nodes inside of groups."""
+    return [node for node in nuke.allNodes(recurseGroups=True) if node.Class() in FOOTAGE_NODE_CLASSES]
+
+
+def _get_frames(node: nuke.Node) -> range:
+    """Get the frame range of the node or the script if the node doesn't have one."""
+    if "first" in node.knobs() and "last" in node.knobs():
+        return range(int(node["first"].value()), int(node["last"].value()) + 1)
+    root = nuke.root()
+    return range(int(root["first_frame"].value()), int(root["last_frame"].value()) + 1)
+
+
+def localize_nodes(cache: FootageCache, nodes: Iterable[nuke.Node]) -> dict[nuke.Node, str]:
+    """Copy the files of the nodes into the cache and let the nodes read the local copies.
+
+    Paths with TCL expressions are kept, as they can't be resolved without rendering.
+    Missing files are ignored, so the nodes report them as usual.
+
+    Args:
+        cache: the footage cache.
+        nodes: the nodes with a "file" knob.
+
+    Returns:
+        The original path of each changed node.
+    """
+    original_paths = {}
+    for node in nodes:
+        path = node["file"].value()
+        if not path or "[" in path:
+            continue
+        local_path = cache.localize_sequence(path, _get_frames(node))
+        if local_path:
+            original_paths[node] = path
+            node["file"].setValue(local_path)
+    return original_paths
+
+
+def restore_nodes(original_paths: dict[nuke.Node, str]) -> None:
+    """Let the nodes read the original files again. Nodes that were deleted meanwhile are skipped."""
+    for node, path in original_paths.items():
+        # Deleted nodes raise a ValueError, for example after clearing the script.
+        with contextlib.suppress(ValueError):
+            node["file"].setValue(path)
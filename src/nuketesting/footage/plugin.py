@@ -0,0 +1,107 @@
+"""Pytest plugin that provides the `nuke_footage_cache` fixture.
+
+The fixture copies the files of all Read nodes into a local footage cache and lets the nodes read the
+local copies for the duration of the test:
+
+    def test_grade(nuke_footage_cache):
+        nuke.scriptOpen("/mnt/projects/show/comp_v012.nk")
+        nuke_footage_cache()
+        ...
+
+All Nuke processes of a host share the cache directory, so every file is read only once from the network storage.
+After the test session, the least recently used files are evicted until the cache fits into its size budget.
+"""
+
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+import pytest
+
+from nuketesting.footage.cache import DEFAULT_MAX_BYTES, FootageCache
+
+if TYPE_CHECKING:
+    import nuke
+
+FOOTAGE_CACHE = pytest.StashKey[FootageCache]()
+DEFAULT_CACHE_DIRECTORY = Path(tempfile.gettempdir()) / "nuketesting_footage"
+
+
+class FootageLocalizer:
+    """Callable of the `nuke_footage_cache` fixture that lets Read nodes read from the cache."""
+
+    def __init__(self, cache: FootageCache):
+        """Initialize the localizer.
+
+        Args:
+            cache: the footage cache of the session.
+        """
+        self.cache = cache
+        self.original_paths: dict[nuke.Node, str] = {}
+        """Original paths of all changed nodes."""
+
+    def __call__(self, nodes: Iterable[nuke.Node] | None = None) -> int:
+        """Copy the files of the nodes into the cache and let the nodes read the local copies.
+
+        Args:
+            nodes: the nodes to change. Defaults to all Read nodes of the script.
+
+        Returns:
+            The number of changed nodes.
+        """
+        from nuketesting.footage.localize import find_footage_nodes, localize_nodes
+
+        changed = localize_nodes(self.cache, find_footage_nodes() if nodes is None else nodes)
+        for node, path in changed.items():
+            self.original_paths.setdefault(node, path)
+        return len(changed)
+
+    def restore(self) -> None:
+        """Let all changed nodes read their original files again."""
+        if self.original_paths:
+            from nuketesting.footage.localize import restore_nodes
+
+            restore_nodes(self.original_paths)
+            self.original_paths.clear()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the options of the footage cache."""
+    group = parser.getgroup("nuke_footage", "Nuke footage cache")
+    group.addoption(
+        "--footage-cache",
+        default=None,
+        help=f"Local directory of the footage cache. Defaults to '{DEFAULT_CACHE_DIRECTORY}'.",
+    )
+    group.addoption(
+        "--footage-cache-size",
+        type=float,
+        default=DEFAULT_MAX_BYTES / 1024**3,
+        help=f"Size budget of the footage cache in GB. Defaults to {DEFAULT_MAX_BYTES // 1024**3}.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Create the footage cache of the session."""
+    directory = config.getoption("--footage-cache")
+    config.stash[FOOTAGE_CACHE] = FootageCache(
+        Path(directory) if directory else DEFAULT_CACHE_DIRECTORY,
+        max_bytes=int(config.getoption("--footage-cache-size") * 1024**3),
+    )
+
+
+@pytest.fixture
+def nuke_footage_cache(request: pytest.FixtureRequest) -> Iterator[FootageLocalizer]:
+    """Get a callable that lets Read nodes read local copies of their files until the end of the test."""
+    localizer = FootageLocalizer(request.config.stash[FOOTAGE_CACHE])
+    yield localizer
+    localizer.restore()
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """Evict the least recently used files if the cache exceeds its size budget."""
+    cache = session.config.stash.get(FOOTAGE_CACHE, None)
+    if cache:
+        cache.evict()
@@ -0,0 +1,34 @@
+"""Module for evaluating nodes at specific frames."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator
+
+import nuke
+
+
+@contextmanager
+def at_frame(frame: int | None) -> Iterator[None]:
+    """Temporarily move the current frame of the script.
+
+    Knob values, bounding boxes and formats of nodes are evaluated at the current frame.
+    Use this context to read them at another frame. The previous frame is restored afterward.
+
+    Examples:
+        >>> with at_frame(1001):
+        ...     bbox = node.bbox()
+
+    Args:
+        frame: the frame to move to. None keeps the current frame.
+    """
+    if frame is None:
+        yield
+        return
+
+    previous_frame = nuke.frame()
+    nuke.frame(frame)
+    try:
+        yield
+    finally:
+        nuke.frame(previous_frame)
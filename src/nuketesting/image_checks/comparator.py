@@ -0,0 +1,183 @@
+"""Module with the shared checks of all image comparators."""
+
+from __future__ import annotations
+
+import abc
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from nuketesting.frames import at_frame
+from nuketesting.image_checks.diff_artifacts import get_artifacts_directory, write_diff_artifacts
+from nuketesting.image_checks.fingerprint import PROXY_STEP, compute_fingerprint
+from nuketesting.image_checks.image_buffer import ImageBuffer, Region, find_first_layer_mismatch, sample_layers
+from nuketesting.image_checks.render_cache import hash_node_graph
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import nuke
+
+
+@dataclass
+class Mismatch:
+    """Description of a failed pixel comparison."""
+
+    message: str
+    """Human readable description of the mismatch."""
+    a_layers: dict[str, ImageBuffer] = field(default_factory=dict)
+    """The compared buffers of the first node by layer name."""
+    b_layers: dict[str, ImageBuffer] = field(default_factory=dict)
+    """The compared buffers of the second node by layer name."""
+
+
+class ImageComparator(abc.ABC):
+    """Base class for image comparators.
+
+    Before any pixels are compared, the comparator runs cheap checks in this order:
+
+    1. Formats and channels need to match.
+    2. Nodes with the same upstream graph are equal without rendering anything.
+    3. Optionally, images with different fingerprints are rejected even if the pixel comparison
+       misses the difference, and images with equal fingerprints may pass without a pixel comparison.
+
+    Subclasses implement `_find_mismatch` for the actual pixel comparison. Its mismatch is reported
+    and written as artifacts, the proxy cells of the fingerprints are only reported if it found nothing.
+
+    If an artifacts directory is configured, failed comparisons write diff images
+    of the compared buffers into it. See `nuketesting.image_checks.diff_artifacts`.
+    """
+
+    def __init__(
+        self,
+        use_fingerprint: bool = False,
+        trust_fingerprint: bool = False,
+        artifacts_dir: Path | str | None = None,
+    ):
+        """Initialize the comparator.
+
+        Args:
+            use_fingerprint: compare the fingerprints of both images in addition to the pixels.
+                This only pays off together with `trust_fingerprint` or for comparators that only compare
+                some of the pixels, as the fingerprints render proxies of both images.
+            trust_fingerprint: skip the pixel comparison if both fingerprints are equal.
+                This makes passing comparisons very cheap, but changes that keep the average
+                of each proxy cell, like a slight blur, are not detected.
+            artifacts_dir: directory for diff artifacts of failed comparisons.
+                Defaults to the directory of the `NUKE_TESTING_ARTIFACTS_DIR` environment variable.
+        """
+        self._use_fingerprint = use_fingerprint
+        self._trust_fingerprint = trust_fingerprint
+        self._artifacts_dir = artifacts_dir
+
+    def assert_equal(self, node_a: nuke.Node, node_b: nuke.Node, frame: int | None = None) -> None:
+        """Assert that both nodes output the same pixels.
+
+        Args:
+            node_a: first test node.
+            node_b: second test node.
+            frame: the frame to compare. Defaults to the current frame.
+
+        Raises:
+            AssertionError: the two nodes are not equal based on the testing criteria.
+        """
+        with at_frame(frame):
+            messages = self._compare(node_a, node_b)
+        assert not messages, "\n".join(messages)
+
+    def _compare(self, node_a: nuke.Node, node_b: nuke.Node) -> list[str]:
+        """Compare both nodes at the current frame.
+
+        Returns:
+            Messages about all found mismatches.
+        """
+        a_format = node_a.format()
+        b_format = node_b.format()
+        assert a_format.x() == b_format.x()
+        assert a_format.y() == b_format.y()
+        assert a_format.r() == b_format.r()
+        assert a_format.t() == b_format.t()
+
+        channels_a = set(node_a.channels())
+        channels_b = set(node_b.channels())
+        graph_hashes = (hash_node_graph(node_a), hash_node_graph(node_b))
+        messages = []
+        if channels_a != channels_b:
+            messages.append(
+                f"Channels differ. Only in '{node_a.name()}': {sorted(channels_a - channels_b)}, "
+                f"only in '{node_b.name()}': {sorted(channels_b - channels_a)}"
+            )
+        elif graph_hashes[0] == graph_hashes[1]:
+            return []
+
+        region = Region.from_bbox(node_a).union(Region.from_bbox(node_b))
+        common_channels = channels_a & channels_b
+        fingerprint_mismatch = None
+        if self._use_fingerprint:
+            fingerprint_mismatch = self._check_fingerprints(node_a, node_b, common_channels, region, graph_hashes)
+            if not fingerprint_mismatch and self._trust_fingerprint:
+                return messages
+
+        mismatch = self._find_mismatch(node_a, node_b, common_channels, region, graph_hashes) or fingerprint_mismatch
+        if mismatch:
+            messages.append(mismatch.message)
+            self._write_artifacts(mismatch)
+        return messages
+
+    @staticmethod
+    def _check_fingerprints(
+        node_a: nuke.Node,
+        node_b: nuke.Node,
+        channels: set[str],
+        region: Region,
+        graph_hashes: tuple[str, str],
+    ) -> Mismatch | None:
+        """Compare the fingerprints of both nodes.
+
+        Args:
+            node_a: first test node.
+            node_b: second test node.
+            channels: the channels that exist on both nodes.
+            region: the union of both bounding boxes.
+            graph_hashes: the `hash_node_graph` of both nodes.
+
+        Returns:
+            The first mismatch of the proxy images or None if the fingerprints are equal.
+        """
+        hash_a, hash_b = graph_hashes
+        fingerprint_a = compute_fingerprint(node_a, channels, region, graph_hash=hash_a)
+        if fingerprint_a == compute_fingerprint(node_b, channels, region, graph_hash=hash_b):
+            return None
+
+        # The proxies are cached while computing the fingerprints.
+        a_layers = sample_layers(node_a, channels, region, step=PROXY_STEP, graph_hash=hash_a)
+        b_layers = sample_layers(node_b, channels, region, step=PROXY_STEP, graph_hash=hash_b)
+        message = find_first_layer_mismatch(a_layers, b_layers) or "Fingerprints differ."
+        return Mismatch(f"Proxy cell at {message}", a_layers, b_layers)
+
+    def _write_artifacts(self, mismatch: Mismatch) -> None:
+        """Write the diff artifacts of the mismatch if an artifacts directory is configured."""
+        directory = get_artifacts_directory(self._artifacts_dir)
+        if directory:
+            write_diff_artifacts(directory, mismatch.message, mismatch.a_layers, mismatch.b_layers)
+
+    @abc.abstractmethod
+    def _find_mismatch(
+        self,
+        node_a: nuke.Node,
+        node_b: nuke.Node,
+        channels: set[str],
+        region: Region,
+        graph_hashes: tuple[str, str],
+    ) -> Mismatch | None:
+        """Compare the pixels of both nodes.
+
+        Args:
+            node_a: first test node.
+            node_b: second test node.
+            channels: the channels that exist on both nodes.
+            region: the union of both bounding boxes.
+            graph_hashes: the `hash_node_graph` of both nodes, to key cached renders without hashing again.
+
+        Returns:
+            The found mismatch or None if both images are equal.
+        """
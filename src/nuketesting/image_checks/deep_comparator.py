@@ -0,0 +1,181 @@
+"""Module for comparing deep images."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import TYPE_CHECKING, Iterable
+
+from nuketesting.frames import at_frame
+from nuketesting.image_checks.image_buffer import Region
+from nuketesting.image_checks.render_cache import hash_node_graph
+
+if TYPE_CHECKING:
+    import nuke
+
+DEPTH_CHANNELS = ("deep.front", "deep.back")
+"""Channels with the depth range of each deep sample. They are always stored first."""
+
+
+@dataclass(frozen=True)
+class DeepBuffer:
+    """Deep samples of a node stored in flat arrays.
+
+    Pixels are stored row by row, starting at the bottom of the region.
+    The samples of each pixel are sorted by depth and hold the values of all channels in the order of `channels`.
+    """
+
+    region: Region
+    """The read region."""
+    channels: tuple[str, ...]
+    """Names of the channels in the order they are stored per sample."""
+    counts: array
+    """Number of samples of each pixel."""
+    data: array
+    """Flat float array with the values of all samples of all pixels."""
+
+    @property
+    def offsets(self) -> list[int]:
+        """Index of the first sample of each pixel and the total number of samples at the end."""
+        return [0, *accumulate(self.counts)]
+
+    def locate_pixel(self, pixel: int) -> tuple[int, int]:
+        """Get the x and y coordinates of a pixel index."""
+        row, column = divmod(pixel, self.region.width)
+        return self.region.x + column, self.region.y + row
+
+
+def read_deep_buffer(
+    node: nuke.Node,
+    channels: Iterable[str],
+    region: Region | None = None,
+    frame: int | None = None,
+) -> DeepBuffer:
+    """Read all deep samples of the node into memory.
+
+    Args:
+        node: the deep node to read.
+        channels: names of the channels to read. The depth channels are always read.
+        region: the region to read. Defaults to the bounding box of the node.
+        frame: the frame to read. Defaults to the current frame.
+
+    Returns:
+        The read deep buffer.
+    """
+    channels = DEPTH_CHANNELS + tuple(sorted(set(channels) - set(DEPTH_CHANNELS)))
+    counts = array("I")
+    data = array("f")
+    with at_frame(frame):
+        region = region or Region.from_bbox(node)
+        for y in range(region.y, region.t):
+            row_counts = [node.deepSampleCount(x, y) for x in range(region.x, region.r)]
+            counts.extend(row_counts)
+            for x, count in zip(range(region.x, region.r), row_counts):
+                if count:
+                    samples = sorted(
+                        tuple(node.deepSample(channel, x, y, index) for channel in channels) for index in range(count)
+                    )
+                    data.extend(value for sample in samples for value in sample)
+    return DeepBuffer(region=region, channels=channels, counts=counts, data=data)
+
+
+def find_deep_mismatch(a_buffer: DeepBuffer, b_buffer: DeepBuffer, tolerance: float = 0.0) -> str | None:
+    """Compare two deep buffers of the same region and channels.
+
+    The sample counts and values are first compared as whole arrays. Only if they differ,
+    the differing pixels are searched.
+
+    Args:
+        a_buffer: first buffer.
+        b_buffer: second buffer.
+        tolerance: maximum absolute difference of a value that is still considered equal.
+
+    Returns:
+        A message describing the mismatches or None if both buffers are equal.
+    """
+    if a_buffer.counts != b_buffer.counts:
+        pixels = [pixel for pixel, (a, b) in enumerate(zip(a_buffer.counts, b_buffer.counts)) if a != b]
+        point_x, point_y = a_buffer.locate_pixel(pixels[0])
+        return (
+            f"Sample counts differ in {len(pixels)} pixels. "
+            f"First: Point({point_x},{point_y}) {a_buffer.counts[pixels[0]]} != {b_buffer.counts[pixels[0]]} samples"
+        )
+
+    if a_buffer.data == b_buffer.data:
+        return None
+
+    # The difference to NaN is never above the tolerance, so NaN only matches NaN.
+    differing = [
+        index
+        for index, (a, b) in enumerate(zip(a_buffer.data, b_buffer.data))
+        if abs(a - b) > tolerance or math.isnan(a) != math.isnan(b)
+    ]
+    if not differing:
+        return None
+
+    offsets = a_buffer.offsets
+    pixel_size = len(a_buffer.channels)
+    pixels = set()
+    pixel = 0
+    for index in differing:
+        sample = index // pixel_size
+        while offsets[pixel + 1] <= sample:
+            pixel += 1
+        pixels.add(pixel)
+
+    first = differing[0]
+    sample, channel = divmod(first, pixel_size)
+    first_pixel = min(pixels)
+    point_x, point_y = a_buffer.locate_pixel(first_pixel)
+    return (
+        f"Deep samples differ in {len(pixels)} pixels ({len(differing)} values). "
+        f"First: Point({point_x},{point_y}) sample {sample - offsets[first_pixel]} "
+        f"{a_buffer.channels[channel]}: {a_buffer.data[first]} != {b_buffer.data[first]}"
+    )
+
+
+class DeepComparator:
+    """Image comparator for the samples of deep nodes.
+
+    Every pixel of the union of both bounding boxes is read with all its samples.
+    The samples of a pixel are compared in depth order, so nodes that only reorder samples are equal.
+    Nodes with the same upstream graph are equal without reading any samples.
+    """
+
+    def __init__(self, tolerance: float = 0.0):
+        """Initialize the comparator.
+
+        Args:
+            tolerance: maximum absolute difference of a sample value that is still considered equal.
+        """
+        self._tolerance = tolerance
+
+    def assert_equal(self, node_a: nuke.Node, node_b: nuke.Node, frame: int | None = None) -> None:
+        """Assert that both nodes output the same deep samples.
+
+        Args:
+            node_a: first deep node.
+            node_b: second deep node.
+            frame: the frame to compare. Defaults to the current frame.
+
+        Raises:
+            AssertionError: the deep samples of both nodes differ.
+        """
+        with at_frame(frame):
+            channels_a = set(node_a.channels())
+            channels_b = set(node_b.channels())
+            assert channels_a == channels_b, (
+                f"Channels differ. Only in '{node_a.name()}': {sorted(channels_a - channels_b)}, "
+                f"only in '{node_b.name()}': {sorted(channels_b - channels_a)}"
+            )
+            if hash_node_graph(node_a) == hash_node_graph(node_b):
+                return
+
+            region = Region.from_bbox(node_a).union(Region.from_bbox(node_b))
+            a_buffer = read_deep_buffer(node_a, channels_a, region)
+            b_buffer = read_deep_buffer(node_b, channels_b, region)
+
+        mismatch = find_deep_mismatch(a_buffer, b_buffer, self._tolerance)
+        assert mismatch is None, mismatch
@@ -0,0 +1,261 @@
+"""Module for writing diff images of failed image comparisons.
+
+The artifacts are only written when a comparison fails and are created from the buffers
+that were compared, so nothing needs to be rendered again. Each failure gets its own directory with:
+
+- `summary.json`: the failure message and per channel difference statistics.
+- `heatmap.png`: the biggest difference of all channels per pixel.
+- `tile_<n>.png`: the tiles with the biggest differences, image A, image B and the difference side by side.
+
+All images are compressed PNG files and their size is limited, so CI artifacts stay small.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import struct
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence
+
+if TYPE_CHECKING:
+    from nuketesting.image_checks.image_buffer import ImageBuffer
+
+ARTIFACTS_ENV = "NUKE_TESTING_ARTIFACTS_DIR"
+"""Environment variable with the directory for diff artifacts. Artifacts are only written if it is set."""
+
+MAX_IMAGE_SIZE = 512
+"""Maximum width and height of written images in pixels."""
+
+TILE_SIZE = 32
+"""Width and height of the tiles that are compared side by side, in buffer pixels."""
+
+MAX_TILES = 4
+"""Maximum number of tiles that are written."""
+
+
+def get_artifacts_directory(directory: Path | str | None = None) -> Path | None:
+    """Get the directory for diff artifacts.
+
+    Args:
+        directory: an explicitly configured directory.
+
+    Returns:
+        The configured directory, the directory of the environment or None if artifacts are disabled.
+    """
+    directory = directory or os.getenv(ARTIFACTS_ENV)
+    return Path(directory) if directory else None
+
+
+def write_diff_artifacts(
+    directory: Path,
+    message: str,
+    a_layers: dict[str, ImageBuffer],
+    b_layers: dict[str, ImageBuffer],
+) -> Path:
+    """Write the diff artifacts of a failed comparison.
+
+    The artifacts are written into a subdirectory named after the running test.
+
+    Args:
+        directory: the parent directory for all artifacts.
+        message: the failure message.
+        a_layers: compared buffers of the first node by layer name.
+        b_layers: compared buffers of the second node with the same layers and layouts.
+
+    Returns:
+        The directory containing the artifacts of this failure.
+    """
+    target = _unique_directory(directory / _artifact_name())
+    target.mkdir(parents=True)
+
+    summary: dict = {"message": message, "channels": {}, "tiles": []}
+    differences = None
+    for layer, a_buffer in a_layers.items():
+        b_buffer = b_layers[layer]
+        layer_differences = _get_differences(a_buffer, b_buffer)
+        summary["channels"].update(_summarize_channels(a_buffer, layer_differences))
+        pixel_differences = _max_per_pixel(layer_differences, len(a_buffer.channels))
+        differences = pixel_differences if differences is None else list(map(max, differences, pixel_differences))
+
+    if differences:
+        reference = next(iter(a_layers.values()))
+        summary["region"] = list(reference.region)
+        summary["step"] = reference.step
+        width = len(reference.columns)
+        _write_heatmap(target / "heatmap.png", differences, width)
+        tiles = _find_worst_tiles(differences, width)
+        for index, (column, row, score) in enumerate(tiles):
+            _write_tile(target / f"tile_{index}.png", a_layers, b_layers, differences, column, row)
+            summary["tiles"].append(
+                {"x": reference.columns[column], "y": reference.rows[row], "difference_sum": score},
+            )
+
+    (target / "summary.json").write_text(json.dumps(summary, indent=2))
+    return target
+
+
+def _artifact_name() -> str:
+    """Get a file system friendly name for the running test."""
+    test_name = os.getenv("PYTEST_CURRENT_TEST", "comparison").split(" ")[0]
+    return re.sub(r"[^\w.-]+", "_", test_name).strip("_")[:120]
+
+
+def _unique_directory(directory: Path) -> Path:
+    """Get a directory path that does not exist yet by adding a counter if necessary."""
+    candidate = directory
+    counter = 1
+    while candidate.exists():
+        candidate = directory.with_name(f"{directory.name}_{counter}")
+        counter += 1
+    return candidate
+
+
+def _get_differences(a_buffer: ImageBuffer, b_buffer: ImageBuffer) -> list[float]:
+    """Get the absolute differences of all values of both buffers."""
+    return [abs(a - b) for a, b in zip(a_buffer.data, b_buffer.data)]
+
+
+def _max_per_pixel(differences: list[float], channel_count: int) -> list[float]:
+    """Reduce interleaved channel differences to the biggest difference per pixel."""
+    return [max(differences[index : index + channel_count]) for index in range(0, len(differences), channel_count)]
+
+
+def _summarize_channels(buffer: ImageBuffer, differences: list[float]) -> dict[str, dict[str, float]]:
+    """Get difference statistics for each channel of the buffer."""
+    summary = {}
+    for index, channel in enumerate(buffer.channels):
+        values = differences[index :: len(buffer.channels)]
+        summary[channel] = {
+            "max_difference": max(values, default=0.0),
+            "mean_difference": sum(values) / len(values) if values else 0.0,
+            "differing_pixels": sum(1 for value in values if value),
+        }
+    return summary
+
+
+def _find_worst_tiles(differences: list[float], width: int) -> list[tuple[int, int, float]]:
+    """Find the tiles with the biggest summed difference.
+
+    Returns:
+        Column and row of the lower left corner and the summed difference of each tile, worst first.
+    """
+    height = len(differences) // width
+    tiles = []
+    for row in range(0, height, TILE_SIZE):
+        for column in range(0, width, TILE_SIZE):
+            score = sum(
+                sum(differences[tile_row * width + column : tile_row * width + min(column + TILE_SIZE, width)])
+                for tile_row in range(row, min(row + TILE_SIZE, height))
+            )
+            if score:
+                tiles.append((column, row, score))
+    return sorted(tiles, key=lambda tile: tile[2], reverse=True)[:MAX_TILES]
+
+
+def _write_heatmap(filepath: Path, differences: list[float], width: int) -> None:
+    """Write the differences as heatmap normalized to the biggest difference.
+
+    Small buffers are scaled up and big buffers are reduced to the maximum of each block of pixels,
+    so single differing pixels stay visible.
+    """
+    height = len(differences) // width
+    peak = max(differences) or 1.0
+    scale = max(1, MAX_IMAGE_SIZE // max(width, height))
+    step = max(1, -(-max(width, height) // MAX_IMAGE_SIZE))
+    rows = []
+    for row in reversed(range(0, height, step)):
+        pixels = bytearray()
+        for column in range(0, width, step):
+            value = max(
+                max(differences[block_row * width + column : block_row * width + min(column + step, width)])
+                for block_row in range(row, min(row + step, height))
+            )
+            pixels += bytes(_heat_color(value / peak)) * scale
+        rows.extend([bytes(pixels)] * scale)
+    _write_png(filepath, rows)
+
+
+def _heat_color(value: float) -> tuple[int, int, int]:
+    """Map a value between zero and one to a black, red, yellow, white color ramp."""
+    value = min(max(value, 0.0), 1.0) * 3
+    return _to_byte(value), _to_byte(value - 1), _to_byte(value - 2)
+
+
+def _write_tile(  # noqa: PLR0913
+    filepath: Path,
+    a_layers: dict[str, ImageBuffer],
+    b_layers: dict[str, ImageBuffer],
+    differences: list[float],
+    column: int,
+    row: int,
+) -> None:
+    """Write a tile of image A, image B and the difference side by side."""
+    a_channels = _get_display_channels(a_layers)
+    b_channels = _get_display_channels(b_layers)
+    reference = next(iter(a_layers.values()))
+    width = len(reference.columns)
+    height = len(reference.rows)
+    columns = range(column, min(column + TILE_SIZE, width))
+    peak = max(differences) or 1.0
+    scale = max(1, MAX_IMAGE_SIZE // (3 * TILE_SIZE))
+
+    rows = []
+    for tile_row in reversed(range(row, min(row + TILE_SIZE, height))):
+        pixels = bytearray()
+        for channels in (a_channels, b_channels):
+            for tile_column in columns:
+                pixels += bytes(_display_color(channels, tile_column, tile_row)) * scale
+        for tile_column in columns:
+            pixels += bytes(_heat_color(differences[tile_row * width + tile_column] / peak)) * scale
+        rows.extend([bytes(pixels)] * scale)
+    _write_png(filepath, rows)
+
+
+def _get_display_channels(layers: dict[str, ImageBuffer]) -> list[tuple[ImageBuffer, int]]:
+    """Get the buffer and channel index to show as red, green and blue.
+
+    The rgba layer is preferred. Otherwise the first channel is shown in grayscale.
+    """
+    rgba = layers.get("rgba")
+    if rgba:
+        indices = [
+            rgba.channels.index(name) for name in ("rgba.red", "rgba.green", "rgba.blue") if name in rgba.channels
+        ]
+        if indices:
+            return [(rgba, index) for index in indices] + [(rgba, indices[-1])] * (3 - len(indices))
+    first = next(iter(layers.values()))
+    return [(first, 0)] * 3
+
+
+def _display_color(channels: Sequence[tuple[ImageBuffer, int]], column: int, row: int) -> tuple[int, int, int]:
+    """Get the 8 bit display color of a buffer pixel."""
+    red, green, blue = (_to_byte(buffer.value(column, row, index)) for buffer, index in channels)
+    return red, green, blue
+
+
+def _to_byte(value: float) -> int:
+    """Convert a value between zero and one to a byte. Values outside are clamped."""
+    return int(min(max(value, 0.0), 1.0) * 255 + 0.5)
+
+
+def _write_png(filepath: Path, rows: list[bytes]) -> None:
+    """Write 8 bit RGB rows as compressed PNG file.
+
+    Args:
+        filepath: the file to write.
+        rows: the pixel rows from top to bottom. Each row contains three bytes per pixel.
+    """
+    height = len(rows)
+    width = len(rows[0]) // 3 if rows else 0
+    raw = b"".join(b"\x00" + row for row in rows)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    filepath.write_bytes(
+        b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 9)) + chunk(b"IEND", b"")
+    )
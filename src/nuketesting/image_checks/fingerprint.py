@@ -0,0 +1,169 @@
+"""Module for cheap statistical fingerprints of images.
+
+A fingerprint consists of per channel statistics and a hash of a coarse proxy image.
+Both are computed from a few box filtered samples, so comparing fingerprints is much cheaper
+than comparing pixels. Different fingerprints prove that the images differ.
+Equal fingerprints only make it very likely that the images are equal.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Iterable
+
+from nuketesting.frames import at_frame
+from nuketesting.image_checks.image_buffer import Region, sample_layers
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import nuke
+
+PROXY_STEP = 256
+"""Size of the cells of the proxy image in pixels."""
+
+
+@dataclass(frozen=True)
+class ChannelStatistics:
+    """Statistics of a single channel, estimated from the cells of the proxy image."""
+
+    minimum: float
+    """Smallest cell average."""
+    maximum: float
+    """Biggest cell average."""
+    mean: float
+    """Average value of the channel."""
+    total: float
+    """Sum of all pixel values of the channel."""
+
+
+@dataclass(frozen=True)
+class ImageFingerprint:
+    """Fingerprint of the image of a node."""
+
+    region: Region
+    """The region the fingerprint was computed for."""
+    channels: dict[str, ChannelStatistics]
+    """Statistics of each channel."""
+    proxy_hash: str
+    """Hash of the proxy image."""
+
+    def to_dict(self) -> dict:
+        """Convert the fingerprint into a JSON serializable dictionary."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> ImageFingerprint:
+        """Create a fingerprint from a dictionary created by `to_dict`."""
+        return cls(
+            region=Region(*data["region"]),
+            channels={channel: ChannelStatistics(**values) for channel, values in data["channels"].items()},
+            proxy_hash=data["proxy_hash"],
+        )
+
+    def save(self, filepath: Path) -> None:
+        """Store the fingerprint as JSON file.
+
+        Args:
+            filepath: the file to write.
+        """
+        filepath.write_text(json.dumps(self.to_dict(), indent=2, sort_keys=True))
+
+    @classmethod
+    def load(cls, filepath: Path) -> ImageFingerprint:
+        """Load a fingerprint that was stored with `save`.
+
+        Args:
+            filepath: the file to read.
+        """
+        return cls.from_dict(json.loads(filepath.read_text()))
+
+    def describe_difference(self, other: ImageFingerprint) -> list[str]:
+        """Get messages about all differences to the other fingerprint.
+
+        Args:
+            other: the fingerprint to compare with.
+
+        Returns:
+            One message per difference. Empty if both fingerprints are equal.
+        """
+        messages = []
+        if self.region != other.region:
+            messages.append(f"Region {tuple(self.region)} != {tuple(other.region)}")
+        if set(self.channels) != set(other.channels):
+            messages.append(f"Channels {sorted(self.channels)} != {sorted(other.channels)}")
+        messages.extend(
+            f"Statistics of {channel}: {self.channels[channel]} != {other.channels[channel]}"
+            for channel in sorted(set(self.channels) & set(other.channels))
+            if self.channels[channel] != other.channels[channel]
+        )
+        if not messages and self.proxy_hash != other.proxy_hash:
+            messages.append("The proxy images differ.")
+        return messages
+
+
+def compute_fingerprint(
+    node: nuke.Node,
+    channels: Iterable[str] | None = None,
+    region: Region | None = None,
+    frame: int | None = None,
+    graph_hash: str | None = None,
+) -> ImageFingerprint:
+    """Compute the fingerprint of the node.
+
+    Args:
+        node: the node to fingerprint.
+        channels: the channels to include. Defaults to all channels of the node.
+        region: the region to include. Defaults to the bounding box of the node.
+        frame: the frame to fingerprint. Defaults to the current frame.
+        graph_hash: the `hash_node_graph` of the node, if it is already known.
+
+    Returns:
+        The fingerprint of the node.
+    """
+    with at_frame(frame):
+        channels = node.channels() if channels is None else channels
+        region = region or Region.from_bbox(node)
+        layers = sample_layers(node, channels, region, step=PROXY_STEP, graph_hash=graph_hash)
+
+    digest = hashlib.sha1(repr(tuple(region)).encode())
+    statistics = {}
+    for buffer in layers.values():
+        digest.update(repr(buffer.channels).encode())
+        digest.update(buffer.data.tobytes())
+        for index, channel in enumerate(buffer.channels):
+            values = buffer.data[index :: len(buffer.channels)]
+            mean = sum(values) / len(values) if values else 0.0
+            statistics[channel] = ChannelStatistics(
+                minimum=min(values, default=0.0),
+                maximum=max(values, default=0.0),
+                mean=mean,
+                total=mean * region.width * region.height,
+            )
+
+    return ImageFingerprint(region=region, channels=statistics, proxy_hash=digest.hexdigest())
+
+
+def assert_fingerprint(node: nuke.Node, expected: ImageFingerprint | Path, frame: int | None = None) -> None:
+    """Assert that the node matches a stored fingerprint.
+
+    This is a cheap replacement for comparing against a rendered reference image.
+
+    Args:
+        node: the node to check.
+        expected: the expected fingerprint or a file created by `ImageFingerprint.save`.
+        frame: the frame to check. Defaults to the current frame.
+
+    Raises:
+        AssertionError: the fingerprint of the node differs.
+    """
+    if not isinstance(expected, ImageFingerprint):
+        expected = ImageFingerprint.load(expected)
+
+    actual = compute_fingerprint(node, expected.channels, expected.region, frame)
+    messages = expected.describe_difference(actual)
+    if messages:
+        msg = f"Node '{node.name()}' does not match the fingerprint:\n" + "\n".join(messages)
+        raise AssertionError(msg)
@@ -0,0 +1,305 @@
+"""Module for reading image data of nodes into memory."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, NamedTuple, Sequence
+
+import nuke
+
+from nuketesting.bbox_checks.bbox_checker import get_bbox
+from nuketesting.frames import at_frame
+from nuketesting.image_checks.render_cache import DEFAULT_RENDER_CACHE, RenderCache, hash_node_graph
+
+
+class Region(NamedTuple):
+    """Rectangle of pixels in the order left, bottom, right and top.
+
+    The right and top values are exclusive like the values of `nuke.Format.r()` and `nuke.Format.t()`.
+    """
+
+    x: int
+    y: int
+    r: int
+    t: int
+
+    @classmethod
+    def from_format(cls, image_format: nuke.Format) -> Region:
+        """Create the region covered by the format."""
+        return cls(image_format.x(), image_format.y(), image_format.r(), image_format.t())
+
+    @classmethod
+    def from_bbox(cls, node: nuke.Node) -> Region:
+        """Create the region covered by the bounding box of the node."""
+        return cls(*get_bbox(node))
+
+    @property
+    def width(self) -> int:
+        """Width of the region in pixels."""
+        return max(self.r - self.x, 0)
+
+    @property
+    def height(self) -> int:
+        """Height of the region in pixels."""
+        return max(self.t - self.y, 0)
+
+    def union(self, other: Region) -> Region:
+        """Get the smallest region containing both regions."""
+        return Region(min(self.x, other.x), min(self.y, other.y), max(self.r, other.r), max(self.t, other.t))
+
+    def grid(self, step: int) -> tuple[range, range]:
+        """Get the x and y coordinates of the sample points covering the region.
+
+        Every sample point represents a cell of `step` pixels. The points are placed so that
+        the cells cover the full region, even if the region size is not a multiple of `step`.
+
+        Examples:
+            >>> Region(0, 0, 250, 100).grid(100)
+            (range(0, 349, 100), range(0, 199, 100))
+
+        Args:
+            step: distance between sample points in pixels.
+
+        Returns:
+            The x and y coordinates of the sample points.
+        """
+        return range(self.x, self.r + step - 1, step), range(self.y, self.t + step - 1, step)
+
+
+@dataclass(frozen=True)
+class ImageBuffer:
+    """Pixel values of a node stored in a flat array.
+
+    The values are stored row by row, starting at the bottom of the region.
+    Each pixel holds the values of all channels in the order of `channels`.
+    """
+
+    region: Region
+    """The rendered region."""
+    channels: tuple[str, ...]
+    """Names of the channels in the order they are stored per pixel."""
+    step: int
+    """Distance between two sampled pixels. Values greater than one store averaged cells."""
+    data: array
+    """Flat float array of the size height * width * len(channels)."""
+
+    @property
+    def columns(self) -> range:
+        """The x coordinates of the stored pixels."""
+        return self.region.grid(self.step)[0]
+
+    @property
+    def rows(self) -> range:
+        """The y coordinates of the stored pixels."""
+        return self.region.grid(self.step)[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the pixel data in bytes."""
+        return len(self.data) * self.data.itemsize
+
+    def value(self, column: int, row: int, channel: int = 0) -> float:
+        """Get a single value of the buffer.
+
+        Args:
+            column: index of the column counted from the left of the region.
+            row: index of the row counted from the bottom of the region.
+            channel: index of the channel in `channels`.
+
+        Returns:
+            The stored value.
+        """
+        return self.data[(row * len(self.columns) + column) * len(self.channels) + channel]
+
+    def locate(self, index: int) -> tuple[int, int, str]:
+        """Get the pixel coordinates and channel of a position in the flat data.
+
+        Args:
+            index: position in `data`.
+
+        Returns:
+            The x and y coordinate of the sample point and the channel name.
+        """
+        pixel, channel = divmod(index, len(self.channels))
+        row, column = divmod(pixel, len(self.columns))
+        return self.columns[column], self.rows[row], self.channels[channel]
+
+
+def find_first_mismatch(a_buffer: ImageBuffer, b_buffer: ImageBuffer) -> str | None:
+    """Find the first differing value of two buffers with the same layout.
+
+    Args:
+        a_buffer: first buffer.
+        b_buffer: second buffer.
+
+    Returns:
+        A message describing the first mismatch or None if both buffers are equal.
+    """
+    if a_buffer.data == b_buffer.data:
+        return None
+
+    index = next(index for index, (a, b) in enumerate(zip(a_buffer.data, b_buffer.data)) if a != b)
+    point_x, point_y, channel = a_buffer.locate(index)
+    return f"Point({point_x},{point_y}) {channel}: {a_buffer.data[index]} != {b_buffer.data[index]}"
+
+
+def find_first_layer_mismatch(a_layers: dict[str, ImageBuffer], b_layers: dict[str, ImageBuffer]) -> str | None:
+    """Find the first differing value of two sets of layer buffers.
+
+    Args:
+        a_layers: buffers of the first node by layer name.
+        b_layers: buffers of the second node with the same layers and layouts.
+
+    Returns:
+        A message describing the first mismatch or None if all buffers are equal.
+    """
+    for layer, a_buffer in a_layers.items():
+        mismatch = find_first_mismatch(a_buffer, b_layers[layer])
+        if mismatch:
+            return mismatch
+    return None
+
+
+def group_by_layer(channels: Iterable[str]) -> dict[str, tuple[str, ...]]:
+    """Group channel names by their layer.
+
+    Examples:
+        >>> group_by_layer(["rgba.red", "depth.Z", "rgba.alpha", "rgba.green"])
+        {'depth': ('depth.Z',), 'rgba': ('rgba.alpha', 'rgba.green', 'rgba.red')}
+
+    Args:
+        channels: full channel names in the form "layer.channel".
+
+    Returns:
+        The sorted channels of each layer, sorted by layer name.
+    """
+    layers: dict[str, list[str]] = {}
+    for channel in sorted(set(channels)):
+        layers.setdefault(channel.split(".", 1)[0], []).append(channel)
+    return {layer: tuple(layer_channels) for layer, layer_channels in sorted(layers.items())}
+
+
+def render_buffer(  # noqa: PLR0913
+    node: nuke.Node,
+    channels: Sequence[str],
+    region: Region | None = None,
+    step: int = 1,
+    frame: int | None = None,
+    cache: RenderCache | None = DEFAULT_RENDER_CACHE,
+    graph_hash: str | None = None,
+) -> ImageBuffer:
+    """Render the channels of the node into memory.
+
+    Only pixels inside the bounding box of the node are rendered. Everything outside is set to zero.
+    Rendered buffers are stored in the cache and reused for nodes with the same upstream graph.
+
+    Args:
+        node: the node to render.
+        channels: names of the channels to read.
+        region: the region to read. Defaults to the format of the node.
+        step: distance between two samples. Values greater than one average the cell around each sample.
+        frame: the frame to render. Defaults to the current frame.
+        cache: cache for rendered buffers. Use None to always render.
+        graph_hash: the `hash_node_graph` of the node, if it is already known.
+            Hashing reads every knob of the upstream graph, so callers that render a node
+            multiple times should hash it once.
+
+    Returns:
+        The rendered buffer.
+    """
+    channels = tuple(channels)
+    frame = nuke.frame() if frame is None else frame
+    # The bounding box and the format of the node are evaluated at the current frame.
+    with at_frame(frame):
+        image_format = Region.from_format(node.format())
+        region = region or image_format
+
+        key = None
+        if cache is not None:
+            key = (graph_hash or hash_node_graph(node), frame, tuple(region), image_format, channels, step)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        filter_size = step / 2
+        columns, rows = region.grid(step)
+        pixel_size = len(channels)
+        data = array("f", bytes(len(rows) * len(columns) * pixel_size * array("f").itemsize))
+
+        bbox = Region.from_bbox(node)
+        data_columns = _cells_overlapping(columns, bbox.x, bbox.r)
+        for row in _cells_overlapping(rows, bbox.y, bbox.t):
+            point_y = rows[row]
+            offset = (row * len(columns) + data_columns.start) * pixel_size
+            data[offset : offset + len(data_columns) * pixel_size] = array(
+                "f",
+                (
+                    node.sample(channel, columns[column] + 0.5, point_y + 0.5, filter_size, filter_size, frame)
+                    for column in data_columns
+                    for channel in channels
+                ),
+            )
+
+    buffer = ImageBuffer(region=region, channels=channels, step=step, data=data)
+    if cache is not None:
+        cache.put(key, buffer)
+    return buffer
+
+
+def _cells_overlapping(axis: range, start: int, end: int) -> range:
+    """Get the indices of the sample cells along an axis that overlap the pixels from start to end.
+
+    Examples:
+        >>> _cells_overlapping(range(0, 499, 100), 150, 260)
+        range(1, 4)
+
+    Args:
+        axis: sample points along one axis as returned by `Region.grid`.
+        start: first pixel of the span.
+        end: exclusive last pixel of the span.
+
+    Returns:
+        The range of indices of all cells that overlap the span.
+    """
+    half_cell = axis.step / 2
+    first = min(max(math.floor((start - axis.start - 0.5 - half_cell) / axis.step) + 1, 0), len(axis))
+    stop = min(math.ceil((end - axis.start - 0.5 + half_cell) / axis.step), len(axis))
+    return range(first, max(stop, first))
+
+
+def sample_layers(  # noqa: PLR0913
+    node: nuke.Node,
+    channels: Iterable[str],
+    region: Region | None = None,
+    step: int = 1,
+    frame: int | None = None,
+    cache: RenderCache | None = DEFAULT_RENDER_CACHE,
+    graph_hash: str | None = None,
+) -> dict[str, ImageBuffer]:
+    """Sample the channels of the node into one buffer per layer.
+
+    This only changes the layout of the data: the channels of a layer are stored next to each other
+    in a contiguous (H, W, C) buffer. Nuke's Python API reads single values, so every channel of every pixel
+    is still sampled on its own with `render_buffer` and costs as much as sampling the channels one by one.
+
+    Args:
+        node: the node to render.
+        channels: names of the channels to read.
+        region: the region to read. Defaults to the format of the node.
+        step: distance between two samples. Values greater than one average the cell around each sample.
+        frame: the frame to render. Defaults to the current frame.
+        cache: cache for rendered buffers. Use None to always render.
+        graph_hash: the `hash_node_graph` of the node, if it is already known. Otherwise, it is computed once
+            for all layers.
+
+    Returns:
+        The rendered buffer of each layer.
+    """
+    if cache is not None and graph_hash is None:
+        graph_hash = hash_node_graph(node)
+    return {
+        layer: render_buffer(node, layer_channels, region, step, frame, cache, graph_hash)
+        for layer, layer_channels in group_by_layer(channels).items()
+    }
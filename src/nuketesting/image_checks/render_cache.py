@@ -0,0 +1,122 @@
+"""Module for caching rendered image data between comparisons.
+
+Parametrized tests often compare the same upstream node against many variants.
+Instead of rendering that node again for every comparison, the rendered buffers are stored
+under a fingerprint of the node graph and reused as long as the graph did not change.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Hashable
+
+from nuketesting.upstream import is_image_knob, read_upstream_graph
+
+if TYPE_CHECKING:
+    import nuke
+
+    from nuketesting.image_checks.image_buffer import ImageBuffer
+    from nuketesting.upstream import KnobFilter
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def hash_node_graph(node: nuke.Node, knob_filter: KnobFilter = is_image_knob) -> str:
+    """Get a fingerprint of the node and everything upstream of it.
+
+    The fingerprint is the Merkle hash of the upstream graph, see `nuketesting.node_tree_checks.graph`.
+    It contains the class, the knob values and the fingerprints of all inputs. Groups additionally contain
+    the fingerprint of their internal output node. Knobs that only change the appearance in the node graph
+    are ignored, so moving nodes around will keep the fingerprint.
+
+    Notes:
+        Files on disk and expression links to nodes outside the upstream graph are not part
+        of the fingerprint. If those change during the test session, clear the render cache.
+
+    Args:
+        node: the node to fingerprint.
+        knob_filter: decides which knobs are part of the fingerprint. Defaults to all knobs that might
+            change the image.
+
+    Returns:
+        The hex digest of the upstream graph.
+    """
+    return read_upstream_graph(node, knob_filter).get_hash(node.fullName())
+
+
+class RenderCache:
+    """Least recently used cache for rendered image buffers with a byte budget.
+
+    Examples:
+        >>> cache = RenderCache(max_bytes=1024)
+        >>> cache.get("missing") is None
+        True
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Initialize an empty cache.
+
+        Args:
+            max_bytes: the maximum size of all cached buffers together.
+                The least recently used buffers are evicted once the budget is exceeded.
+        """
+        self.max_bytes = max_bytes
+        self._buffers: OrderedDict[Hashable, ImageBuffer] = OrderedDict()
+        self._nbytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes of all cached buffers."""
+        return self._nbytes
+
+    def __len__(self) -> int:
+        """Get the number of cached buffers."""
+        return len(self._buffers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check if a buffer is cached for the key without marking it as used."""
+        return key in self._buffers
+
+    def get(self, key: Hashable) -> ImageBuffer | None:
+        """Get the buffer stored for the key and mark it as recently used.
+
+        Args:
+            key: key of the buffer.
+
+        Returns:
+            The cached buffer or None if nothing is cached for the key.
+        """
+        buffer = self._buffers.get(key)
+        if buffer is not None:
+            self._buffers.move_to_end(key)
+        return buffer
+
+    def put(self, key: Hashable, buffer: ImageBuffer) -> None:
+        """Store the buffer and evict the least recently used ones if the budget is exceeded.
+
+        Buffers that are larger than the whole budget are not stored at all.
+
+        Args:
+            key: key of the buffer.
+            buffer: the rendered buffer.
+        """
+        if key in self._buffers:
+            self._nbytes -= self._buffers.pop(key).nbytes
+
+        if buffer.nbytes > self.max_bytes:
+            return
+
+        self._buffers[key] = buffer
+        self._nbytes += buffer.nbytes
+        while self._nbytes > self.max_bytes:
+            _, evicted = self._buffers.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        """Remove all cached buffers."""
+        self._buffers.clear()
+        self._nbytes = 0
+
+
+DEFAULT_RENDER_CACHE = RenderCache()
+"""Render cache shared by all image checks of the test session."""
@@ -1,58 +1,57 @@
 """Module for in memory pixel comparisons."""
 
-import nuke
+from __future__ import annotations
 
+import types
+from typing import TYPE_CHECKING, Any, Callable
 
-class SampleComparator:
+from nuketesting.image_checks.comparator import ImageComparator, Mismatch
+from nuketesting.image_checks.image_buffer import Region, find_first_layer_mismatch, sample_layers
+
+if TYPE_CHECKING:
+    import nuke
+
+
+class _DefaultInstanceMethod:
+    """Method that is called on a new default instance if it is called on the class.
+
+    Keeps calls like `SampleComparator.assert_equal(node_a, node_b)` working from the time
+    `assert_equal` was a static method.
+    """
+
+    def __init__(self, function: Callable[..., Any]):
+        self._function = function
+        self.__doc__ = function.__doc__
+
+    def __get__(self, instance: object | None, owner: type) -> Callable[..., Any]:
+        return types.MethodType(self._function, owner() if instance is None else instance)
+
+
+class SampleComparator(ImageComparator):
     """Image comparator that uses nuke.sample for processing image data.
 
     This comparison is quite slow. It needs to compute the full image of both nodes.
-    """
+    Only the union of both bounding boxes is compared. Pixels outside the bounding box of a node count as zero.
+    Channels are stored layer by layer. Channels that only exist on one node are reported as structural
+    mismatch and are not compared pixel by pixel.
+    Rendered images are cached, so comparing the same upstream graph multiple times only renders it once.
 
-    def __init__(self):
-        pass
-
-    @staticmethod
-    def assert_equal(node_a: nuke.Node, node_b: nuke.Node) -> None:
-        """Assert that both nodes output the same pixels.
-
-        Args:
-            node_a: first test node.
-            node_b: second test node.
-
-        Raises:
-            AssertionError: the two nodes are not equal based on the testing criteria.
-        """
-        all_channels = set(node_a.channels()).union(node_b.channels())
-        a_format = node_a.format()
-        b_format = node_b.format()
-        assert a_format.x() == b_format.x()
-        assert a_format.y() == b_format.y()
-        assert a_format.r() == b_format.r()
-        assert a_format.t() == b_format.t()
-
-        left = a_format.x()
-        bottom = a_format.y()
-        right = a_format.r()
-        top = a_format.t()
+    `assert_equal` can still be called on the class, which compares with the default settings.
+    """
 
+    assert_equal = _DefaultInstanceMethod(ImageComparator.assert_equal)
+
+    def _find_mismatch(
+        self,
+        node_a: nuke.Node,
+        node_b: nuke.Node,
+        channels: set[str],
+        region: Region,
+        graph_hashes: tuple[str, str],
+    ) -> Mismatch | None:
+        """Compare the images on a grid of averaged cells."""
         slice_w = 100  # px
-        slice_d = slice_w / 2
-        for channel in all_channels:
-            for point_x in range(left, right + slice_w, slice_w):
-                for point_y in range(bottom, top + slice_w, slice_w):
-                    a_sample = node_a.sample(
-                        channel,
-                        point_x + 0.5,
-                        point_y + 0.5,
-                        slice_d,
-                        slice_d,
-                    )
-                    b_sample = node_b.sample(
-                        channel,
-                        point_x + 0.5,
-                        point_y + 0.5,
-                        slice_d,
-                        slice_d,
-                    )
-                    assert a_sample == b_sample, f"Point({point_x},{point_y}): {a_sample} != {b_sample}"
+        a_layers = sample_layers(node_a, channels, region, step=slice_w, graph_hash=graph_hashes[0])
+        b_layers = sample_layers(node_b, channels, region, step=slice_w, graph_hash=graph_hashes[1])
+        message = find_first_layer_mismatch(a_layers, b_layers)
+        return Mismatch(message, a_layers, b_layers) if message else None
@@ -0,0 +1,120 @@
+"""Module for choosing random sample points and estimating mismatch fractions from them.
+
+This module does not need Nuke, so the statistics can be used and tested anywhere.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import random
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from nuketesting.image_checks.image_buffer import Region
+
+SEED_ENV = "NUKE_TESTING_SEED"
+"""Environment variable with a fixed seed to reproduce a failed sampling comparison."""
+
+
+def get_seed(seed: int | None = None) -> int:
+    """Get the seed for a sampling comparison.
+
+    Args:
+        seed: an explicitly configured seed.
+
+    Returns:
+        The configured seed, the seed of the environment or a new random seed.
+    """
+    if seed is not None:
+        return seed
+    environment_seed = os.getenv(SEED_ENV)
+    if environment_seed:
+        return int(environment_seed)
+    return random.SystemRandom().randrange(2**32)
+
+
+def stratified_points(region: Region, budget: int, seed: int) -> list[tuple[int, int]]:
+    """Choose random pixels that are spread evenly over the region.
+
+    The region is split into a grid of about `budget` cells with the aspect ratio of the region.
+    One random pixel is chosen per cell, so every part of the image gets sampled, but
+    the exact pixels change with the seed.
+
+    Args:
+        region: the region to sample.
+        budget: the maximum number of pixels to choose.
+        seed: the seed of the random choice. Equal seeds return equal points.
+
+    Returns:
+        The x and y coordinates of the chosen pixels, sorted row by row.
+    """
+    width = region.width
+    height = region.height
+    if not width or not height or budget < 1:
+        return []
+
+    columns = min(width, max(1, round(math.sqrt(budget * width / height))))
+    rows = min(height, max(1, budget // columns))
+    generator = random.Random(seed)
+    points = []
+    for row in range(rows):
+        bottom = region.y + row * height // rows
+        top = region.y + (row + 1) * height // rows
+        for column in range(columns):
+            left = region.x + column * width // columns
+            right = region.x + (column + 1) * width // columns
+            points.append((generator.randrange(left, right), generator.randrange(bottom, top)))
+    return sorted(points, key=lambda point: (point[1], point[0]))
+
+
+def upper_confidence_bound(mismatches: int, samples: int, confidence: float = 0.95) -> float:
+    """Get the upper bound of the fraction of differing pixels.
+
+    This is the one sided Clopper-Pearson bound: with the given confidence, the true fraction
+    of differing pixels in the image is not bigger than the returned value.
+
+    Examples:
+        >>> round(upper_confidence_bound(0, 1000), 4)
+        0.003
+
+    Args:
+        mismatches: number of differing samples.
+        samples: number of compared samples.
+        confidence: the confidence level between zero and one.
+
+    Returns:
+        The upper bound between zero and one.
+    """
+    if not samples or mismatches >= samples:
+        return 1.0
+
+    alpha = 1 - confidence
+    low, high = mismatches / samples, 1.0
+    for _ in range(60):
+        middle = (low + high) / 2
+        if _binomial_cdf(mismatches, samples, middle) > alpha:
+            low = middle
+        else:
+            high = middle
+    return high
+
+
+def _binomial_cdf(successes: int, trials: int, probability: float) -> float:
+    """Get the probability of at most `successes` in `trials` with the given success probability."""
+    if probability <= 0:
+        return 1.0
+    if probability >= 1:
+        return 0.0
+    log_p = math.log(probability)
+    log_q = math.log1p(-probability)
+    log_trials = math.lgamma(trials + 1)
+    return min(
+        1.0,
+        sum(
+            math.exp(
+                log_trials - math.lgamma(k + 1) - math.lgamma(trials - k + 1) + k * log_p + (trials - k) * log_q,
+            )
+            for k in range(successes + 1)
+        ),
+    )
@@ -0,0 +1,139 @@
+"""Module for fast comparisons of randomly sampled pixels."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Sequence
+
+import nuke
+
+from nuketesting.image_checks.comparator import ImageComparator, Mismatch
+from nuketesting.image_checks.sampling import get_seed, stratified_points, upper_confidence_bound
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from nuketesting.image_checks.image_buffer import Region
+
+
+@dataclass(frozen=True)
+class SamplingResult:
+    """Result of the last comparison of a `SamplingComparator`."""
+
+    seed: int
+    """The seed the sample points were chosen with."""
+    samples: int
+    """Number of compared pixels."""
+    mismatches: int
+    """Number of compared pixels with at least one differing channel."""
+    upper_bound: float
+    """Upper bound of the fraction of differing pixels in the whole image."""
+
+
+class SamplingComparator(ImageComparator):
+    """Image comparator that only compares a random subset of the pixels.
+
+    The pixels are chosen stratified over the union of both bounding boxes, so every part of the image
+    is covered while the exact pixels change with the seed. The cost only depends on the `budget`
+    and not on the image size, which makes this comparator a good fit for quick smoke tests.
+
+    Passing does not prove that the images are equal. The result contains an upper bound of
+    the fraction of differing pixels instead. Failures report the seed, so they can be reproduced
+    with the `seed` argument or the `NUKE_TESTING_SEED` environment variable.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        budget: int = 1000,
+        seed: int | None = None,
+        tolerance: float = 0.0,
+        max_mismatch_fraction: float = 0.0,
+        confidence: float = 0.95,
+        use_fingerprint: bool = False,
+        artifacts_dir: Path | str | None = None,
+    ):
+        """Initialize the comparator.
+
+        Args:
+            budget: maximum number of pixels to compare.
+            seed: seed for choosing the pixels. Defaults to the `NUKE_TESTING_SEED` environment variable
+                or a new random seed for each comparison.
+            tolerance: maximum absolute difference of a channel value that is still considered equal.
+            max_mismatch_fraction: fraction of the sampled pixels that may differ before the comparison fails.
+            confidence: confidence level of the reported upper bound.
+            use_fingerprint: compare the fingerprints of both images before sampling pixels.
+                The fingerprints read every pixel, so the cost depends on the image size again.
+            artifacts_dir: directory for diff artifacts of failed comparisons.
+        """
+        super().__init__(use_fingerprint=use_fingerprint, artifacts_dir=artifacts_dir)
+        self._budget = budget
+        self._seed = seed
+        self._tolerance = tolerance
+        self._max_mismatch_fraction = max_mismatch_fraction
+        self._confidence = confidence
+        self.last_result: SamplingResult | None = None
+        """Statistics of the last pixel comparison."""
+
+    def _find_mismatch(
+        self,
+        node_a: nuke.Node,
+        node_b: nuke.Node,
+        channels: set[str],
+        region: Region,
+        graph_hashes: tuple[str, str],
+    ) -> Mismatch | None:
+        """Compare the channels of randomly chosen pixels."""
+        seed = get_seed(self._seed)
+        points = stratified_points(region, self._budget, seed)
+        channels = sorted(channels)
+        a_values = sample_points(node_a, channels, points)
+        b_values = sample_points(node_b, channels, points)
+
+        pixel_size = len(channels)
+        mismatches = []
+        for index, point in enumerate(points):
+            offset = index * pixel_size
+            for channel_index, channel in enumerate(channels):
+                a = a_values[offset + channel_index]
+                b = b_values[offset + channel_index]
+                if abs(a - b) > self._tolerance:
+                    mismatches.append(f"Point({point[0]},{point[1]}) {channel}: {a} != {b}")
+                    break
+
+        upper_bound = upper_confidence_bound(len(mismatches), len(points), self._confidence)
+        self.last_result = SamplingResult(seed, len(points), len(mismatches), upper_bound)
+        if len(mismatches) <= self._max_mismatch_fraction * len(points):
+            return None
+
+        return Mismatch(
+            f"{len(mismatches)} of {len(points)} sampled pixels differ (seed {seed}). "
+            f"With {self._confidence:.0%} confidence at most {upper_bound:.2%} of the pixels differ. "
+            f"First: {mismatches[0]}"
+        )
+
+
+def sample_points(
+    node: nuke.Node,
+    channels: Sequence[str],
+    points: Sequence[tuple[int, int]],
+    frame: int | None = None,
+) -> array:
+    """Fetch the channel values of single pixels.
+
+    The points should be sorted row by row, so consecutive samples can be answered from Nuke's row cache.
+
+    Args:
+        node: the node to sample.
+        channels: names of the channels to read.
+        points: x and y coordinates of the pixels.
+        frame: the frame to sample. Defaults to the current frame.
+
+    Returns:
+        Flat float array with the values of all channels per point.
+    """
+    frame = nuke.frame() if frame is None else frame
+    return array(
+        "f",
+        (node.sample(channel, x + 0.5, y + 0.5, 0.5, 0.5, frame) for x, y in points for channel in channels),
+    )
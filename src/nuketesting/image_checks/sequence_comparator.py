@@ -0,0 +1,278 @@
+"""Module for comparing animated nodes over a range of frames."""
+
+from __future__ import annotations
+
+import queue
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+import nuke
+
+import nuketesting
+from nuketesting.datamodel.constants import SEQUENCE_WORKER_SCRIPT
+from nuketesting.image_checks.sample_comparator import SampleComparator
+from nuketesting.image_checks.sequence_worker import parse_result
+
+WORKER_TIMEOUT = 600.0
+"""Seconds without any reported frame after which the workers are considered hung."""
+MAX_ERROR_LINES = 20
+"""Number of the last error output lines of each worker that are reported for frames that were not compared."""
+
+
+@dataclass(frozen=True)
+class FrameResult:
+    """Comparison result of a single frame."""
+
+    frame: int
+    """The compared frame."""
+    error: str | None = None
+    """Description of the mismatch. None if both images are equal."""
+
+    @property
+    def passed(self) -> bool:
+        """True if both images are equal at this frame."""
+        return self.error is None
+
+
+class SequenceComparator:
+    """Image comparator for frame ranges.
+
+    By default, frames are compared one after another in the current Nuke session.
+    With more than one worker, a copy of the script is saved to a temporary file and the frames are
+    split between separate Nuke processes that render in parallel. The current script keeps its name.
+
+    Examples:
+        >>> comparator = SequenceComparator(workers=4)
+        >>> comparator.assert_equal(gizmo, reference, range(1001, 1101))
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        nuke_executable: Path | str | None = None,
+        executable_args: list[str] | None = None,
+        timeout: float = WORKER_TIMEOUT,
+    ):
+        """Initialize the comparator.
+
+        Args:
+            workers: number of Nuke processes that render frames in parallel.
+                One compares all frames in the current session.
+            nuke_executable: executable for the worker processes. Defaults to the running Nuke.
+            executable_args: additional arguments for the worker processes, for example a license flag.
+            timeout: seconds without any reported frame after which hung workers are killed.
+        """
+        self._workers = workers
+        self._nuke_executable = nuke_executable
+        self._executable_args = executable_args or []
+        self._timeout = timeout
+
+    def compare(
+        self,
+        node_a: nuke.Node,
+        node_b: nuke.Node,
+        frames: Iterable[int],
+        stop_on_first_failure: bool = False,
+    ) -> Iterator[FrameResult]:
+        """Compare both nodes at all frames and yield the results as soon as they are available.
+
+        Results of parallel workers are yielded in the order the frames finish, not in frame order.
+
+        Args:
+            node_a: first test node.
+            node_b: second test node.
+            frames: the frames to compare.
+            stop_on_first_failure: stop comparing once a frame does not match.
+
+        Yields:
+            The result of each compared frame.
+        """
+        frames = list(frames)
+        if self._workers > 1 and len(frames) > 1:
+            results = self._compare_in_workers(node_a, node_b, frames)
+        else:
+            results = self._compare_in_session(node_a, node_b, frames)
+
+        for result in results:
+            yield result
+            if stop_on_first_failure and not result.passed:
+                results.close()
+                return
+
+    def assert_equal(
+        self,
+        node_a: nuke.Node,
+        node_b: nuke.Node,
+        frames: Iterable[int],
+        stop_on_first_failure: bool = False,
+    ) -> None:
+        """Assert that both nodes output the same pixels at all frames.
+
+        Args:
+            node_a: first test node.
+            node_b: second test node.
+            frames: the frames to compare.
+            stop_on_first_failure: stop comparing once a frame does not match.
+
+        Raises:
+            AssertionError: the nodes are not equal on at least one frame. All failing frames are listed.
+        """
+        failures = sorted(
+            (result for result in self.compare(node_a, node_b, frames, stop_on_first_failure) if not result.passed),
+            key=lambda result: result.frame,
+        )
+        if failures:
+            details = "\n".join(f"Frame {result.frame}: {result.error}" for result in failures)
+            msg = f"Node '{node_a.name()}' and node '{node_b.name()}' differ on {len(failures)} frame(s):\n{details}"
+            raise AssertionError(msg)
+
+    @staticmethod
+    def _compare_in_session(node_a: nuke.Node, node_b: nuke.Node, frames: list[int]) -> Iterator[FrameResult]:
+        """Compare the frames one after another in the current session."""
+        comparator = SampleComparator()
+        for frame in frames:
+            try:
+                comparator.assert_equal(node_a, node_b, frame=frame)
+            except AssertionError as error:  # noqa: PERF203
+                yield FrameResult(frame, str(error) or "Images are not equal.")
+            else:
+                yield FrameResult(frame)
+
+    def _compare_in_workers(self, node_a: nuke.Node, node_b: nuke.Node, frames: list[int]) -> Iterator[FrameResult]:
+        """Compare the frames in parallel Nuke processes.
+
+        Frames are distributed interleaved, so every worker gets early and late frames.
+        Frames that a worker didn't report, for example because it crashed or hung, are reported as failures
+        together with the error output of the workers.
+        """
+        with tempfile.TemporaryDirectory(prefix="nuketesting_") as temp_dir:
+            script = Path(temp_dir) / "sequence.nk"
+            _save_copy(script)
+
+            lines: queue.Queue[str | None] = queue.Queue()
+            workers = [
+                self._start_worker(script, node_a, node_b, frames[index :: self._workers], lines)
+                for index in range(min(self._workers, len(frames)))
+            ]
+            pending = set(frames)
+            timed_out = False
+            try:
+                finished_workers = 0
+                while finished_workers < len(workers):
+                    try:
+                        line = lines.get(timeout=self._timeout)
+                    except queue.Empty:
+                        timed_out = True
+                        break
+                    if line is None:
+                        finished_workers += 1
+                        continue
+                    result = parse_result(line)
+                    if result is not None:
+                        pending.discard(result[0])
+                        yield FrameResult(*result)
+            finally:
+                for worker in workers:
+                    worker.stop()
+
+            if pending:
+                message = _describe_workers(workers, self._timeout if timed_out else None)
+                for frame in sorted(pending):
+                    yield FrameResult(frame, message)
+
+    def _start_worker(
+        self,
+        script: Path,
+        node_a: nuke.Node,
+        node_b: nuke.Node,
+        frames: list[int],
+        lines: queue.Queue[str | None],
+    ) -> _Worker:
+        """Start a worker process and forward its output lines to the queue.
+
+        A None is put into the queue once the worker closed its output.
+        """
+        arguments = [
+            str(self._nuke_executable or nuke.EXE_PATH),
+            *self._executable_args,
+            "-t",
+            str(SEQUENCE_WORKER_SCRIPT),
+            "--packages_directory",
+            str(Path(nuketesting.__file__).parent.parent),
+            "--script",
+            str(script),
+            "--node_a",
+            node_a.fullName(),
+            "--node_b",
+            node_b.fullName(),
+            "--root_name",
+            nuke.root()["name"].value(),
+            "--frames",
+            ",".join(str(frame) for frame in frames),
+        ]
+        process = subprocess.Popen(arguments, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        threading.Thread(target=_forward_lines, args=(process.stdout, lines), daemon=True).start()
+        worker = _Worker(process)
+        worker.error_reader.start()
+        return worker
+
+
+class _Worker:
+    """Worker process that collects its error output in the background."""
+
+    def __init__(self, process: subprocess.Popen):
+        """Initialize the worker.
+
+        Args:
+            process: the started process with piped error output.
+        """
+        self.process = process
+        self.errors: list[str] = []
+        """Lines of the error output."""
+        self.error_reader = threading.Thread(target=self._read_errors, daemon=True)
+
+    def _read_errors(self) -> None:
+        """Collect the error output until the process closes it."""
+        for line in self.process.stderr:
+            self.errors.append(line.rstrip("\n"))
+
+    def stop(self) -> None:
+        """Kill the process if it is still running and wait for the rest of its error output."""
+        self.process.kill()
+        self.process.wait()
+        self.error_reader.join(timeout=1)
+
+
+def _save_copy(script: Path) -> None:
+    """Save the current script to the file without changing the name or the modified state of the session."""
+    root = nuke.root()
+    name = root["name"].value()
+    modified = root.modified()
+    try:
+        nuke.scriptSave(str(script))
+    finally:
+        root["name"].setValue(name)
+        root.setModified(modified)
+
+
+def _describe_workers(workers: list[_Worker], timeout: float | None) -> str:
+    """Describe why frames were not compared, with the exit codes and the last error lines of the workers."""
+    exit_codes = ", ".join(str(worker.process.returncode) for worker in workers)
+    message = f"Frame was not compared. Worker exit codes: {exit_codes}"
+    if timeout is not None:
+        message += f". The workers were killed after {timeout:g} s without a result"
+    errors = [line for worker in workers for line in worker.errors[-MAX_ERROR_LINES:]]
+    if errors:
+        message += "\nWorker errors:\n" + "\n".join(errors)
+    return message
+
+
+def _forward_lines(stream: IO[str], lines: queue.Queue[str | None]) -> None:
+    """Put all lines of the stream into the queue followed by a None."""
+    for line in stream:
+        lines.put(line.rstrip("\n"))
+    lines.put(None)
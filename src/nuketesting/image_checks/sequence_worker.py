@@ -0,0 +1,123 @@
+"""Script that gets executed by nuke to compare frames in a separate process.
+
+This script will be run through the `SequenceComparator` class. It opens a saved copy of the
+script under test, compares the requested frames and prints one result line per frame.
+"""
+# ! It is important here not to import anything not available in default Nuke,
+# ! as this is not bootstrapped yet.
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import NoReturn
+
+RESULT_PREFIX = "NUKE_TESTING_FRAME_RESULT "
+"""Prefix to distinguish result lines from other output of Nuke."""
+
+
+def format_result(frame: int, error: str | None) -> str:
+    """Format the result of a single frame as output line.
+
+    Examples:
+        >>> format_result(1001, None)
+        'NUKE_TESTING_FRAME_RESULT {"frame": 1001, "error": null}'
+
+    Args:
+        frame: the compared frame.
+        error: the assertion message or None if the frame matched.
+    """
+    return RESULT_PREFIX + json.dumps({"frame": frame, "error": error})
+
+
+def parse_result(line: str) -> tuple[int, str | None] | None:
+    """Parse a line of the worker output.
+
+    Examples:
+        >>> parse_result('NUKE_TESTING_FRAME_RESULT {"frame": 3, "error": "Point(0,0)"}')
+        (3, 'Point(0,0)')
+        >>> parse_result("Nuke 15.1v1, 64 bit") is None
+        True
+
+    Args:
+        line: one line of the worker output.
+
+    Returns:
+        The frame and the error message or None if the line is no result.
+    """
+    if not line.startswith(RESULT_PREFIX):
+        return None
+    data = json.loads(line[len(RESULT_PREFIX) :])
+    return int(data["frame"]), data["error"]
+
+
+def _compare_frames(  # noqa: PLR0913
+    packages_directory: str,
+    script: str,
+    node_a: str,
+    node_b: str,
+    frames: list[int],
+    root_name: str | None = None,
+) -> None:
+    """Compare the frames of both nodes and print the results.
+
+    Args:
+        packages_directory: directories that should be added to the PATH with necessary python packages.
+        script: the nuke script containing both nodes.
+        node_a: full name of the first node.
+        node_b: full name of the second node.
+        frames: the frames to compare.
+        root_name: name of the original script, so paths relative to the script directory resolve like in
+            the original session.
+    """
+    sys.path.extend(packages_directory.split(";"))
+
+    import nuke
+
+    from nuketesting.image_checks.sample_comparator import SampleComparator
+
+    nuke.scriptOpen(script)
+    if root_name:
+        nuke.root()["name"].setValue(root_name)
+    comparator = SampleComparator()
+    for frame in frames:
+        try:
+            comparator.assert_equal(nuke.toNode(node_a), nuke.toNode(node_b), frame=frame)
+        except AssertionError as error:  # noqa: PERF203
+            print(format_result(frame, str(error) or "Images are not equal."), flush=True)  # noqa: T201
+        else:
+            print(format_result(frame, None), flush=True)  # noqa: T201
+
+
+def _parse_args(args: list[str]) -> argparse.Namespace:
+    """Parse provided arguments."""
+    parser = argparse.ArgumentParser(
+        prog="NukeSequenceWorker",
+        description="Internal CLI interface to compare frames in Nuke. Do not use this directly.",
+    )
+    parser.add_argument("--packages_directory")
+    parser.add_argument("--script")
+    parser.add_argument("--node_a")
+    parser.add_argument("--node_b")
+    parser.add_argument("--root_name", default=None)
+    parser.add_argument("--frames", type=lambda frames: [int(frame) for frame in frames.split(",")])
+    return parser.parse_args(args)
+
+
+def main() -> NoReturn:
+    """Main sequence worker entrypoint."""
+    parsed_arguments = _parse_args(sys.argv[1:])
+    _compare_frames(
+        packages_directory=parsed_arguments.packages_directory,
+        script=parsed_arguments.script,
+        node_a=parsed_arguments.node_a,
+        node_b=parsed_arguments.node_b,
+        frames=parsed_arguments.frames,
+        root_name=parsed_arguments.root_name,
+    )
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
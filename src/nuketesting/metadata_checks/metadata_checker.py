@@ -0,0 +1,186 @@
+"""Module for comparing the metadata of nodes over frame ranges."""
+
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable
+
+import nuke
+
+from nuketesting.datamodel.constants import UPDATE_SNAPSHOTS_ENV
+from nuketesting.image_checks.render_cache import hash_node_graph
+from nuketesting.metadata_checks.metadata_diff import (
+    VOLATILE_KEYS,
+    FrameMetadata,
+    diff_metadata,
+    filter_keys,
+    load_metadata,
+    save_metadata,
+)
+
+
+class MetadataCache:
+    """Least recently used cache for the metadata of nodes by graph fingerprint and frame.
+
+    Reading large EXR headers is slow, so the metadata of a node is only read once per frame
+    as long as the upstream graph of the node did not change.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        """Initialize the cache.
+
+        Args:
+            max_entries: maximum number of stored frames of all nodes.
+        """
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, int], dict[str, Any]] = OrderedDict()
+
+    def get(self, key: tuple[str, int]) -> dict[str, Any] | None:
+        """Get the stored metadata and mark it as recently used."""
+        metadata = self._entries.get(key)
+        if metadata is not None:
+            self._entries.move_to_end(key)
+        return metadata
+
+    def put(self, key: tuple[str, int], metadata: dict[str, Any]) -> None:
+        """Store metadata and remove the least recently used entries above the limit."""
+        self._entries[key] = metadata
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+DEFAULT_METADATA_CACHE = MetadataCache()
+
+
+def collect_metadata(
+    node: nuke.Node,
+    frames: Iterable[int] | None = None,
+    cache: MetadataCache | None = DEFAULT_METADATA_CACHE,
+) -> FrameMetadata:
+    """Read the metadata of the node for all frames.
+
+    The metadata is read with the time argument of `nuke.Node.metadata`, so the current frame
+    of the script never changes. Frames that are in the cache are not read again.
+
+    Args:
+        node: the node to read.
+        frames: the frames to read. Defaults to the current frame.
+        cache: cache for the read metadata. Use None to always read.
+
+    Returns:
+        The metadata of each frame.
+    """
+    frames = [nuke.frame()] if frames is None else list(frames)
+    graph_hash = hash_node_graph(node) if cache is not None else ""
+    metadata = {}
+    for frame in frames:
+        frame_metadata = cache.get((graph_hash, frame)) if cache is not None else None
+        if frame_metadata is None:
+            frame_metadata = dict(node.metadata(time=frame))
+            if cache is not None:
+                cache.put((graph_hash, frame), frame_metadata)
+        metadata[frame] = frame_metadata
+    return metadata
+
+
+def _collect_filtered(
+    node: nuke.Node,
+    frames: Iterable[int] | None,
+    include: Iterable[str] | None,
+    exclude: Iterable[str],
+) -> FrameMetadata:
+    """Read the metadata of the node and filter the keys of all frames."""
+    include = None if include is None else list(include)
+    exclude = list(exclude)
+    return {
+        frame: filter_keys(metadata, include, exclude) for frame, metadata in collect_metadata(node, frames).items()
+    }
+
+
+def assert_same_metadata(  # noqa: PLR0913
+    node_a: nuke.Node,
+    node_b: nuke.Node,
+    frames: Iterable[int] | None = None,
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] = VOLATILE_KEYS,
+    tolerance: float = 0.0,
+) -> None:
+    """Assert that both nodes have the same metadata at all frames.
+
+    Args:
+        node_a: first node.
+        node_b: second node.
+        frames: the frames to compare. Defaults to the current frame.
+        include: glob patterns of the keys to compare, like "exr/*". Defaults to all keys.
+        exclude: glob patterns of the keys to ignore. Defaults to file modification times.
+        tolerance: maximum absolute difference of numbers that are still considered equal.
+
+    Raises:
+        AssertionError: the metadata of both nodes differs.
+    """
+    frames = None if frames is None else list(frames)
+    messages = diff_metadata(
+        _collect_filtered(node_a, frames, include, exclude),
+        _collect_filtered(node_b, frames, include, exclude),
+        tolerance,
+    )
+    if messages:
+        msg = f"Node '{node_a.name()}' and node '{node_b.name()}' have different metadata:\n" + "\n".join(messages)
+        raise AssertionError(msg)
+
+
+def assert_metadata_matches(  # noqa: PLR0913
+    node: nuke.Node,
+    expected: FrameMetadata | Path | str,
+    frames: Iterable[int] | None = None,
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] = VOLATILE_KEYS,
+    tolerance: float = 0.0,
+    update: bool | None = None,
+) -> None:
+    """Assert that the metadata of the node matches stored metadata.
+
+    Args:
+        node: the node to check.
+        expected: the expected metadata by frame or a file created by `save_metadata`.
+        frames: the frames to check. Defaults to the frames of the expected metadata.
+        include: glob patterns of the keys to compare, like "exr/*". Defaults to all keys.
+        exclude: glob patterns of the keys to ignore. Defaults to file modification times.
+        tolerance: maximum absolute difference of numbers that are still considered equal.
+        update: write the metadata of the node into the expected file instead of comparing it.
+            Defaults to the `NUKE_TESTING_UPDATE_SNAPSHOTS` environment variable.
+
+    Raises:
+        AssertionError: the metadata differs from the expected metadata.
+    """
+    if not isinstance(expected, dict):
+        filepath = Path(expected)
+        if update is None:
+            update = os.getenv(UPDATE_SNAPSHOTS_ENV) == "1"
+        if update:
+            save_metadata(_collect_filtered(node, frames, include, exclude), filepath)
+            return
+        if not filepath.exists():
+            msg = f"The metadata file '{filepath}' does not exist. Set {UPDATE_SNAPSHOTS_ENV}=1 to create it."
+            raise AssertionError(msg)
+        expected = load_metadata(filepath)
+
+    frames = sorted(expected) if frames is None else list(frames)
+    include = None if include is None else list(include)
+    exclude = list(exclude)
+    expected = {frame: filter_keys(values, include, exclude) for frame, values in expected.items() if frame in frames}
+    actual = _collect_filtered(node, frames, include, exclude)
+    messages = diff_metadata(expected, actual, tolerance)
+    if messages:
+        msg = f"Node '{node.name()}' does not match the expected metadata:\n" + "\n".join(messages)
+        raise AssertionError(msg)
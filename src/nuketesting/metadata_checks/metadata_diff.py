@@ -0,0 +1,122 @@
+"""Module for filtering, storing and comparing metadata of multiple frames.
+
+Metadata of a frame range is stored as dictionary of frame to metadata dictionary.
+This module does not need Nuke, so stored metadata can be compared anywhere.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Any, Dict, Iterable
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+FrameMetadata = Dict[int, Dict[str, Any]]
+"""Metadata dictionaries by frame."""
+
+VOLATILE_KEYS = ("input/ctime", "input/mtime", "input/atime")
+"""Keys that change without a change of the image, like file modification times."""
+
+
+def filter_keys(
+    metadata: dict[str, Any],
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] = VOLATILE_KEYS,
+) -> dict[str, Any]:
+    """Get the metadata with matching keys only.
+
+    Examples:
+        >>> filter_keys({"exr/owner": "me", "input/mtime": 1, "input/width": 64}, include=["exr/*", "input/*"])
+        {'exr/owner': 'me', 'input/width': 64}
+
+    Args:
+        metadata: the metadata to filter.
+        include: glob patterns of the keys to keep. Defaults to all keys.
+        exclude: glob patterns of the keys to remove. Defaults to keys that change with every file write.
+
+    Returns:
+        The filtered metadata.
+    """
+    include = None if include is None else list(include)
+    exclude = list(exclude)
+    return {
+        key: value
+        for key, value in metadata.items()
+        if (include is None or any(fnmatchcase(key, pattern) for pattern in include))
+        and not any(fnmatchcase(key, pattern) for pattern in exclude)
+    }
+
+
+def diff_metadata(expected: FrameMetadata, actual: FrameMetadata, tolerance: float = 0.0) -> list[str]:
+    """Get messages about all differences between the metadata of two frame ranges.
+
+    Args:
+        expected: the expected metadata by frame.
+        actual: the actual metadata by frame.
+        tolerance: maximum absolute difference of numbers that are still considered equal.
+            Lists of numbers, like matrices, are compared element by element.
+
+    Returns:
+        One message per differing key and frame. Empty if both are equal.
+    """
+    messages = []
+    if sorted(expected) != sorted(actual):
+        messages.append(f"Frames {sorted(expected)} != {sorted(actual)}")
+
+    for frame in sorted(set(expected) & set(actual)):
+        expected_frame = expected[frame]
+        actual_frame = actual[frame]
+        messages.extend(
+            f"Frame {frame}: missing key '{key}'" for key in sorted(set(expected_frame) - set(actual_frame))
+        )
+        messages.extend(f"Frame {frame}: new key '{key}'" for key in sorted(set(actual_frame) - set(expected_frame)))
+        messages.extend(
+            f"Frame {frame} '{key}': {expected_frame[key]!r} != {actual_frame[key]!r}"
+            for key in sorted(set(expected_frame) & set(actual_frame))
+            if not values_equal(expected_frame[key], actual_frame[key], tolerance)
+        )
+    return messages
+
+
+def values_equal(a: Any, b: Any, tolerance: float = 0.0) -> bool:
+    """Check if two metadata values are equal.
+
+    Examples:
+        >>> values_equal([1.0, 2.0], (1.0, 2.0001), tolerance=0.001)
+        True
+
+    Args:
+        a: first value.
+        b: second value.
+        tolerance: maximum absolute difference of numbers that are still considered equal.
+    """
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b or math.isclose(a, b, rel_tol=0.0, abs_tol=tolerance)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(values_equal(x, y, tolerance) for x, y in zip(a, b))
+    return a == b
+
+
+def save_metadata(metadata: FrameMetadata, filepath: Path) -> None:
+    """Store metadata of multiple frames as JSON file.
+
+    Values that are not supported by JSON are stored as text.
+
+    Args:
+        metadata: the metadata by frame.
+        filepath: the file to write.
+    """
+    content = {str(frame): values for frame, values in sorted(metadata.items())}
+    filepath.write_text(json.dumps(content, indent=2, sort_keys=True, default=str))
+
+
+def load_metadata(filepath: Path) -> FrameMetadata:
+    """Load metadata that was stored with `save_metadata`.
+
+    Args:
+        filepath: the file to read.
+    """
+    return {int(frame): values for frame, values in json.loads(filepath.read_text()).items()}
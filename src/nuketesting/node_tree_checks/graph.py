@@ -0,0 +1,225 @@
+"""Module with a lightweight model of a node graph and a Merkle hash based diff.
+
+The model only stores what defines the result of a node: its class, the knob values that differ from
+the defaults and its inputs. Every node gets a hash of this data and the hashes of its inputs, so
+two subtrees with the same hash are equal and do not need to be compared node by node.
+
+This module does not need Nuke, so stored graphs can be compared anywhere.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@dataclass(frozen=True)
+class GraphNode:
+    """A single node of the graph."""
+
+    name: str
+    """Full name of the node relative to the read group."""
+    node_class: str
+    """The class of the node."""
+    knobs: dict[str, str] = field(default_factory=dict)
+    """Script values of all knobs that differ from their default, without the knobs of the node graph UI."""
+    inputs: tuple[str | None, ...] = ()
+    """Names of the connected input nodes. Disconnected inputs are None."""
+    outputs: tuple[str, ...] = ()
+    """Names of the internal output nodes if the node is a group."""
+
+    @property
+    def dependencies(self) -> tuple[str | None, ...]:
+        """The inputs followed by the internal output nodes."""
+        return self.inputs + self.outputs
+
+
+@dataclass
+class NodeGraph:
+    """All nodes of a graph by their name.
+
+    The hashes are computed once on first use. Do not change the nodes after comparing the graph.
+    """
+
+    nodes: dict[str, GraphNode] = field(default_factory=dict)
+    """The nodes by their name."""
+    _hashes: dict[str, str] | None = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_nodes(cls, nodes: Iterable[GraphNode]) -> NodeGraph:
+        """Create a graph from its nodes."""
+        return cls({node.name: node for node in nodes})
+
+    @property
+    def roots(self) -> list[str]:
+        """Names of all nodes that are no dependency of another node, sorted by name."""
+        used = {dependency for node in self.nodes.values() for dependency in node.dependencies}
+        return sorted(name for name in self.nodes if name not in used)
+
+    def get_hash(self, name: str) -> str:
+        """Get the Merkle hash of a node.
+
+        The hash contains the class, the knob values and the hashes of all dependencies.
+        Names are not part of the hash, so renamed copies of a subtree have the same hash.
+
+        Args:
+            name: name of the node.
+
+        Returns:
+            The hex digest of the node and everything upstream of it.
+        """
+        if self._hashes is None:
+            self._hashes = _compute_hashes(self.nodes)
+        return self._hashes[name]
+
+    def to_dict(self) -> dict:
+        """Convert the graph into a JSON serializable dictionary."""
+        return {
+            name: {key: value for key, value in asdict(node).items() if key != "name"}
+            for name, node in self.nodes.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> NodeGraph:
+        """Create a graph from a dictionary created by `to_dict`."""
+        return cls.from_nodes(
+            GraphNode(
+                name=name,
+                node_class=values["node_class"],
+                knobs=values["knobs"],
+                inputs=tuple(values["inputs"]),
+                outputs=tuple(values["outputs"]),
+            )
+            for name, values in data.items()
+        )
+
+    def save(self, filepath: Path) -> None:
+        """Store the graph as JSON file.
+
+        Args:
+            filepath: the file to write.
+        """
+        filepath.write_text(json.dumps(self.to_dict(), indent=1, sort_keys=True))
+
+    @classmethod
+    def load(cls, filepath: Path) -> NodeGraph:
+        """Load a graph that was stored with `save`.
+
+        Args:
+            filepath: the file to read.
+        """
+        return cls.from_dict(json.loads(filepath.read_text()))
+
+
+def _compute_hashes(nodes: dict[str, GraphNode]) -> dict[str, str]:
+    """Compute the Merkle hashes of all nodes in a single pass.
+
+    Dependencies are visited with an explicit stack, so deep graphs do not hit the recursion limit.
+    Dependencies outside the graph and cycles are hashed by name.
+    """
+    hashes: dict[str, str] = {}
+    in_progress: set[str] = set()
+    for start in nodes:
+        stack = [start]
+        while stack:
+            name = stack[-1]
+            if name in hashes:
+                stack.pop()
+                continue
+
+            node = nodes[name]
+            missing = [
+                dependency
+                for dependency in node.dependencies
+                if dependency in nodes and dependency not in hashes and dependency not in in_progress
+            ]
+            if missing:
+                in_progress.add(name)
+                stack.extend(missing)
+                continue
+
+            stack.pop()
+            in_progress.discard(name)
+            digest = hashlib.sha1(node.node_class.encode())
+            for knob, value in sorted(node.knobs.items()):
+                digest.update(f"\0{knob}={value}".encode())
+            for dependency in node.dependencies:
+                dependency_hash = hashes.get(dependency, f"external:{dependency}") if dependency else "-"
+                digest.update(f"\0<{dependency_hash}".encode())
+            hashes[name] = digest.hexdigest()
+    return hashes
+
+
+def diff_graphs(
+    graph_a: NodeGraph,
+    graph_b: NodeGraph,
+    roots: Iterable[tuple[str, str]] | None = None,
+) -> list[str]:
+    """Get messages about all differences between two graphs.
+
+    The graphs are walked from the roots upstream. Nodes are paired by the input they are connected to,
+    so renamed nodes are still compared with each other. Pairs with the same hash are equal including
+    everything upstream of them and are skipped without visiting their subtrees.
+
+    Args:
+        graph_a: first graph.
+        graph_b: second graph.
+        roots: pairs of nodes to start from. Defaults to the roots of both graphs paired by name.
+
+    Returns:
+        One message per difference. Empty if both graphs are equal.
+    """
+    messages = []
+    if roots is None:
+        roots_a = graph_a.roots
+        roots_b = graph_b.roots
+        messages.extend(f"Only in first graph: '{name}'" for name in roots_a if name not in roots_b)
+        messages.extend(f"Only in second graph: '{name}'" for name in roots_b if name not in roots_a)
+        roots = [(name, name) for name in roots_a if name in roots_b]
+
+    visited = set()
+    stack = list(reversed(list(roots)))
+    while stack:
+        pair = stack.pop()
+        if pair in visited:
+            continue
+        visited.add(pair)
+        name_a, name_b = pair
+        if graph_a.get_hash(name_a) == graph_b.get_hash(name_b):
+            continue
+
+        node_a = graph_a.nodes[name_a]
+        node_b = graph_b.nodes[name_b]
+        messages.extend(_diff_nodes(node_a, node_b))
+        upstream = [
+            (dependency_a, dependency_b)
+            for dependency_a, dependency_b in zip(node_a.dependencies, node_b.dependencies)
+            if dependency_a in graph_a.nodes and dependency_b in graph_b.nodes
+        ]
+        stack.extend(reversed(upstream))
+    return messages
+
+
+def _diff_nodes(node_a: GraphNode, node_b: GraphNode) -> list[str]:
+    """Get messages about the differences of two single nodes without their dependencies."""
+    label = node_a.name if node_a.name == node_b.name else f"{node_a.name}' / '{node_b.name}"
+    if node_a.node_class != node_b.node_class:
+        return [f"Node '{label}': class {node_a.node_class} != {node_b.node_class}"]
+
+    messages = [
+        f"Node '{label}': knob {knob} {node_a.knobs.get(knob, '<default>')} != {node_b.knobs.get(knob, '<default>')}"
+        for knob in sorted(set(node_a.knobs) | set(node_b.knobs))
+        if node_a.knobs.get(knob) != node_b.knobs.get(knob)
+    ]
+    connected_a = [dependency is not None for dependency in node_a.inputs]
+    connected_b = [dependency is not None for dependency in node_b.inputs]
+    if connected_a != connected_b:
+        messages.append(f"Node '{label}': connected inputs {connected_a} != {connected_b}")
+    if len(node_a.outputs) != len(node_b.outputs):
+        messages.append(f"Node '{label}': {len(node_a.outputs)} != {len(node_b.outputs)} output nodes")
+    return messages
@@ -0,0 +1,229 @@
+"""Module for reading .nk scripts and .gizmo files without Nuke.
+
+The parser reads the script line by line and builds a `NodeGraph`, so structural checks like
+node classes, knob values and connections run in plain python without a Nuke license.
+Nuke only writes knobs that differ from their default, which matches the knobs of graphs read
+with `nuketesting.node_tree_checks.tree_comparator.read_node_graph`.
+
+Supported are nodes, clones, groups and gizmos and the stack commands `set`, `push` and `[stack n]`
+that Nuke uses to describe the connections. Expressions are not evaluated and the root settings
+are not part of the graph.
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from nuketesting.datamodel.constants import UI_KNOBS
+from nuketesting.node_tree_checks.graph import GraphNode, NodeGraph
+
+GROUP_CLASSES = frozenset({"Group", "Gizmo", "LiveGroup"})
+"""Classes whose internal nodes follow the node definition until `end_group`."""
+
+IGNORED_COMMANDS = frozenset({"version", "define_window_layout_xml", "add_layer", "Root"})
+"""Commands of the script that do not create nodes."""
+
+_SPECIAL_CHARACTERS = re.compile(r'[\\{}"]')
+_STACK_REFERENCE = re.compile(r"\[stack (\d+)\]")
+
+
+def parse_script(filepath: Path | str) -> NodeGraph:
+    """Read the node graph of a .nk script or .gizmo file.
+
+    Args:
+        filepath: the file to read.
+
+    Returns:
+        The graph with the full names of all nodes, including the nodes inside groups.
+    """
+    with Path(filepath).open(encoding="utf-8") as file:
+        return parse_script_lines(file)
+
+
+def parse_script_lines(lines: Iterable[str]) -> NodeGraph:
+    """Read the node graph from the lines of a script.
+
+    Args:
+        lines: the lines of the script including their line endings.
+
+    Returns:
+        The graph with the full names of all nodes, including the nodes inside groups.
+    """
+    builder = _GraphBuilder()
+    for command in split_commands(lines):
+        builder.run(command)
+    return NodeGraph(builder.nodes)
+
+
+def split_commands(lines: Iterable[str]) -> Iterator[str]:
+    """Split the lines of a script into commands.
+
+    A command ends at the end of a line unless a brace or quote is still open or the line ends with a backslash.
+    Comments and empty lines are skipped.
+
+    Examples:
+        >>> list(split_commands(["Blur {\\n", " size 10\\n", "}\\n", "# comment\\n", "push 0\\n"]))
+        ['Blur {\\n size 10\\n}', 'push 0']
+
+    Args:
+        lines: the lines to split, including their line endings.
+
+    Yields:
+        The stripped text of each command.
+    """
+    pending: list[str] = []
+    depth = 0
+    in_quote = False
+    for line in lines:
+        if not pending and (not line.strip() or line.lstrip().startswith("#")):
+            continue
+
+        pending.append(line)
+        escaped = -1
+        for match in _SPECIAL_CHARACTERS.finditer(line):
+            character = match.group()
+            if match.start() == escaped:
+                continue
+            if character == "\\":
+                escaped = match.end()
+            elif character == '"' and not depth:
+                in_quote = not in_quote
+            elif character == "{" and not in_quote:
+                depth += 1
+            elif character == "}" and not in_quote:
+                depth -= 1
+
+        continued = escaped == len(line.rstrip("\r\n"))
+        if depth <= 0 and not in_quote and not continued:
+            yield "".join(pending).strip()
+            pending = []
+            depth = 0
+
+    if pending:
+        yield "".join(pending).strip()
+
+
+def parse_knobs(body: str) -> dict[str, str]:
+    """Read the knob values of a node definition.
+
+    Examples:
+        >>> parse_knobs(" inputs 0\\n size {{curve x1 0 x10 5}}\\n name Blur1\\n")
+        {'inputs': '0', 'size': '{curve x1 0 x10 5}', 'name': 'Blur1'}
+
+    Args:
+        body: the text between the braces of the node definition.
+
+    Returns:
+        The script values of all knobs by name. Repeated knobs like `addUserKnob` are joined by new lines.
+    """
+    knobs: dict[str, str] = {}
+    for command in split_commands(body.splitlines(keepends=True)):
+        name, _, value = command.partition(" ")
+        value = _unwrap_braces(value.strip())
+        knobs[name] = f"{knobs[name]}\n{value}" if name in knobs else value
+    return knobs
+
+
+def _unwrap_braces(value: str) -> str:
+    """Remove the outer braces if the whole value is a single braced word."""
+    if not value.startswith("{") or not value.endswith("}"):
+        return value
+    depth = 0
+    escaped = -1
+    for match in _SPECIAL_CHARACTERS.finditer(value):
+        if match.start() == escaped:
+            continue
+        character = match.group()
+        if character == "\\":
+            escaped = match.end()
+        elif character == "{":
+            depth += 1
+        elif character == "}":
+            depth -= 1
+            if not depth:
+                return value[1:-1] if match.end() == len(value) else value
+    return value
+
+
+def _count_inputs(value: str) -> int:
+    """Get the number of inputs of an `inputs` knob value like "2" or "1+1" for an additional mask input."""
+    return sum(int(part) for part in value.split("+"))
+
+
+class _GraphBuilder:
+    """Executes the commands of a script on a stack of nodes, like Nuke does while loading it."""
+
+    def __init__(self):
+        self.nodes: dict[str, GraphNode] = {}
+        self._stack: list[str | None] = []
+        self._variables: dict[str, str | None] = {}
+        self._groups: list[tuple[str, list[str | None], list[str]]] = []
+        self._prefix = ""
+
+    def run(self, command: str) -> None:
+        """Execute a single command."""
+        head, _, rest = command.partition(" ")
+        rest = rest.strip()
+        if head == "set":
+            self._set_variable(rest)
+        elif head == "push":
+            self._stack.append(self._variables.get(rest[1:]) if rest.startswith("$") else None)
+        elif head == "end_group":
+            self._end_group()
+        elif head not in IGNORED_COMMANDS and rest.endswith("}"):
+            self._create_node(head, rest)
+
+    def _set_variable(self, arguments: str) -> None:
+        """Store a node of the stack in a variable, for example `set N1234 [stack 0]`."""
+        name, _, value = arguments.partition(" ")
+        match = _STACK_REFERENCE.fullmatch(value.strip())
+        index = int(match.group(1)) if match else 0
+        self._variables[name] = self._stack[-1 - index] if index < len(self._stack) else None
+
+    def _create_node(self, head: str, rest: str) -> None:
+        """Create a node from a definition like `Blur {...}`, `clone $C1234 {...}` or `clone id Blur {...}`."""
+        definition, _, body = rest.partition("{")
+        knobs = parse_knobs(body[: body.rfind("}")])
+        node_class = head
+        if head == "clone":
+            reference = definition.split()
+            original = self.nodes.get(self._variables.get(reference[0][1:])) if reference[0].startswith("$") else None
+            node_class = original.node_class if original else reference[-1]
+            knobs = {**original.knobs, **knobs} if original else knobs
+
+        inputs = [self._stack.pop() if self._stack else None for _ in range(_count_inputs(knobs.get("inputs", "1")))]
+        name = self._prefix + (knobs.get("name") or self._unique_name(node_class))
+        self.nodes[name] = GraphNode(
+            name=name,
+            node_class=node_class,
+            knobs={knob: value for knob, value in knobs.items() if knob not in UI_KNOBS and knob != "inputs"},
+            inputs=tuple(inputs),
+        )
+        if node_class == "Output" and self._groups:
+            self._groups[-1][2].append(name)
+
+        if node_class in GROUP_CLASSES:
+            self._groups.append((name, self._stack, []))
+            self._stack = []
+            self._prefix = f"{name}."
+        else:
+            self._stack.append(name)
+
+    def _end_group(self) -> None:
+        """Finish the innermost group and continue with the stack outside of it."""
+        if not self._groups:
+            return
+        name, self._stack, outputs = self._groups.pop()
+        self._prefix = f"{self._groups[-1][0]}." if self._groups else ""
+        group = self.nodes[name]
+        self.nodes[name] = GraphNode(group.name, group.node_class, group.knobs, group.inputs, tuple(sorted(outputs)))
+        self._stack.append(name)
+
+    def _unique_name(self, node_class: str) -> str:
+        """Get a name for nodes without name knob like the top level node of gizmo files."""
+        index = 1
+        while f"{self._prefix}{node_class}{index}" in self.nodes:
+            index += 1
+        return f"{node_class}{index}"
@@ -0,0 +1,90 @@
+"""Module for comparing node graphs of Nuke scripts."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import nuke
+
+from nuketesting.node_tree_checks.graph import NodeGraph, diff_graphs
+from nuketesting.upstream import read_graph_node, read_upstream_graph
+
+
+def read_node_graph(group: nuke.Node | None = None) -> NodeGraph:
+    """Read all nodes inside a group, including nested groups.
+
+    Args:
+        group: the group or gizmo to read. Defaults to the root of the script.
+
+    Returns:
+        The graph with node names relative to the group.
+    """
+    group = group or nuke.root()
+    prefix = f"{group.fullName()}."
+    return NodeGraph.from_nodes(
+        read_graph_node(node, prefix=prefix) for node in nuke.allNodes(group=group, recurseGroups=True)
+    )
+
+
+class NodeTreeComparator:
+    """Comparator for node graphs.
+
+    Every node gets a Merkle hash of its class, its non default knob values and the hashes of its inputs.
+    Equal subtrees are detected by their hash and skipped, so only the differing parts of two graphs are
+    walked and reported. Knobs that only change the appearance in the node graph are ignored.
+    """
+
+    def assert_equal(self, node_a: nuke.Node, node_b: nuke.Node) -> None:
+        """Assert that both nodes and everything upstream of them are equal.
+
+        Node names are ignored, only classes, knob values and connections are compared.
+
+        Args:
+            node_a: first node.
+            node_b: second node.
+
+        Raises:
+            AssertionError: the upstream graphs differ.
+        """
+        messages = diff_graphs(
+            read_upstream_graph(node_a),
+            read_upstream_graph(node_b),
+            roots=[(node_a.fullName(), node_b.fullName())],
+        )
+        if messages:
+            msg = f"Node '{node_a.name()}' and node '{node_b.name()}' differ:\n" + "\n".join(messages)
+            raise AssertionError(msg)
+
+    def assert_same_group(self, group_a: nuke.Node, group_b: nuke.Node) -> None:
+        """Assert that the content of both groups is equal.
+
+        This can be used to compare a gizmo with the group it was created from.
+
+        Args:
+            group_a: first group or gizmo.
+            group_b: second group or gizmo.
+
+        Raises:
+            AssertionError: the content of the groups differs.
+        """
+        messages = diff_graphs(read_node_graph(group_a), read_node_graph(group_b))
+        if messages:
+            msg = f"Group '{group_a.name()}' and group '{group_b.name()}' differ:\n" + "\n".join(messages)
+            raise AssertionError(msg)
+
+    def assert_matches(self, expected: NodeGraph | Path | str, group: nuke.Node | None = None) -> None:
+        """Assert that the content of a group matches a stored graph.
+
+        Args:
+            expected: the expected graph or a file created by `NodeGraph.save`.
+            group: the group or gizmo to check. Defaults to the root of the script.
+
+        Raises:
+            AssertionError: the content of the group differs from the stored graph.
+        """
+        if not isinstance(expected, NodeGraph):
+            expected = NodeGraph.load(Path(expected))
+        messages = diff_graphs(expected, read_node_graph(group))
+        if messages:
+            msg = "The node graph does not match the expected graph:\n" + "\n".join(messages)
+            raise AssertionError(msg)
@@ -0,0 +1,158 @@
+"""Module for the agent of distributed test runs.
+
+An agent runs on a host with a Nuke license. It waits for shards of test files from a coordinator,
+runs them with its local `Runner` and streams the results back while the tests are running.
+See `nuketesting.runner.protocol` for the messages.
+"""
+
+from __future__ import annotations
+
+import hmac
+import json
+import os
+import socketserver
+import tempfile
+import threading
+import traceback
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+from nuketesting.runner.protocol import DEFAULT_PORT, HEARTBEAT_INTERVAL, receive_message, send_message
+from nuketesting.runner.report import REPORT_ENV_FILE, TestResult, read_results
+
+if TYPE_CHECKING:
+    from nuketesting.runner.runner import Runner
+
+INTERNAL_ERROR_EXIT_CODE = 3
+"""Exit code of pytest for internal errors. Used if the runner itself fails."""
+
+_ENVIRONMENT_LOCK = threading.Lock()
+"""The report file is passed to the runner through the environment, so agents of one process take turns."""
+
+
+class _Server(socketserver.TCPServer):
+    """TCP server that can bind the port again directly after a restart of the agent."""
+
+    allow_reuse_address = True
+
+
+class Agent:
+    """Server that runs the shards of coordinators with a local runner.
+
+    Examples:
+        >>> agent = Agent(Runner("/usr/local/Nuke15.1v1/Nuke15.1"), host="", port=8765, token="secret")
+        >>> agent.serve_forever()
+    """
+
+    def __init__(
+        self,
+        runner: Runner,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        token: str | None = None,
+    ):
+        """Initialize the agent and bind its port.
+
+        Args:
+            runner: the runner that executes the tests.
+            host: the interface to listen on. Defaults to localhost, use "" for all interfaces.
+            port: the port to listen on. Use 0 for any free port.
+            heartbeat_interval: seconds between two messages while no test finishes.
+            token: secret that coordinators need to send before they can run tests.
+                Any coordinator that reaches the port can run tests without a token.
+        """
+        self._runner = runner
+        self._token = token
+        self._heartbeat_interval = heartbeat_interval
+        agent = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                agent.handle_connection(self.rfile, self.wfile)
+
+        self._server = _Server((host, port), _Handler)
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """The host and port the agent listens on."""
+        return self._server.server_address[:2]
+
+    def serve_forever(self) -> None:
+        """Handle coordinators until `shutdown` is called."""
+        with self._server:
+            self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        """Stop serving. Must be called from another thread than `serve_forever`."""
+        self._server.shutdown()
+
+    def handle_connection(self, reader: IO[bytes], writer: IO[bytes]) -> None:
+        """Run all shards that are sent over the connection until the coordinator disconnects.
+
+        Args:
+            reader: the readable stream of the connection.
+            writer: the writable stream of the connection.
+        """
+        if self._token is not None and not self._authenticate(receive_message(reader)):
+            return
+        while True:
+            message = receive_message(reader)
+            if message is None:
+                return
+            if message.get("type") == "run":
+                self._run_shard(message, writer)
+
+    def _authenticate(self, message: dict | None) -> bool:
+        """Check that the first message of a connection contains the token of the agent."""
+        if message is None or message.get("type") != "auth" or not isinstance(message.get("token"), str):
+            return False
+        return hmac.compare_digest(message["token"].encode(), self._token.encode())
+
+    def _run_shard(self, message: dict, writer: IO[bytes]) -> None:
+        """Run the tests of the shard and send the results of each finished test."""
+        shard_id = message["shard"]
+        paths = message["paths"]
+        pytest_args = message.get("pytest_args", [])
+        exit_codes = []
+
+        with _ENVIRONMENT_LOCK, tempfile.TemporaryDirectory(prefix="nuketesting_agent_") as directory:
+            report_file = Path(directory) / "report.jsonl"
+            previous_report_file = os.environ.get(REPORT_ENV_FILE)
+            os.environ[REPORT_ENV_FILE] = str(report_file)
+
+            def run() -> None:
+                try:
+                    exit_codes.append(self._runner.execute_tests(paths[0], [*paths[1:], *pytest_args]))
+                except Exception:  # noqa: BLE001
+                    exit_codes.append(INTERNAL_ERROR_EXIT_CODE)
+                    error = TestResult(", ".join(paths), outcome="error", message=traceback.format_exc())
+                    with report_file.open("a") as report:
+                        report.write(json.dumps(error.to_dict()) + "\n")
+
+            worker = threading.Thread(target=run, name=f"NukeTestingShard{shard_id}", daemon=True)
+            worker.start()
+            try:
+                self._stream_results(shard_id, worker, report_file, writer)
+            finally:
+                # Wait for the tests even if the coordinator disconnected, so shards never run concurrently.
+                worker.join()
+                if previous_report_file is None:
+                    os.environ.pop(REPORT_ENV_FILE, None)
+                else:
+                    os.environ[REPORT_ENV_FILE] = previous_report_file
+
+        send_message(writer, {"type": "done", "shard": shard_id, "exit_code": exit_codes[0]})
+
+    def _stream_results(self, shard_id: int, worker: threading.Thread, report_file: Path, writer: IO[bytes]) -> None:
+        """Send the results of the report file until the worker finished."""
+        offset = 0
+        finished = False
+        while not finished:
+            worker.join(self._heartbeat_interval)
+            finished = not worker.is_alive()
+            results, offset = read_results(report_file, offset)
+            for result in results:
+                send_message(writer, {"type": "result", "shard": shard_id, "result": result.to_dict()})
+            if not results and not finished:
+                send_message(writer, {"type": "heartbeat", "shard": shard_id})
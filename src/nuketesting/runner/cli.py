@@ -2,14 +2,35 @@
 
 from __future__ import annotations
 
+import os
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import NoReturn
+from typing import Iterator, Mapping, NoReturn
 
 import click
 
+from nuketesting.benchmark.script_load import SCRIPT_SUFFIX
+from nuketesting.runner.agent import Agent
 from nuketesting.runner.configuration import find_configuration, load_runners
+from nuketesting.runner.coordinator import Coordinator, Shard, collect_test_files, split_into_shards
+from nuketesting.runner.history import DEFAULT_HISTORY_FILE, DEFAULT_WINDOW, RunHistory, format_stats
+from nuketesting.runner.manifest import (
+    TestManifest,
+    collect_static,
+    find_rootdir,
+    get_manifest_info,
+    read_manifest,
+)
+from nuketesting.runner.ordering import DEFAULT_STATE_FILE, ORDER_MODES, get_order_info
+from nuketesting.runner.profiling import PROFILE_MODES, get_profile_info
+from nuketesting.runner.protocol import AGENT_TOKEN_ENV, DEFAULT_PORT, parse_address
+from nuketesting.runner.report import REPORT_ENV_FILE, read_results
+from nuketesting.runner.retry import get_retry_info
 from nuketesting.runner.runner import Runner
 
 
@@ -40,6 +61,18 @@ class CLIRunArguments:
     """Optional name of a runner to run. This will only run the runner with the name."""
     run_in_terminal_mode: bool = True
     """Run tests in Nuke using the native terminal mode or using the current Python interpreter."""
+    profile: str | None = None
+    """Optional profiler to run for each test. One of "cprofile" or "sampling"."""
+    profile_dir: Path = Path("profiles")
+    """Directory for the profiles of each test."""
+    history: Path | None = None
+    """Optional SQLite database to store the results of the run in."""
+    order: str | None = None
+    """Optional ordering of the tests. One of "failed-first" or "last-failed"."""
+    state_file: Path | None = None
+    """Optional file to store the failed tests in for ordering the next run."""
+    retries: int = 0
+    """Number of times a failed test is run again in the same Nuke process."""
 
     def __post_init__(self) -> None:
         """Post initialize checks for the arguments."""
@@ -49,11 +82,106 @@ class CLIRunArguments:
             self.test_directory = Path(self.test_directory)
         if self.config:
             self.config = Path(self.config)
+        self.profile_dir = Path(self.profile_dir)
+        if self.history:
+            self.history = Path(self.history)
+        if self.state_file:
+            self.state_file = Path(self.state_file)
 
 
 def _run_tests(arguments: CLIRunArguments) -> NoReturn:
     """Execute the provided arguments.
 
+    Arguments: dataclass containing all passed cli arguments to run
+    """
+    runner = _get_runner(arguments)
+    environment = get_retry_info(arguments.retries)
+    if arguments.order or arguments.state_file:
+        environment.update(get_order_info(arguments.state_file or DEFAULT_STATE_FILE, arguments.order))
+    environment.update(_get_profile_environment(arguments))
+    with _temporary_environment(environment):
+        if arguments.history:
+            exit_code = _execute_and_record(runner, arguments)
+        else:
+            exit_code = runner.execute_tests(arguments.test_directory)
+    sys.exit(exit_code)
+
+
+def _get_profile_environment(arguments: CLIRunArguments) -> dict[str, str]:
+    """Get the profile configuration, which reaches Nuke through the environment like the debug configuration."""
+    if not arguments.profile:
+        return {}
+    return get_profile_info(arguments.profile, arguments.profile_dir)
+
+
+@contextmanager
+def _temporary_environment(values: Mapping[str, str]) -> Iterator[None]:
+    """Set the environment variables for the duration of the context."""
+    previous_values = {name: os.environ.get(name) for name in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for name, value in previous_values.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _execute_and_record(runner: Runner, arguments: CLIRunArguments) -> int:
+    """Execute the tests and store their results in the history.
+
+    The results are collected with the report plugin, which reaches Nuke through the environment.
+    An already configured report file is extended as usual.
+
+    Returns:
+        The exit code of the test run.
+    """
+    with tempfile.TemporaryDirectory(prefix="nuketesting_") as directory:
+        configured_report_file = os.environ.get(REPORT_ENV_FILE)
+        report_file = Path(configured_report_file or Path(directory) / "report.jsonl")
+        offset = report_file.stat().st_size if report_file.exists() else 0
+        with _temporary_environment({REPORT_ENV_FILE: str(report_file)}):
+            exit_code = runner.execute_tests(arguments.test_directory)
+        results, _ = read_results(report_file, offset)
+
+    with RunHistory(arguments.history) as history:
+        history.record_run(results, exit_code)
+    return exit_code
+
+
+def _collect_manifest(arguments: CLIRunArguments, files: list[Path], in_nuke: bool = True) -> TestManifest:
+    """Collect the test ids of the test files without running them.
+
+    The test ids are collected statically. Only the files that can't be collected statically are collected by
+    pytest in Nuke, with the runner of the arguments.
+
+    Args:
+        arguments: dataclass containing all passed cli arguments.
+        files: the absolute paths of the test files.
+        in_nuke: collect the dynamic files in Nuke. Otherwise, they are left in the dynamic files of the manifest.
+
+    Returns:
+        The test ids by file.
+    """
+    manifest = collect_static(files, find_rootdir(arguments.test_directory))
+    if not in_nuke or not manifest.dynamic_files:
+        return manifest
+
+    runner = _get_runner(arguments)
+    paths = [str(file) for file in manifest.dynamic_files]
+    with tempfile.TemporaryDirectory(prefix="nuketesting_") as directory:
+        manifest_file = Path(directory) / "manifest.txt"
+        with _temporary_environment(get_manifest_info(manifest_file)):
+            runner.execute_tests(paths[0], [*paths[1:], "--collect-only", "-q"])
+        manifest.add_collected(read_manifest(manifest_file))
+    return manifest
+
+
+def _get_runner(arguments: CLIRunArguments) -> Runner:
+    """Get the runner for the provided arguments.
+
     Arguments: dataclass containing all passed cli arguments to run
     """
     if not arguments.nuke_executable and not arguments.runner_name:
@@ -62,13 +190,11 @@ def _run_tests(arguments: CLIRunArguments) -> NoReturn:
         raise RUNNER_AND_EXE_PROVIDED_ERROR
 
     if arguments.nuke_executable:
-        runner = Runner(
+        return Runner(
             arguments.nuke_executable,
             pytest_args=arguments.pytest_args,
             run_in_terminal_mode=arguments.run_in_terminal_mode,
         )
-        sys.exit(runner.execute_tests(arguments.test_directory))
-        return  # Unreachable but required for unittest which won't exit with sys.exit.
 
     search_start = Path(str(arguments.test_directory).split("::")[0])
     config = arguments.config or find_configuration(search_start)
@@ -82,15 +208,13 @@ def _run_tests(arguments: CLIRunArguments) -> NoReturn:
         raise CLICommandError(msg) from e
 
     try:
-        runner = runners[arguments.runner_name]
+        return runners[arguments.runner_name]
     except KeyError as e:
         msg = f"Runner '{arguments.runner_name}' not found. Available runners: {','.join(runners)} "
         raise CLICommandError(msg) from e
 
-    sys.exit(runner.execute_tests(arguments.test_directory))
-
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option(
     "--nuke-executable",
     "-n",
@@ -141,13 +265,68 @@ def _run_tests(arguments: CLIRunArguments) -> NoReturn:
     multiple=True,
     help="Specify an arg to forward to pytest. You can add as many of these as you want.",
 )
+@click.option(
+    "--profile",
+    "profile",
+    required=False,
+    type=click.Choice(PROFILE_MODES),
+    help="Profile each test inside Nuke. 'sampling' has a low overhead, "
+    "'cprofile' records every function call. The hottest functions are printed after the tests.",
+)
+@click.option(
+    "--profile-dir",
+    "profile_dir",
+    default="profiles",
+    type=click.Path(),
+    help="Directory for the profile files of each test. This defaults to 'profiles'.",
+)
+@click.option(
+    "--order",
+    "order",
+    required=False,
+    type=click.Choice(ORDER_MODES),
+    help="Reorder the tests by the results of the previous runs. 'failed-first' runs the previously failed tests "
+    "and the tests of changed files first, 'last-failed' only runs the previously failed tests.",
+)
+@click.option(
+    "--state-file",
+    "state_file",
+    default=None,
+    type=click.Path(),
+    help="File that stores the failed tests for the next run. The failed tests are only recorded if this "
+    f"or the order option is given. This defaults to '{DEFAULT_STATE_FILE}' for ordered runs.",
+)
+@click.option(
+    "--retries",
+    "retries",
+    default=0,
+    type=click.IntRange(min=0),
+    help="Run failed tests again up to this many times in the same Nuke process. "
+    "Tests can override it with the 'nuke_retries' marker. Tests that pass on a retry are reported as flaky.",
+)
+@click.option(
+    "--history",
+    "history",
+    default=None,
+    type=click.Path(),
+    help="SQLite database to store the results of the run in, for example "
+    f"'{DEFAULT_HISTORY_FILE}'. Runs are only recorded if this is given.",
+)
+@click.pass_context
 def main(  # noqa: PLR0913
+    context: click.Context,
     nuke_executable: click.Path,
     test_path: click.Path,
     config: click.Path,
     terminal: bool,
     pytest_arg: list,
     runner_name: str,
+    profile: str | None,
+    profile_dir: click.Path,
+    order: str | None,
+    state_file: click.Path | None,
+    retries: int,
+    history: click.Path | None,
 ) -> NoReturn:
     """Nuke Test Runner CLI Interface.
 
@@ -173,6 +352,30 @@ def main(  # noqa: PLR0913
 
     NukeTestrunner --runner-name nuke15 --test-path /tests
 
+    To distribute the tests over multiple hosts, start an agent on each host
+    and send the tests to the agents with the `distribute` command.
+    Both commands read the shared token from the NUKE_TESTING_AGENT_TOKEN environment variable:
+
+    NukeTestrunner --runner-name nuke15 agent --host 0.0.0.0 --port 8765
+
+    NukeTestrunner --test-path /shared/tests distribute --agent farm01:8765 --agent farm02:8765
+
+    Store the results of the runs in a local database with the `history` option. Show the slowest,
+    slowed down and flaky tests of the latest runs with the `stats` command:
+
+    NukeTestrunner --runner-name nuke15 --history .benchmarks/history.db --test-path /tests
+
+    NukeTestrunner --history .benchmarks/history.db stats
+
+    List the test ids without running the tests with the `collect` command. Most tests are found without starting
+    Nuke, only tests that are generated at runtime are collected in Nuke:
+
+    NukeTestrunner --runner-name nuke15 --test-path /tests collect
+
+    Measure the load time, memory and first render time of scripts with the `profile-scripts` command:
+
+    NukeTestrunner --runner-name nuke15 profile-scripts ./templates --workers 2
+
     """
     try:
         test_run_arguments = CLIRunArguments(
@@ -182,13 +385,228 @@ def main(  # noqa: PLR0913
             run_in_terminal_mode=terminal,
             pytest_args=tuple(pytest_arg),
             runner_name=runner_name,
+            profile=profile,
+            profile_dir=profile_dir,
+            history=history,
+            order=order,
+            state_file=state_file,
+            retries=retries,
         )
+        if context.invoked_subcommand:
+            context.obj = test_run_arguments
+            return
         _run_tests(test_run_arguments)
 
     except CLICommandError as e:
-        context = click.get_current_context()
-        context.fail(f"{e!s}\n\nCheck out the help above for additional support.")
-        context.exit()
+        _fail(e)
+
+
+@main.command()
+@click.option(
+    "--host",
+    default="127.0.0.1",
+    help='Interface to listen on. This defaults to localhost. Use "0.0.0.0" to accept coordinators of other hosts.',
+)
+@click.option("--port", default=DEFAULT_PORT, type=int, help=f"Port to listen on. This defaults to {DEFAULT_PORT}.")
+@click.option(
+    "--token",
+    envvar=AGENT_TOKEN_ENV,
+    default=None,
+    help=f"Secret that coordinators need to send. This defaults to the {AGENT_TOKEN_ENV} environment variable.",
+)
+@click.pass_obj
+def agent(arguments: CLIRunArguments, host: str, port: int, token: str | None) -> None:
+    """Run tests that a coordinator sends over the network.
+
+    The tests are executed with the runner that is selected with the
+    `nuke-executable` or `runner-name` options of the main command.
+    Every coordinator that reaches the agent can run code on this host,
+    so only listen on other interfaces than localhost together with a token.
+    """
+    try:
+        runner = _get_runner(arguments)
+    except CLICommandError as e:
+        _fail(e)
+        return
+    test_agent = Agent(runner, host=host, port=port, token=token)
+    click.echo("Agent listening on {}:{}".format(*test_agent.address))
+    if token is None and host not in ("127.0.0.1", "localhost", "::1"):
+        click.echo("Warning: the agent accepts tests of every coordinator without a token.", err=True)
+    with _temporary_environment(_get_profile_environment(arguments)):
+        test_agent.serve_forever()
+
+
+@main.command()
+@click.option(
+    "--agent",
+    "-a",
+    "agents",
+    multiple=True,
+    required=True,
+    help="Address of an agent as host:port. You can add as many of these as you want.",
+)
+@click.option(
+    "--shards",
+    "shard_count",
+    type=int,
+    default=None,
+    help="Number of shards to split the test files into. This defaults to four shards per agent.",
+)
+@click.option(
+    "--token",
+    envvar=AGENT_TOKEN_ENV,
+    default=None,
+    help=f"Secret of the agents. This defaults to the {AGENT_TOKEN_ENV} environment variable.",
+)
+@click.pass_obj
+def distribute(arguments: CLIRunArguments, agents: tuple[str], shard_count: int | None, token: str | None) -> NoReturn:
+    """Split the test files into shards and run them on agents.
+
+    All agents need to reach the tests of the `test-path` under the same path.
+    The durations of earlier runs in the history and the statically collected tests are used to balance the shards.
+    Files without any test are not sent to the agents.
+    """
+    durations = {}
+    if arguments.history and arguments.history.exists():
+        with RunHistory(arguments.history) as history:
+            durations = history.get_durations()
+    manifest = _collect_manifest(arguments, collect_test_files(arguments.test_directory), in_nuke=False)
+    files = [file for file, test_ids in manifest.test_ids.items() if test_ids] + manifest.dynamic_files
+    shards = split_into_shards(files, shard_count or 4 * len(agents), durations, manifest.test_ids)
+    coordinator = Coordinator(
+        [parse_address(address) for address in agents], pytest_args=arguments.pytest_args, token=token
+    )
+    run = coordinator.run(shards, on_result=lambda result: click.echo(f"{result.outcome.upper():<8} {result.nodeid}"))
+    click.echo(run.get_summary())
+    if arguments.history:
+        with RunHistory(arguments.history) as history:
+            history.record_run(run.results, run.exit_code)
+    sys.exit(run.exit_code)
+
+
+@main.command()
+@click.option(
+    "--static-only",
+    is_flag=True,
+    help="Don't start Nuke for the files whose tests are generated at runtime. They are listed separately.",
+)
+@click.pass_obj
+def collect(arguments: CLIRunArguments, static_only: bool) -> None:
+    """Print the ids of all tests of the `test-path` without running them.
+
+    The test modules are parsed instead of imported, so most tests are found without starting Nuke.
+    Parametrize ids are resolved if the parameters are literals. Files with computed parameters,
+    parametrized fixtures or inherited tests are collected by pytest in Nuke, with the runner
+    that is selected with the `nuke-executable` or `runner-name` options of the main command.
+    """
+    start = time.perf_counter()
+    try:
+        manifest = _collect_manifest(arguments, collect_test_files(arguments.test_directory), in_nuke=not static_only)
+    except CLICommandError as e:
+        _fail(e)
+        return
+    test_ids = manifest.all_test_ids
+    for test_id in test_ids:
+        click.echo(test_id)
+    if manifest.dynamic_files:
+        click.echo("\nFiles whose tests are only collected in Nuke:")
+        for file in manifest.dynamic_files:
+            click.echo(f"  {file}")
+    click.echo(f"\n{len(test_ids)} tests collected in {time.perf_counter() - start:.2f}s")
+
+
+@main.command()
+@click.option("--limit", default=10, type=int, help="Maximum number of tests per table. This defaults to 10.")
+@click.option(
+    "--runs",
+    "window",
+    default=DEFAULT_WINDOW,
+    type=int,
+    help=f"Number of latest runs to consider. This defaults to {DEFAULT_WINDOW}.",
+)
+@click.pass_obj
+def stats(arguments: CLIRunArguments, limit: int, window: int) -> None:
+    """Show the slowest tests, the biggest slowdowns and the flaky tests of the latest runs.
+
+    Use the `runner-name` option of the main command to only consider the results of one runner.
+    """
+    if not arguments.history:
+        _fail(CLICommandError("No history given. Pass the database of the recorded runs with the history option."))
+        return
+    if not arguments.history.exists():
+        _fail(CLICommandError(f"No history found at '{arguments.history}'."))
+        return
+    with RunHistory(arguments.history) as history:
+        click.echo(format_stats(history, limit, window, arguments.runner_name))
+
+
+@main.command("profile-scripts")
+@click.argument("scripts", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--workers",
+    "-w",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Number of Nuke processes that load the scripts in parallel. This defaults to 1.",
+)
+@click.option("--no-render", is_flag=True, help="Don't render the first frame of the Write nodes.")
+@click.option("--update", is_flag=True, help="Store the measurements as new baselines instead of comparing them.")
+@click.pass_obj
+def profile_scripts(
+    arguments: CLIRunArguments, scripts: tuple[str], workers: int, no_render: bool, update: bool
+) -> None:
+    """Load Nuke scripts in Nuke and fail if their loading got slower than the baseline.
+
+    SCRIPTS are .nk files or directories that are searched for .nk files.
+    Every script is loaded repeatedly to measure the load time, node count and memory increase.
+    Afterward, the first frame of its Write nodes is rendered into a temporary directory.
+    The `pytest-arg` options of the main command are forwarded, for example to set the
+    `--benchmark-baseline` file or the `--script-max-memory` limit.
+    """
+    try:
+        runner = _get_runner(arguments)
+    except CLICommandError as e:
+        _fail(e)
+        return
+    if workers > 1 and not runner.run_in_terminal_mode:
+        _fail(CLICommandError("Multiple workers require the terminal mode."))
+        return
+
+    pytest_args = ["-p", "nuketesting.benchmark.script_plugin"]
+    if no_render:
+        pytest_args.append("--script-no-render")
+    if update:
+        pytest_args.append("--benchmark-update")
+    paths = _collect_scripts(scripts)
+    if not paths:
+        _fail(CLICommandError("No Nuke scripts found."))
+        return
+    shards = split_into_shards(paths, workers)
+
+    def run(shard: Shard) -> int:
+        return runner.execute_tests(shard.paths[0], [*shard.paths[1:], *pytest_args])
+
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        exit_codes = list(executor.map(run, shards))
+    # Processes that were killed by a signal have negative exit codes.
+    failed = [code if code > 0 else 1 for code in exit_codes if code]
+    sys.exit(failed[0] if failed else 0)
+
+
+def _collect_scripts(scripts: tuple[str]) -> list[Path]:
+    """Get the absolute paths of the scripts and of all scripts in the directories."""
+    paths = []
+    for script in scripts:
+        path = Path(script).absolute()
+        paths.extend(sorted(path.rglob(f"*{SCRIPT_SUFFIX}")) if path.is_dir() else [path])
+    return paths
+
+
+def _fail(error: CLICommandError) -> None:
+    """Print the error with the help of the current command and exit."""
+    context = click.get_current_context()
+    context.fail(f"{error!s}\n\nCheck out the help above for additional support.")
+    context.exit()
 
 
 if __name__ == "__main__":
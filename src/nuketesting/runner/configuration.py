@@ -47,6 +47,7 @@ def load_runners(filepath: Path) -> dict[str, Runner]:
                 executable_args=config.get("args"),
                 pytest_args=config.get("pytest_args"),
                 run_in_terminal_mode=config.get("run_in_terminal_mode", True),
+                name=name,
             )
         except RunnerException as err:  # noqa: PERF203
             print(f"Skipping config '{name}' because of Error: {err}")  # noqa: T201
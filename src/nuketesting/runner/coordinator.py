@@ -0,0 +1,315 @@
+"""Module for distributing test runs over multiple agents.
+
+The coordinator splits the test files into shards and sends them to agents, see `nuketesting.runner.agent`.
+Every agent works on one shard at a time and gets the next shard once it is done, so fast agents run more shards.
+If an agent disconnects or stops responding, its current shard is sent to another agent.
+
+Test paths are sent as absolute paths, so all agents need to reach the tests under the same path,
+for example on a shared network storage.
+"""
+
+from __future__ import annotations
+
+import socket
+import statistics
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import IO, TYPE_CHECKING, Callable, Iterable, Mapping, Sequence
+
+from nuketesting.runner.protocol import AGENT_TIMEOUT, ProtocolError, receive_message, send_message
+from nuketesting.runner.report import TestResult
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+TEST_FILE_PATTERNS = ("test_*.py", "*_test.py")
+"""File name patterns of test files, the same as the defaults of pytest."""
+
+NO_TESTS_COLLECTED_EXIT_CODE = 5
+"""Exit code of pytest if a shard did not contain any test."""
+
+
+@dataclass
+class Shard:
+    """Test files that run together on one agent."""
+
+    shard_id: int
+    """Unique number of the shard."""
+    paths: list[str]
+    """Absolute paths of the test files."""
+    attempts: int = 0
+    """Number of agents that were lost while running the shard."""
+
+
+@dataclass
+class DistributedRun:
+    """Results of a distributed test run."""
+
+    results: list[TestResult] = field(default_factory=list)
+    """Results of all tests of completed shards."""
+    exit_codes: dict[int, int] = field(default_factory=dict)
+    """Exit code of each completed shard by shard id."""
+    unfinished: list[Shard] = field(default_factory=list)
+    """Shards that could not be completed by any agent."""
+    lost_agents: list[str] = field(default_factory=list)
+    """Addresses of agents that disconnected or stopped responding."""
+
+    @property
+    def exit_code(self) -> int:
+        """Zero if all shards completed and no test failed, otherwise one."""
+        failed = any(result.outcome in ("failed", "error") for result in self.results)
+        shard_failed = any(code not in (0, NO_TESTS_COLLECTED_EXIT_CODE) for code in self.exit_codes.values())
+        return 1 if failed or shard_failed or self.unfinished else 0
+
+    def get_summary(self) -> str:
+        """Get a summary of all failures and the number of tests per outcome."""
+        lines = [
+            f"{result.outcome.upper()} {result.nodeid}\n{result.message}"
+            for result in self.results
+            if result.outcome in ("failed", "error")
+        ]
+        lines.extend(f"Shard {shard.shard_id} was not completed: {', '.join(shard.paths)}" for shard in self.unfinished)
+        lines.extend(f"Lost agent {address}" for address in self.lost_agents)
+        counts: dict[str, int] = {}
+        for result in self.results:
+            counts[result.outcome] = counts.get(result.outcome, 0) + 1
+        lines.append(", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items())) or "no tests ran")
+        return "\n".join(lines)
+
+
+def collect_test_files(test_path: Path) -> list[Path]:
+    """Find all test files like pytest does.
+
+    Args:
+        test_path: a test file or a directory that is searched recursively.
+
+    Returns:
+        The absolute paths of the test files, sorted by path.
+    """
+    test_path = test_path.absolute()
+    if test_path.is_file():
+        return [test_path]
+    files = {path for pattern in TEST_FILE_PATTERNS for path in test_path.rglob(pattern)}
+    return sorted(path for path in files if not any(part.startswith(".") for part in path.relative_to(test_path).parts))
+
+
+def estimate_durations(
+    files: Sequence[Path], durations: Mapping[str, float], test_ids: Mapping[Path, Sequence[str]] | None = None
+) -> dict[Path, float]:
+    """Estimate the duration of each test file from the durations of its tests.
+
+    Args:
+        files: the absolute paths of the test files.
+        durations: duration of earlier runs by test id, see `nuketesting.runner.history`.
+            Test ids start with the path of the file relative to the pytest rootdir.
+        test_ids: the current test ids by file, see `nuketesting.runner.manifest`. Tests without earlier runs
+            get the average duration of the known tests, and tests that were removed are not counted.
+
+    Returns:
+        The duration of each file with known tests.
+    """
+    file_durations: dict[str, dict[str, float]] = {}
+    for test_id, duration in durations.items():
+        relative_path, _, name = test_id.partition("::")
+        file_durations.setdefault(relative_path, {})[name] = duration
+    average = statistics.mean(durations.values()) if durations else 0.0
+    estimates = {}
+    for file in files:
+        posix_path = file.as_posix()
+        known = [
+            tests
+            for relative_path, tests in file_durations.items()
+            if posix_path == relative_path or posix_path.endswith(f"/{relative_path}")
+        ]
+        if not known:
+            continue
+        tests = max(known, key=lambda tests: sum(tests.values()))
+        if test_ids and file in test_ids:
+            names = [test_id.partition("::")[2] for test_id in test_ids[file]]
+            estimates[file] = sum(tests.get(name, average) for name in names)
+        else:
+            estimates[file] = sum(tests.values())
+    return estimates
+
+
+def split_into_shards(
+    files: Sequence[Path],
+    count: int,
+    durations: Mapping[str, float] | None = None,
+    test_ids: Mapping[Path, Sequence[str]] | None = None,
+) -> list[Shard]:
+    """Split the test files into shards of similar duration.
+
+    The durations of earlier runs are used to estimate the duration of a file. Files without earlier runs get
+    the average duration of the known files. Without any known file, the number of tests is used as estimate
+    if the test ids are known, otherwise the file size. Files are assigned from longest to shortest to the shard
+    with the lowest total.
+
+    Args:
+        files: the test files.
+        count: the maximum number of shards.
+        durations: duration of earlier runs by test id.
+        test_ids: the current test ids by file, see `nuketesting.runner.manifest`.
+
+    Returns:
+        The non-empty shards, longest first.
+    """
+    estimates = estimate_durations(files, durations or {}, test_ids)
+    if estimates:
+        average = statistics.mean(estimates.values())
+        costs = {file: estimates.get(file, average) for file in files}
+    elif test_ids:
+        average = statistics.mean(len(ids) for ids in test_ids.values())
+        costs = {file: float(len(test_ids[file])) if file in test_ids else average for file in files}
+    else:
+        costs = {file: float(file.stat().st_size) for file in files}
+
+    shards = [Shard(shard_id, []) for shard_id in range(max(count, 1))]
+    totals = [0.0] * len(shards)
+    for file in sorted(files, key=lambda file: costs[file], reverse=True):
+        index = totals.index(min(totals))
+        shards[index].paths.append(str(file))
+        totals[index] += costs[file]
+    return [shard for shard in shards if shard.paths]
+
+
+class Coordinator:
+    """Distributes shards over agents and collects their results.
+
+    Examples:
+        >>> coordinator = Coordinator([("farm001", 8765), ("farm002", 8765)])
+        >>> run = coordinator.run(split_into_shards(collect_test_files(Path("tests")), count=8))
+        >>> print(run.get_summary())
+    """
+
+    def __init__(
+        self,
+        agents: Iterable[tuple[str, int]],
+        pytest_args: Sequence[str] = (),
+        timeout: float = AGENT_TIMEOUT,
+        max_attempts: int = 3,
+        token: str | None = None,
+    ):
+        """Initialize the coordinator.
+
+        Args:
+            agents: host and port of each agent.
+            pytest_args: arguments that are forwarded to pytest on every agent.
+            timeout: seconds without any message after which an agent counts as lost.
+            max_attempts: number of agents that may be lost while running a shard before the shard is given up.
+            token: secret that is sent to the agents before the first shard. Agents reject a wrong token.
+        """
+        self._agents = list(agents)
+        self._pytest_args = list(pytest_args)
+        self._timeout = timeout
+        self._max_attempts = max_attempts
+        self._token = token
+        self._condition = threading.Condition()
+        self._queue: deque[Shard] = deque()
+        self._remaining = 0
+        self._run = DistributedRun()
+
+    def run(self, shards: Iterable[Shard], on_result: Callable[[TestResult], None] | None = None) -> DistributedRun:
+        """Run all shards on the agents and wait until they are completed.
+
+        Args:
+            shards: the shards to run.
+            on_result: function that is called with every result as soon as an agent reports it.
+                Results of an agent that is lost afterward are reported again by the next agent.
+
+        Returns:
+            The results of all completed shards.
+        """
+        self._queue = deque(shards)
+        self._remaining = len(self._queue)
+        self._run = DistributedRun()
+        threads = [
+            threading.Thread(target=self._serve_agent, args=(address, on_result), daemon=True)
+            for address in self._agents
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self._run.unfinished.extend(self._queue)
+        return self._run
+
+    def _serve_agent(self, address: tuple[str, int], on_result: Callable[[TestResult], None] | None) -> None:
+        """Send shards to one agent until all shards are completed or the agent is lost."""
+        shard = None
+        try:
+            with socket.create_connection(address, timeout=self._timeout) as connection:
+                stream = connection.makefile("rwb")
+                if self._token is not None:
+                    send_message(stream, {"type": "auth", "token": self._token})
+                while True:
+                    shard = self._next_shard()
+                    if shard is None:
+                        return
+                    results, exit_code = self._run_shard(stream, shard, on_result)
+                    self._complete(shard, results, exit_code)
+                    shard = None
+        except (OSError, ProtocolError):
+            self._lose_agent(address, shard)
+
+    def _next_shard(self) -> Shard | None:
+        """Wait for the next shard to run.
+
+        Returns:
+            The next shard or None once all shards are completed or given up.
+        """
+        with self._condition:
+            while not self._queue and self._remaining:
+                self._condition.wait()
+            return self._queue.popleft() if self._queue else None
+
+    def _run_shard(
+        self,
+        stream: IO[bytes],
+        shard: Shard,
+        on_result: Callable[[TestResult], None] | None,
+    ) -> tuple[list[TestResult], int]:
+        """Send the shard to the agent and receive the results until the agent is done."""
+        send_message(
+            stream, {"type": "run", "shard": shard.shard_id, "paths": shard.paths, "pytest_args": self._pytest_args}
+        )
+        results = []
+        while True:
+            message = receive_message(stream)
+            if message is None:
+                msg = "The agent closed the connection."
+                raise ProtocolError(msg)
+            if message.get("shard") != shard.shard_id:
+                continue
+            if message["type"] == "result":
+                result = TestResult.from_dict(message["result"])
+                results.append(result)
+                if on_result:
+                    on_result(result)
+            elif message["type"] == "done":
+                return results, message["exit_code"]
+
+    def _complete(self, shard: Shard, results: list[TestResult], exit_code: int) -> None:
+        """Store the results of a completed shard."""
+        with self._condition:
+            self._run.results.extend(results)
+            self._run.exit_codes[shard.shard_id] = exit_code
+            self._remaining -= 1
+            self._condition.notify_all()
+
+    def _lose_agent(self, address: tuple[str, int], shard: Shard | None) -> None:
+        """Forget the agent and give its current shard to another agent."""
+        with self._condition:
+            self._run.lost_agents.append("{}:{}".format(*address))
+            if shard is not None:
+                shard.attempts += 1
+                if shard.attempts < self._max_attempts and len(self._run.lost_agents) < len(self._agents):
+                    self._queue.append(shard)
+                else:
+                    self._run.unfinished.append(shard)
+                    self._remaining -= 1
+            if len(self._run.lost_agents) == len(self._agents):
+                # Nobody is left to run the remaining shards.
+                self._remaining = 0
+            self._condition.notify_all()
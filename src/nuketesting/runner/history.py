@@ -0,0 +1,285 @@
+"""Module for storing the results of test runs in a local SQLite database.
+
+Every run of the CLI stores the result of each test together with the runner, the Nuke version,
+the duration and the peak memory. The history answers questions across runs:
+
+- Which tests are the slowest?
+- Which tests got slower in the latest run?
+- Which tests pass and fail without any change, so they are flaky?
+
+Average durations of the history are also used to balance the shards of distributed runs.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from nuketesting.runner.report import TestResult
+
+DEFAULT_HISTORY_FILE = Path(".benchmarks") / "history.db"
+DEFAULT_WINDOW = 20
+"""Number of latest runs that are considered for the statistics."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    exit_code INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    test_id TEXT NOT NULL,
+    runner TEXT NOT NULL,
+    nuke_version TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    peak_memory INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_run_id ON results (run_id);
+"""
+
+
+@dataclass
+class SlowTest:
+    """Average resources of a test."""
+
+    test_id: str
+    duration: float
+    """Average duration of the passed runs in seconds."""
+    peak_memory: int
+    """Highest peak memory of all runs in bytes."""
+    runs: int
+    """Number of passed runs."""
+
+
+@dataclass
+class Slowdown:
+    """Duration of a test in the latest run compared to the runs before."""
+
+    test_id: str
+    previous: float
+    """Median duration of the earlier passed runs in seconds."""
+    latest: float
+    """Duration of the latest passed run in seconds."""
+
+    @property
+    def ratio(self) -> float:
+        """Factor by which the test got slower."""
+        return self.latest / self.previous if self.previous else float("inf")
+
+
+@dataclass
+class FlakyTest:
+    """Test that passed and failed within the considered runs."""
+
+    test_id: str
+    failures: int
+    """Number of failed runs."""
+    runs: int
+    """Number of passed and failed runs."""
+
+    @property
+    def rate(self) -> float:
+        """Share of failed runs."""
+        return self.failures / self.runs
+
+
+class RunHistory:
+    """Database of test results across runs.
+
+    Examples:
+        >>> with RunHistory(DEFAULT_HISTORY_FILE) as history:
+        ...     history.record_run(results, exit_code=0)
+        ...     print(format_stats(history))
+    """
+
+    def __init__(self, filepath: Path):
+        """Open the database and create it if it doesn't exist.
+
+        Args:
+            filepath: the SQLite database file.
+        """
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(filepath))
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> RunHistory:  # noqa: PYI034
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def record_run(self, results: Iterable[TestResult], exit_code: int, started: float | None = None) -> int:
+        """Store the results of a run.
+
+        Args:
+            results: the results of all tests of the run.
+            exit_code: the exit code of the run.
+            started: time of the run in seconds since the epoch. Defaults to now.
+
+        Returns:
+            The id of the run.
+        """
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO runs (started, exit_code) VALUES (?, ?)",
+                (time.time() if started is None else started, int(exit_code)),
+            )
+            run_id = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        result.nodeid,
+                        result.runner,
+                        result.nuke_version,
+                        result.outcome,
+                        result.duration,
+                        result.peak_memory,
+                    )
+                    for result in results
+                ],
+            )
+        return run_id
+
+    def _get_results(self, window: int, runner: str | None) -> dict[str, list[tuple[str, float, int]]]:
+        """Get outcome, duration and peak memory of each test in the latest runs, oldest first."""
+        query = (
+            "SELECT test_id, outcome, duration, peak_memory FROM results "
+            "WHERE run_id IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)"
+        )
+        parameters: tuple = (window,)
+        if runner is not None:
+            query += " AND runner = ?"
+            parameters += (runner,)
+        results: dict[str, list[tuple[str, float, int]]] = {}
+        for test_id, outcome, duration, peak_memory in self._connection.execute(f"{query} ORDER BY run_id", parameters):
+            results.setdefault(test_id, []).append((outcome, duration, peak_memory))
+        return results
+
+    def get_durations(self, window: int = DEFAULT_WINDOW, runner: str | None = None) -> dict[str, float]:
+        """Get the average duration of each test that passed in the latest runs.
+
+        Args:
+            window: number of latest runs to consider.
+            runner: only consider results of this runner.
+        """
+        return {test.test_id: test.duration for test in self.slowest_tests(limit=None, window=window, runner=runner)}
+
+    def slowest_tests(
+        self,
+        limit: int | None = 10,
+        window: int = DEFAULT_WINDOW,
+        runner: str | None = None,
+    ) -> list[SlowTest]:
+        """Get the tests with the highest average duration of the passed runs.
+
+        Args:
+            limit: maximum number of tests. None for all tests.
+            window: number of latest runs to consider.
+            runner: only consider results of this runner.
+        """
+        tests = []
+        for test_id, results in self._get_results(window, runner).items():
+            passed = [(duration, memory) for outcome, duration, memory in results if outcome == "passed"]
+            if passed:
+                durations, memories = zip(*passed)
+                tests.append(SlowTest(test_id, statistics.mean(durations), max(memories), len(passed)))
+        tests.sort(key=lambda test: test.duration, reverse=True)
+        return tests[:limit]
+
+    def slowdowns(
+        self,
+        limit: int | None = 10,
+        window: int = DEFAULT_WINDOW,
+        runner: str | None = None,
+    ) -> list[Slowdown]:
+        """Get the tests that got slower in their latest passed run, by the factor of the slowdown.
+
+        Args:
+            limit: maximum number of tests. None for all tests.
+            window: number of latest runs to consider.
+            runner: only consider results of this runner.
+        """
+        slowdowns = []
+        for test_id, results in self._get_results(window, runner).items():
+            durations = [duration for outcome, duration, _ in results if outcome == "passed"]
+            if len(durations) < 2:  # noqa: PLR2004
+                continue
+            slowdown = Slowdown(test_id, statistics.median(durations[:-1]), durations[-1])
+            if slowdown.latest > slowdown.previous:
+                slowdowns.append(slowdown)
+        slowdowns.sort(key=lambda slowdown: slowdown.ratio, reverse=True)
+        return slowdowns[:limit]
+
+    def flaky_tests(
+        self,
+        limit: int | None = 10,
+        window: int = DEFAULT_WINDOW,
+        runner: str | None = None,
+    ) -> list[FlakyTest]:
+        """Get the tests that passed and failed in the latest runs, by their failure rate.
+
+        Args:
+            limit: maximum number of tests. None for all tests.
+            window: number of latest runs to consider.
+            runner: only consider results of this runner.
+        """
+        flaky = []
+        for test_id, results in self._get_results(window, runner).items():
+            outcomes = [outcome for outcome, _, _ in results if outcome != "skipped"]
+            failures = sum(outcome != "passed" for outcome in outcomes)
+            if 0 < failures < len(outcomes):
+                flaky.append(FlakyTest(test_id, failures, len(outcomes)))
+        flaky.sort(key=lambda test: test.rate, reverse=True)
+        return flaky[:limit]
+
+
+def format_stats(
+    history: RunHistory,
+    limit: int = 10,
+    window: int = DEFAULT_WINDOW,
+    runner: str | None = None,
+) -> str:
+    """Format the slowest tests, the biggest slowdowns and the flaky tests as text tables.
+
+    Args:
+        history: the history of the runs.
+        limit: maximum number of tests per table.
+        window: number of latest runs to consider.
+        runner: only consider results of this runner.
+    """
+    lines = ["Slowest tests:", f"{'duration':>10} {'memory':>10} {'runs':>5}  test"]
+    lines.extend(
+        f"{test.duration:>9.3f}s {test.peak_memory / 2**20:>8.0f}MB {test.runs:>5}  {test.test_id}"
+        for test in history.slowest_tests(limit, window, runner)
+    )
+    lines.extend(["", "Biggest slowdowns:", f"{'previous':>10} {'latest':>10} {'ratio':>6}  test"])
+    lines.extend(
+        f"{slowdown.previous:>9.3f}s {slowdown.latest:>9.3f}s {slowdown.ratio:>5.2f}x  {slowdown.test_id}"
+        for slowdown in history.slowdowns(limit, window, runner)
+    )
+    lines.extend(["", "Flaky tests:", f"{'failures':>10} {'runs':>5} {'rate':>6}  test"])
+    lines.extend(
+        f"{test.failures:>10} {test.runs:>5} {test.rate:>6.0%}  {test.test_id}"
+        for test in history.flaky_tests(limit, window, runner)
+    )
+    return "\n".join(lines)
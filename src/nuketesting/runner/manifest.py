@@ -0,0 +1,408 @@
+"""Module for collecting the test ids of test files without starting Nuke.
+
+The parent process of the testrunner plans shards and incremental runs before Nuke starts. Importing the test modules
+is not possible there, as they import `nuke`. Instead, the test modules are parsed and the tests are found with the
+default rules of pytest: `test*` functions and `test*` methods of `Test*` classes. Parametrize ids are computed like
+pytest computes them, as long as the parameters are literals.
+
+Files that can't be collected statically are reported as dynamic. These are files with:
+
+- parametrize decorators with computed parameters, computed ids or ids that pytest would disambiguate,
+- parametrized fixtures or a `pytest_generate_tests` hook in the module or a `conftest.py` of its directories,
+- test classes with base classes, as they can inherit tests,
+- syntax errors.
+
+The dynamic files are collected by pytest inside Nuke. The bootstrap loads this module as pytest plugin if a
+manifest file is configured in the environment, and the plugin writes the collected test ids into the file.
+"""
+
+from __future__ import annotations
+
+import ast
+import codecs
+import itertools
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+if TYPE_CHECKING:
+    import pytest
+
+MANIFEST_ENV_FILE = "NUKE_TESTING_MANIFEST_FILE"
+
+ROOTDIR_FILES = ("pytest.ini", ".pytest.ini", "pyproject.toml", "tox.ini", "setup.cfg", "setup.py")
+"""Files that mark the rootdir of pytest, which is the base of the test ids."""
+
+_DYNAMIC_HOOKS = ("pytest_generate_tests",)
+
+
+class DynamicCollectionError(Exception):
+    """Exception to raise when the tests of a file can only be collected by pytest."""
+
+
+@dataclass
+class TestManifest:
+    """Test ids of test files."""
+
+    __test__ = False
+
+    test_ids: dict[Path, list[str]] = field(default_factory=dict)
+    """Test ids by absolute path of the test file."""
+    dynamic_files: list[Path] = field(default_factory=list)
+    """Files that can only be collected by pytest."""
+
+    @property
+    def all_test_ids(self) -> list[str]:
+        """The test ids of all files."""
+        return [test_id for test_ids in self.test_ids.values() for test_id in test_ids]
+
+    def add_collected(self, test_ids: Iterable[str]) -> None:
+        """Add the test ids that pytest collected for the dynamic files.
+
+        Test ids are relative to the rootdir of pytest, so they are assigned to the dynamic file
+        whose path ends with the path of the test id.
+        """
+        for test_id in test_ids:
+            relative_path = test_id.split("::")[0]
+            for file in self.dynamic_files:
+                posix_path = file.as_posix()
+                if posix_path == relative_path or posix_path.endswith(f"/{relative_path}"):
+                    self.test_ids.setdefault(file, []).append(test_id)
+                    break
+        self.dynamic_files = [file for file in self.dynamic_files if file not in self.test_ids]
+
+
+def find_rootdir(path: Path) -> Path:
+    """Find the rootdir of pytest for the test path.
+
+    This is the first directory from the test path upward that contains a configuration file of pytest or a Python
+    project. If there is none, the test directory itself is the rootdir.
+    """
+    path = path.absolute()
+    directory = path if path.is_dir() else path.parent
+    for candidate in (directory, *directory.parents):
+        if any((candidate / name).is_file() for name in ROOTDIR_FILES):
+            return candidate
+    return directory
+
+
+def collect_static(files: Sequence[Path], rootdir: Path) -> TestManifest:
+    """Collect the test ids of the test files without importing them.
+
+    Args:
+        files: the absolute paths of the test files, see `nuketesting.runner.coordinator.collect_test_files`.
+        rootdir: the rootdir of pytest, see `find_rootdir`.
+
+    Returns:
+        The test ids of all files that could be collected and the dynamic files.
+    """
+    manifest = TestManifest()
+    dynamic_conftests: dict[Path, bool] = {}
+    for file in files:
+        directories = [directory for directory in file.parents if directory == rootdir or rootdir in directory.parents]
+        if any(_is_dynamic_conftest(directory / "conftest.py", dynamic_conftests) for directory in directories):
+            manifest.dynamic_files.append(file)
+            continue
+        relative_path = file.relative_to(rootdir).as_posix() if rootdir in file.parents else file.as_posix()
+        try:
+            manifest.test_ids[file] = [f"{relative_path}::{name}" for name in collect_module(file.read_text())]
+        except (DynamicCollectionError, SyntaxError, UnicodeDecodeError):
+            manifest.dynamic_files.append(file)
+    return manifest
+
+
+def _is_dynamic_conftest(conftest: Path, cache: dict[Path, bool]) -> bool:
+    """Check if the conftest generates tests or parametrizes fixtures. The results are cached by path."""
+    if conftest not in cache:
+        try:
+            cache[conftest] = conftest.is_file() and _generates_tests(ast.parse(conftest.read_text()))
+        except (SyntaxError, UnicodeDecodeError):
+            cache[conftest] = True
+    return cache[conftest]
+
+
+def collect_module(source: str) -> list[str]:
+    """Get the test names of a test module, relative to the module.
+
+    Examples:
+        >>> collect_module('''
+        ... @pytest.mark.parametrize("size", [1, 2.5])
+        ... def test_blur(size): ...
+        ...
+        ... class TestGrade:
+        ...     def test_white(self): ...
+        ... ''')
+        ['test_blur[1]', 'test_blur[2.5]', 'TestGrade::test_white']
+
+    Args:
+        source: the source code of the module.
+
+    Raises:
+        DynamicCollectionError: the tests can only be collected by pytest.
+        SyntaxError: the module is not valid Python.
+    """
+    module = ast.parse(source)
+    if _generates_tests(module):
+        msg = "The module generates tests or parametrizes fixtures."
+        raise DynamicCollectionError(msg)
+    for statement in module.body:
+        if (
+            isinstance(statement, ast.Assign)
+            and any(_is_name(target, "pytestmark") for target in statement.targets)
+            and any(_is_parametrize(node) for node in ast.walk(statement.value))
+        ):
+            msg = "The module is parametrized with 'pytestmark'."
+            raise DynamicCollectionError(msg)
+    return _collect_body(module.body, [], [])
+
+
+def _collect_body(body: list[ast.stmt], prefix: list[str], class_marks: list[ast.Call]) -> list[str]:
+    """Get the test names of the functions and classes of a module or class body."""
+    # Like in the namespace of the module, later definitions replace earlier ones of the same name.
+    definitions: dict[str, ast.stmt] = {}
+    for statement in body:
+        is_function = isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef))
+        if (is_function and statement.name.startswith("test")) or (
+            isinstance(statement, ast.ClassDef) and statement.name.startswith("Test")
+        ):
+            definitions[statement.name] = statement
+    names = []
+    for statement in definitions.values():
+        if isinstance(statement, ast.ClassDef):
+            names.extend(_collect_class(statement, prefix, class_marks))
+        else:
+            names.extend(_collect_function(statement, prefix, class_marks))
+    return names
+
+
+def _collect_class(node: ast.ClassDef, prefix: list[str], class_marks: list[ast.Call]) -> list[str]:
+    """Get the test names of a test class."""
+    if any(not _is_name(base, "object") for base in node.bases):
+        msg = f"The class '{node.name}' can inherit tests."
+        raise DynamicCollectionError(msg)
+    for statement in node.body:
+        if isinstance(statement, ast.FunctionDef) and statement.name == "__init__":
+            return []  # Pytest doesn't collect classes with a constructor.
+        if isinstance(statement, ast.Assign) and any(_is_name(target, "__test__") for target in statement.targets):
+            msg = f"The class '{node.name}' sets '__test__'."
+            raise DynamicCollectionError(msg)
+    marks = [*_get_parametrize_marks(node), *class_marks]
+    return _collect_body(node.body, [*prefix, node.name], marks)
+
+
+def _collect_function(
+    node: ast.FunctionDef | ast.AsyncFunctionDef, prefix: list[str], class_marks: list[ast.Call]
+) -> list[str]:
+    """Get the test names of a test function, one per parameter set."""
+    name = "::".join([*prefix, node.name])
+    marks = [*_get_parametrize_marks(node), *class_marks]
+    if not marks:
+        return [name]
+    # The first mark is applied first, so its parameters vary slowest and its id comes first.
+    parameter_ids = [_get_parameter_ids(mark) for mark in marks]
+    ids = ["-".join(combination) for combination in itertools.product(*parameter_ids)]
+    if len(set(ids)) != len(ids):
+        msg = f"The test '{name}' has duplicated ids, which pytest disambiguates."
+        raise DynamicCollectionError(msg)
+    return [f"{name}[{test_id}]" for test_id in ids]
+
+
+def _get_parametrize_marks(node: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef) -> list[ast.Call]:
+    """Get the parametrize decorators in the order pytest applies them, from the innermost to the outermost."""
+    marks = []
+    for decorator in reversed(node.decorator_list):
+        if _is_parametrize(decorator):
+            if not isinstance(decorator, ast.Call):
+                msg = "The parametrize decorator is not called."
+                raise DynamicCollectionError(msg)
+            marks.append(decorator)
+    return marks
+
+
+def _get_parameter_ids(mark: ast.Call) -> list[str]:
+    """Get the ids of the parameter sets of a parametrize decorator like pytest generates them."""
+    arguments = dict(zip(("argnames", "argvalues", "indirect", "ids"), mark.args))
+    arguments.update((keyword.arg, keyword.value) for keyword in mark.keywords if keyword.arg)
+    if "argnames" not in arguments or "argvalues" not in arguments:
+        msg = "The parametrize decorator has no literal argument names or values."
+        raise DynamicCollectionError(msg)
+
+    argnames = _literal(arguments["argnames"])
+    if isinstance(argnames, str):
+        argnames = [name.strip() for name in argnames.split(",") if name.strip()]
+    if not isinstance(argnames, (list, tuple)) or not argnames:
+        msg = "The argument names are not a string or a sequence of strings."
+        raise DynamicCollectionError(msg)
+    if not isinstance(arguments["argvalues"], (ast.List, ast.Tuple)) or not arguments["argvalues"].elts:
+        msg = "The parameters are computed or empty."
+        raise DynamicCollectionError(msg)
+    explicit_ids = _literal(arguments["ids"]) if "ids" in arguments else None
+    if explicit_ids is not None and not isinstance(explicit_ids, (list, tuple)):
+        msg = "The ids are computed."
+        raise DynamicCollectionError(msg)
+
+    ids = []
+    for index, parameter in enumerate(arguments["argvalues"].elts):
+        explicit_id = explicit_ids[index] if explicit_ids and index < len(explicit_ids) else None
+        values, parameter_id = _unpack_parameter(parameter, len(argnames))
+        parameter_id = explicit_id if explicit_id is not None else parameter_id
+        if parameter_id is None:
+            ids.append("-".join(_get_value_id(value, name, index) for value, name in zip(values, argnames)))
+        else:
+            ids.append(_get_explicit_id(parameter_id))
+    return ids
+
+
+def _unpack_parameter(parameter: ast.expr, count: int) -> tuple[list[ast.expr], str | None]:
+    """Get the value of each argument and the explicit id of a parameter set."""
+    parameter_id = None
+    if isinstance(parameter, ast.Call) and _get_attribute_name(parameter.func) == "param":
+        for keyword in parameter.keywords:
+            if keyword.arg == "id":
+                parameter_id = _literal(keyword.value)
+        values = list(parameter.args)
+    elif count == 1:
+        values = [parameter]
+    elif isinstance(parameter, (ast.List, ast.Tuple)):
+        values = list(parameter.elts)
+    else:
+        msg = "The parameter set is computed."
+        raise DynamicCollectionError(msg)
+    if len(values) != count:
+        msg = "The parameter set doesn't match the argument names."
+        raise DynamicCollectionError(msg)
+    return values, parameter_id
+
+
+def _get_value_id(node: ast.expr, argname: str, index: int) -> str:
+    """Get the id of a single argument value like pytest generates it."""
+    value = _literal(node)
+    if isinstance(value, (str, bytes)):
+        return _ascii_escaped(value)
+    if isinstance(value, (int, float, complex, bool)) or value is None:
+        return str(value)
+    # Pytest uses the argument name and the index for other literals, like lists or dictionaries.
+    return f"{argname}{index}"
+
+
+def _ascii_escaped(value: str | bytes) -> str:
+    """Escape backslashes, non-printable and non-ASCII characters like pytest does in ids.
+
+    For example, a backslash becomes two backslashes and "ü" becomes "\\xfc".
+    """
+    if isinstance(value, bytes):
+        return codecs.escape_encode(value)[0].decode("ascii")
+    return value.encode("unicode_escape").decode("ascii")
+
+
+def _get_explicit_id(test_id: object) -> str:
+    """Get an id of the `ids` argument or of `pytest.param` as pytest uses it.
+
+    Raises:
+        DynamicCollectionError: pytest replaces the id.
+    """
+    test_id = _ascii_escaped(test_id) if isinstance(test_id, str) else str(test_id)
+    if not test_id:
+        msg = "Pytest replaces empty ids."
+        raise DynamicCollectionError(msg)
+    return test_id
+
+
+def _literal(node: ast.expr) -> object:
+    """Evaluate a literal expression.
+
+    Raises:
+        DynamicCollectionError: the expression is computed.
+    """
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError) as error:
+        msg = f"The expression in line {node.lineno} is not a literal."
+        raise DynamicCollectionError(msg) from error
+
+
+def _generates_tests(module: ast.Module) -> bool:
+    """Check if the module defines a hook that generates tests or a parametrized fixture."""
+    for node in ast.walk(module):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if node.name in _DYNAMIC_HOOKS:
+                return True
+            for decorator in node.decorator_list:
+                if (
+                    isinstance(decorator, ast.Call)
+                    and _get_attribute_name(decorator.func) == "fixture"
+                    and any(keyword.arg == "params" for keyword in decorator.keywords)
+                ):
+                    return True
+    return False
+
+
+def _is_parametrize(node: ast.expr) -> bool:
+    """Check if the node is a `pytest.mark.parametrize` decorator."""
+    function = node.func if isinstance(node, ast.Call) else node
+    return (
+        isinstance(function, ast.Attribute)
+        and function.attr == "parametrize"
+        and _get_attribute_name(function.value) == "mark"
+    )
+
+
+def _get_attribute_name(node: ast.expr) -> str | None:
+    """Get the last name of an attribute chain like `pytest.mark`, or the name itself."""
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+
+def _is_name(node: ast.expr, name: str) -> bool:
+    """Check if the node is the plain name."""
+    return isinstance(node, ast.Name) and node.id == name
+
+
+def get_manifest_info(filepath: Path | str) -> dict[str, str]:
+    """Get the manifest configuration for adding it to the run environment.
+
+    Args:
+        filepath: file for the test ids that pytest collects.
+    """
+    return {MANIFEST_ENV_FILE: str(Path(filepath).absolute())}
+
+
+def get_manifest_arguments() -> list[str]:
+    """Get the pytest arguments that load the manifest plugin if a manifest file is configured in the environment."""
+    return ["-p", __name__] if os.getenv(MANIFEST_ENV_FILE) else []
+
+
+def read_manifest(filepath: Path) -> list[str]:
+    """Read the test ids that the manifest plugin wrote. The file is empty if pytest didn't finish the collection."""
+    if not filepath.exists():
+        return []
+    return [line for line in filepath.read_text().splitlines() if line]
+
+
+class ManifestWriter:
+    """Pytest plugin that writes the test ids of the collected tests into a file, one per line."""
+
+    def __init__(self, filepath: Path):
+        """Initialize the plugin.
+
+        Args:
+            filepath: the manifest file. Test ids are appended if it exists.
+        """
+        self.filepath = filepath
+
+    def pytest_collection_finish(self, session: pytest.Session) -> None:
+        """Write the test ids of all collected tests."""
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        with self.filepath.open("a") as manifest:
+            manifest.writelines(f"{item.nodeid}\n" for item in session.items)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the manifest writer if a manifest file is configured in the environment."""
+    filepath = os.getenv(MANIFEST_ENV_FILE)
+    if filepath:
+        config.pluginmanager.register(ManifestWriter(Path(filepath)), "nuke_test_manifest")
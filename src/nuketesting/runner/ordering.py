@@ -0,0 +1,173 @@
+"""Module for running the previously failed and recently changed tests first.
+
+The ordering keeps its own state file instead of the pytest cache, as the cache directory is not always
+writable or shared inside Nuke. The state file and the ordering mode reach the Nuke process through environment
+variables, the same way as the debugger configuration. Inside Nuke, the bootstrap loads this module as pytest plugin
+which records the failed tests of every run and reorders the tests of the next run:
+
+- "failed-first" runs the previously failed tests first, then the tests of files that changed since the last run,
+  then all other tests.
+- "last-failed" only runs the previously failed tests and stops afterward. If no test failed, all tests run.
+
+The failed tests are recorded whenever the state file is configured, also without reordering.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Sequence
+
+import pytest
+
+STATE_ENV_FILE = "NUKE_TESTING_STATE_FILE"
+ORDER_ENV_MODE = "NUKE_TESTING_ORDER"
+
+ORDER_MODES = ("failed-first", "last-failed")
+DEFAULT_STATE_FILE = Path(".benchmarks") / "test_state.json"
+
+
+def get_order_info(state_file: Path | str, mode: str | None = None) -> dict[str, str]:
+    """Get the ordering configuration for adding it to the run environment.
+
+    Examples:
+        Run the failed tests of a subprocess first:
+        >>> import subprocess
+        >>> env = os.environ.copy() # Don't change the current env
+        >>> env.update(get_order_info(DEFAULT_STATE_FILE, "failed-first"))
+        >>> subprocess.call("echo test", env=env)
+
+    Args:
+        state_file: file that stores the failed tests between runs.
+        mode: the ordering to use. One of `ORDER_MODES` or None to only record the failed tests.
+    """
+    info = {STATE_ENV_FILE: str(Path(state_file).absolute())}
+    if mode:
+        if mode not in ORDER_MODES:
+            msg = f"Unknown order mode '{mode}'. Use one of: {', '.join(ORDER_MODES)}."
+            raise ValueError(msg)
+        info[ORDER_ENV_MODE] = mode
+    return info
+
+
+def get_ordering_arguments() -> list[str]:
+    """Get the pytest arguments that load the ordering plugin if a state file is configured in the environment."""
+    return ["-p", __name__] if os.getenv(STATE_ENV_FILE) else []
+
+
+@dataclass
+class TestState:
+    """Tests that failed in earlier runs."""
+
+    __test__ = False
+
+    failed: set[str] = field(default_factory=set)
+    """Node ids of the tests that failed in their latest run."""
+    last_run: float = 0.0
+    """Start of the latest run in seconds since the epoch."""
+
+    @classmethod
+    def load(cls, filepath: Path) -> TestState:
+        """Load the state or create an empty state if the file doesn't exist."""
+        if not filepath.exists():
+            return cls()
+        data = json.loads(filepath.read_text())
+        return cls(set(data.get("failed", [])), data.get("last_run", 0.0))
+
+    def save(self, filepath: Path) -> None:
+        """Write the state as JSON."""
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_text(json.dumps({"failed": sorted(self.failed), "last_run": self.last_run}, indent=2))
+
+
+def prioritize(items: Sequence[pytest.Item], failed: set[str], changed_since: float) -> list[pytest.Item]:
+    """Sort the failed tests first and the tests of changed files second, but keep the order within each group.
+
+    Args:
+        items: the collected tests.
+        failed: node ids of the previously failed tests.
+        changed_since: files that were modified after this time count as changed. Zero if nothing changed.
+    """
+    modification_times: dict[Path, float] = {}
+
+    def get_priority(item: pytest.Item) -> int:
+        if item.nodeid in failed:
+            return 0
+        if item.path not in modification_times:
+            modification_times[item.path] = item.path.stat().st_mtime if item.path.exists() else 0.0
+        return 1 if changed_since and modification_times[item.path] > changed_since else 2
+
+    return sorted(items, key=get_priority)
+
+
+class OrderingPlugin:
+    """Pytest plugin that records the failed tests and runs them first in the next run."""
+
+    def __init__(self, state_file: Path, mode: str | None = None):
+        """Initialize the plugin.
+
+        Args:
+            state_file: file that stores the failed tests between runs.
+            mode: the ordering to use. One of `ORDER_MODES` or None to only record the failed tests.
+        """
+        self.state_file = state_file
+        self.mode = mode
+        self._started = time.time()
+        self._state = TestState.load(state_file)
+        self._message = ""
+
+    def pytest_report_collectionfinish(self) -> str:
+        """Show how the tests are ordered."""
+        return self._message
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config: pytest.Config, items: list[pytest.Item]) -> None:
+        """Move the previously failed tests to the front or deselect all other tests."""
+        if not self.mode:
+            return
+        failed = self._state.failed.intersection(item.nodeid for item in items)
+        if self.mode == "last-failed":
+            if not failed:
+                self._message = "ordering: no previously failed tests, running all tests"
+                return
+            deselected = [item for item in items if item.nodeid not in failed]
+            items[:] = [item for item in items if item.nodeid in failed]
+            config.hook.pytest_deselected(items=deselected)
+            self._message = f"ordering: running {len(failed)} previously failed tests only"
+            return
+        items[:] = prioritize(items, failed, self._state.last_run)
+        self._message = f"ordering: running {len(failed)} previously failed tests first"
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """Record the failed tests and forget the tests that passed again."""
+        if report.failed:
+            self._state.failed.add(report.nodeid)
+        elif report.when == "call" or (report.when == "setup" and report.skipped):
+            self._state.failed.discard(report.nodeid)
+
+    def pytest_collectreport(self, report: pytest.CollectReport) -> None:
+        """Record the files that can't be collected as failed."""
+        if report.failed:
+            self._state.failed.add(report.nodeid)
+        else:
+            self._state.failed.discard(report.nodeid)
+
+    def pytest_sessionfinish(self) -> None:
+        """Store the failed tests for the next run."""
+        self._state.last_run = self._started
+        try:
+            self._state.save(self.state_file)
+        except OSError as error:
+            warnings.warn(f"Could not store the failed tests in '{self.state_file}': {error}", stacklevel=1)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the ordering plugin if a state file is configured in the environment."""
+    state_file = os.getenv(STATE_ENV_FILE)
+    if state_file:
+        plugin = OrderingPlugin(Path(state_file), os.getenv(ORDER_ENV_MODE) or None)
+        config.pluginmanager.register(plugin, "nuke_test_ordering")
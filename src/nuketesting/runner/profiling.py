@@ -0,0 +1,205 @@
+"""Module for profiling tests inside the nuke runner.
+
+The profiling configuration is forwarded to the Nuke process through environment variables,
+the same way as the debugger configuration. Inside Nuke, the bootstrap loads this module as pytest plugin
+which profiles every test and writes one profile file per test into the profile directory:
+
+- "cprofile" records every function call with `cProfile` and writes `.pstats` files.
+- "sampling" records the call stack of the test thread in a fixed interval and writes `.collapsed`
+  files that can be turned into flame graphs. The overhead is small, even for many small callbacks.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+import pytest
+
+if TYPE_CHECKING:
+    from types import FrameType
+
+    from _pytest.terminal import TerminalReporter
+
+PROFILE_ENV_MODE = "NUKE_RUNNER_PROFILE_MODE"
+PROFILE_ENV_DIR = "NUKE_RUNNER_PROFILE_DIR"
+
+PROFILE_MODES = ("cprofile", "sampling")
+SAMPLING_INTERVAL = 0.005  # seconds
+SUMMARY_LENGTH = 15
+
+
+def get_profile_info(mode: str, output_dir: Path | str) -> dict[str, str]:
+    """Get the profiling configuration for adding it to the run environment.
+
+    Examples:
+        Profile all tests of a subprocess:
+        >>> import subprocess
+        >>> env = os.environ.copy() # Don't change the current env
+        >>> env.update(get_profile_info("sampling", "profiles"))
+        >>> subprocess.call("echo test", env=env)
+
+    Args:
+        mode: the profiler to use. One of `PROFILE_MODES`.
+        output_dir: directory for the profiles of all tests.
+    """
+    if mode not in PROFILE_MODES:
+        msg = f"Unknown profile mode '{mode}'. Use one of: {', '.join(PROFILE_MODES)}."
+        raise ValueError(msg)
+    return {PROFILE_ENV_MODE: mode, PROFILE_ENV_DIR: str(Path(output_dir).absolute())}
+
+
+def get_profiling_arguments() -> list[str]:
+    """Get the pytest arguments that load the profiler plugin if profiling is configured in the environment."""
+    return ["-p", __name__] if os.getenv(PROFILE_ENV_MODE) else []
+
+
+def get_profile_filename(nodeid: str) -> str:
+    """Get a file name for the profile of a test without any characters that are invalid in paths.
+
+    Examples:
+        >>> get_profile_filename("tests/test_blur.py::test_size[10]")
+        'tests_test_blur.py_test_size_10_'
+    """
+    return re.sub(r"[^\w.-]+", "_", nodeid)
+
+
+def _get_label(frame: FrameType) -> str:
+    """Get the label of a stack frame for collapsed stacks."""
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Profiler that records the call stack of a thread in a fixed interval."""
+
+    def __init__(self, interval: float = SAMPLING_INTERVAL):
+        """Initialize the profiler.
+
+        Args:
+            interval: time between two samples in seconds.
+        """
+        self._interval = interval
+        self._thread_id = 0
+        self._stop_event = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self.stacks: Counter[str] = Counter()
+        """Number of samples by collapsed call stack, outermost frame first."""
+
+    def start(self) -> None:
+        """Start sampling the calling thread."""
+        self._thread_id = threading.get_ident()
+        self._stop_event.clear()
+        self._sampler = threading.Thread(target=self._sample, name="NukeTestingSampler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop_event.set()
+        if self._sampler:
+            self._sampler.join()
+            self._sampler = None
+
+    def _sample(self) -> None:
+        """Record the stack of the sampled thread until the profiler is stopped."""
+        while not self._stop_event.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)  # noqa: SLF001
+            labels = []
+            while frame is not None:
+                labels.append(_get_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def get_leaf_counts(self) -> Counter[str]:
+        """Get the number of samples of each function that was executing, without its callers."""
+        leaves: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves
+
+    def save(self, filepath: Path) -> None:
+        """Write the stacks in the collapsed format of flame graph tools."""
+        filepath.write_text("".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()))
+
+
+class ProfilerPlugin:
+    """Pytest plugin that profiles each test and summarizes the hottest functions."""
+
+    def __init__(self, mode: str, output_dir: Path):
+        """Initialize the plugin.
+
+        Args:
+            mode: the profiler to use. One of `PROFILE_MODES`.
+            output_dir: directory for the profiles of all tests.
+        """
+        self.mode = mode
+        self.output_dir = output_dir
+        self._stats: pstats.Stats | None = None
+        self._samples: Counter[str] = Counter()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item) -> Iterator[None]:
+        """Profile the test function."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        filename = get_profile_filename(item.nodeid)
+        if self.mode == "sampling":
+            profiler = SamplingProfiler()
+            profiler.start()
+            yield
+            profiler.stop()
+            profiler.save(self.output_dir / f"{filename}.collapsed")
+            self._samples.update(profiler.get_leaf_counts())
+            return
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        yield
+        profiler.disable()
+        profiler.dump_stats(self.output_dir / f"{filename}.pstats")
+        if self._stats is None:
+            self._stats = pstats.Stats(profiler, stream=io.StringIO())
+        else:
+            self._stats.add(profiler)
+
+    def get_summary(self) -> str:
+        """Get the hottest functions of all tests."""
+        if self._stats is not None:
+            stream = io.StringIO()
+            self._stats.stream = stream
+            self._stats.sort_stats("tottime").print_stats(SUMMARY_LENGTH)
+            return stream.getvalue().strip()
+
+        total = sum(self._samples.values())
+        if not total:
+            return ""
+        lines = [f"{'samples':>8} {'share':>6}  function"]
+        lines.extend(
+            f"{count:>8} {count / total:>6.1%}  {label}" for label, count in self._samples.most_common(SUMMARY_LENGTH)
+        )
+        return "\n".join(lines)
+
+    def pytest_terminal_summary(self, terminalreporter: TerminalReporter) -> None:
+        """Print the hottest functions of all tests."""
+        summary = self.get_summary()
+        if not summary:
+            return
+        terminalreporter.section(f"profile ({self.mode})")
+        terminalreporter.write_line(summary)
+        terminalreporter.write_line(f"Profiles of each test are stored in '{self.output_dir}'.")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the profiler if profiling is configured in the environment."""
+    mode = os.getenv(PROFILE_ENV_MODE)
+    if mode:
+        output_dir = Path(os.getenv(PROFILE_ENV_DIR) or "profiles")
+        config.pluginmanager.register(ProfilerPlugin(mode, output_dir), "nuke_test_profiler")
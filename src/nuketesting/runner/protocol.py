@@ -0,0 +1,81 @@
+"""Module for the messages between the coordinator and the agents of distributed test runs.
+
+Coordinator and agents exchange JSON objects over TCP, one object per line:
+
+- If the agent requires a token, the coordinator sends `{"type": "auth", "token": "..."}` as first message.
+  The agent closes connections whose first message is no matching token.
+- The coordinator sends `{"type": "run", "shard": 3, "paths": [...], "pytest_args": [...]}` to an agent.
+- The agent answers with `{"type": "result", "shard": 3, "result": {...}}` for every finished test,
+  `{"type": "heartbeat", "shard": 3}` while no test finishes and
+  `{"type": "done", "shard": 3, "exit_code": 0}` once all tests of the shard ran.
+
+The agent handles one shard at a time and waits for the next "run" message afterward.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import IO
+
+DEFAULT_PORT = 8765
+HEARTBEAT_INTERVAL = 5.0  # seconds
+AGENT_TIMEOUT = 3 * HEARTBEAT_INTERVAL  # seconds
+AGENT_TOKEN_ENV = "NUKE_TESTING_AGENT_TOKEN"
+"""Environment variable for the token that coordinators need to send to the agents."""
+
+
+class ProtocolError(Exception):
+    """Exception to raise if a message is invalid or the connection closed unexpectedly."""
+
+
+def send_message(stream: IO[bytes], message: dict) -> None:
+    """Send a message as single line.
+
+    Args:
+        stream: the writable stream of the connection.
+        message: JSON serializable message.
+    """
+    stream.write(json.dumps(message).encode() + b"\n")
+    stream.flush()
+
+
+def receive_message(stream: IO[bytes]) -> dict | None:
+    """Receive the next message.
+
+    Args:
+        stream: the readable stream of the connection.
+
+    Returns:
+        The message or None if the connection was closed.
+
+    Raises:
+        ProtocolError: the message is no JSON object.
+    """
+    line = stream.readline()
+    if not line:
+        return None
+    try:
+        message = json.loads(line)
+    except ValueError as error:
+        msg = f"Invalid message: {line[:100]!r}"
+        raise ProtocolError(msg) from error
+    if not isinstance(message, dict):
+        msg = f"Invalid message: {line[:100]!r}"
+        raise ProtocolError(msg)
+    return message
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """Parse the address of an agent.
+
+    Examples:
+        >>> parse_address("farm042:9000")
+        ('farm042', 9000)
+        >>> parse_address("farm042")
+        ('farm042', 8765)
+
+    Args:
+        address: host name and optional port separated by a colon.
+    """
+    host, _, port = address.rpartition(":") if ":" in address else (address, "", "")
+    return host, int(port) if port else DEFAULT_PORT
@@ -0,0 +1,157 @@
+"""Module for reporting test results of the nuke runner as JSON lines.
+
+If the `NUKE_TESTING_REPORT_FILE` environment variable is set, the bootstrap loads this module as pytest plugin.
+The plugin appends one JSON object per finished test to the file, so other processes can follow the
+progress while the tests are still running:
+
+    {"nodeid": "tests/test_blur.py::test_size", "outcome": "passed", "duration": 0.12, "message": "",
+     "runner": "nuke15", "nuke_version": "15.1v1", "peak_memory": 1073741824}
+
+The outcome is one of "passed", "failed", "skipped" or "error". Errors are failures outside the test function,
+like failing fixtures or tests that can't be collected.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from nuketesting.datamodel.constants import RUNNER_NAME_ENV
+
+if TYPE_CHECKING:
+    import pytest
+
+REPORT_ENV_FILE = "NUKE_TESTING_REPORT_FILE"
+
+
+@dataclass
+class TestResult:
+    """Result of a single test."""
+
+    __test__ = False
+
+    nodeid: str
+    """The pytest node id of the test."""
+    outcome: str = "passed"
+    """One of "passed", "failed", "skipped" or "error"."""
+    duration: float = 0.0
+    """Duration of setup, call and teardown in seconds."""
+    message: str = ""
+    """The failure report or the skip reason."""
+    runner: str = ""
+    """Name of the runner configuration that ran the test."""
+    nuke_version: str = ""
+    """Version of Nuke that ran the test. Empty if the test ran without Nuke."""
+    peak_memory: int = 0
+    """Peak memory of the test process in bytes after the test. Zero if the platform doesn't report it."""
+
+    def to_dict(self) -> dict:
+        """Convert the result into a JSON serializable dictionary."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> TestResult:
+        """Create a result from a dictionary created by `to_dict`."""
+        return cls(**data)
+
+
+def get_peak_memory() -> int:
+    """Get the peak memory of the current process in bytes or zero if the platform doesn't report it."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def get_report_arguments() -> list[str]:
+    """Get the pytest arguments that load the report plugin if a report file is configured in the environment."""
+    return ["-p", __name__] if os.getenv(REPORT_ENV_FILE) else []
+
+
+def read_results(filepath: Path, offset: int = 0) -> tuple[list[TestResult], int]:
+    """Read the results that were appended to the report file since the offset.
+
+    Args:
+        filepath: the report file.
+        offset: position in bytes after the already read results.
+
+    Returns:
+        The new results and the offset after the last complete line.
+    """
+    if not filepath.exists():
+        return [], offset
+    with filepath.open("rb") as report:
+        report.seek(offset)
+        content = report.read()
+    end = content.rfind(b"\n") + 1
+    lines = content[:end].decode().splitlines()
+    return [TestResult.from_dict(json.loads(line)) for line in lines if line], offset + end
+
+
+class ReportWriter:
+    """Pytest plugin that appends the result of each finished test to a JSON lines file."""
+
+    def __init__(self, filepath: Path):
+        """Initialize the plugin.
+
+        Args:
+            filepath: the report file. Results are appended if it exists.
+        """
+        self.filepath = filepath
+        self._results: dict[str, TestResult] = {}
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """Combine the reports of setup, call and teardown of a test."""
+        result = self._results.setdefault(report.nodeid, self._create_result(report.nodeid))
+        result.duration += report.duration
+        if report.skipped and result.outcome == "passed":
+            result.outcome = "skipped"
+            result.message = str(report.longrepr[-1]) if isinstance(report.longrepr, tuple) else ""
+        elif report.failed:
+            result.outcome = "failed" if report.when == "call" else "error"
+            result.message = report.longreprtext
+
+    def pytest_runtest_logfinish(self, nodeid: str) -> None:
+        """Write the result of the finished test."""
+        result = self._results.pop(nodeid, None)
+        if result:
+            result.peak_memory = get_peak_memory()
+            self._write(result)
+
+    def pytest_collectreport(self, report: pytest.CollectReport) -> None:
+        """Write collection errors as errors."""
+        if report.failed:
+            result = self._create_result(report.nodeid)
+            result.outcome = "error"
+            result.message = report.longreprtext
+            self._write(result)
+
+    @staticmethod
+    def _create_result(nodeid: str) -> TestResult:
+        """Create the result of a test with the information about the current runner."""
+        nuke = sys.modules.get("nuke")
+        return TestResult(
+            nodeid,
+            runner=os.getenv(RUNNER_NAME_ENV, ""),
+            nuke_version=getattr(nuke, "NUKE_VERSION_STRING", ""),
+        )
+
+    def _write(self, result: TestResult) -> None:
+        """Append the result as single line."""
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        with self.filepath.open("a") as report:
+            report.write(json.dumps(result.to_dict()) + "\n")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the report writer if a report file is configured in the environment."""
+    filepath = os.getenv(REPORT_ENV_FILE)
+    if filepath:
+        config.pluginmanager.register(ReportWriter(Path(filepath)), "nuke_test_report")
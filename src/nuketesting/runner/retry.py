@@ -0,0 +1,139 @@
+"""Module for retrying failed tests inside the running Nuke process.
+
+Rerunning a whole test run to confirm a flaky test costs a full startup of Nuke. Instead, this plugin
+reruns a failed test directly in the same process. All fixtures are torn down and the script is cleared
+before each retry, so the retry doesn't see the nodes of the failed attempt. Fixtures of wider scopes
+are set up again for the retry, as their nodes were removed with the script.
+
+The number of retries reaches the Nuke process through an environment variable, the same way as the
+debugger configuration. Single tests can override it with the `nuke_retries` marker:
+
+    @pytest.mark.nuke_retries(3)
+    def test_render():
+        ...
+
+Tests that pass on a retry are reported as flaky. Tests that fail on every attempt are reported as failed.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+from _pytest.runner import runtestprotocol
+
+if TYPE_CHECKING:
+    from _pytest.terminal import TerminalReporter
+
+RETRIES_ENV = "NUKE_TESTING_RETRIES"
+RETRIES_MARKER = "nuke_retries"
+
+
+def get_retry_info(retries: int) -> dict[str, str]:
+    """Get the retry configuration for adding it to the run environment.
+
+    Args:
+        retries: number of times a failed test is run again. Tests can override it with the `nuke_retries` marker.
+    """
+    if retries < 0:
+        msg = f"The number of retries can't be negative: {retries}."
+        raise ValueError(msg)
+    return {RETRIES_ENV: str(retries)}
+
+
+def get_retry_arguments() -> list[str]:
+    """Get the pytest arguments that load the retry plugin if retries are configured in the environment."""
+    return ["-p", __name__] if os.getenv(RETRIES_ENV) else []
+
+
+def get_retries(item: pytest.Item, default: int) -> int:
+    """Get the number of retries of the test from its marker or the default."""
+    marker = item.get_closest_marker(RETRIES_MARKER)
+    if marker is None:
+        return default
+    return int(marker.args[0] if marker.args else marker.kwargs.get("retries", default))
+
+
+def clear_script() -> None:
+    """Remove all nodes and cached images of the failed attempt, if the tests run in Nuke."""
+    nuke = sys.modules.get("nuke")
+    if nuke is not None:
+        nuke.scriptClear()
+        nuke.clearRAMCache()
+
+
+class RetryPlugin:
+    """Pytest plugin that runs failed tests again in the same process."""
+
+    def __init__(self, retries: int):
+        """Initialize the plugin.
+
+        Args:
+            retries: number of times a failed test is run again if its marker doesn't override it.
+        """
+        self.retries = retries
+        self.flaky: dict[str, int] = {}
+        """Number of attempts by node id of the tests that passed on a retry."""
+        self.failed: dict[str, int] = {}
+        """Number of attempts by node id of the tests that failed on every attempt."""
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(self, item: pytest.Item, nextitem: pytest.Item | None) -> bool | None:
+        """Run the test until it passes or no retries are left and only report the last attempt."""
+        retries = get_retries(item, self.retries)
+        if not retries:
+            return None
+
+        item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        attempts = 0
+        while True:
+            attempts += 1
+            last_attempt = attempts > retries
+            # Earlier attempts tear down all fixtures, as clearing the script removes the nodes of module
+            # and session fixtures as well.
+            reports = runtestprotocol(item, nextitem=nextitem if last_attempt else None, log=False)
+            if not any(report.failed for report in reports):
+                if attempts > 1:
+                    self.flaky[item.nodeid] = attempts
+                break
+            if last_attempt:
+                self.failed[item.nodeid] = attempts
+                break
+            clear_script()
+
+        for report in reports:
+            item.ihook.pytest_runtest_logreport(report=report)
+        item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+        return True
+
+    def pytest_report_teststatus(self, report: pytest.TestReport) -> tuple[str, str, tuple[str, dict]] | None:
+        """Show tests that passed on a retry as flaky."""
+        if report.when == "call" and report.passed and report.nodeid in self.flaky:
+            return "flaky", "f", ("FLAKY", {"yellow": True})
+        return None
+
+    def get_summary(self) -> str:
+        """Get the flaky and the consistently failing tests with their number of attempts."""
+        lines = [f"FLAKY {nodeid} (passed on attempt {attempts})" for nodeid, attempts in self.flaky.items()]
+        lines.extend(f"FAILED {nodeid} (failed all {attempts} attempts)" for nodeid, attempts in self.failed.items())
+        return "\n".join(lines)
+
+    def pytest_terminal_summary(self, terminalreporter: TerminalReporter) -> None:
+        """Print the flaky and the consistently failing tests."""
+        summary = self.get_summary()
+        if summary:
+            terminalreporter.section("retries")
+            terminalreporter.write_line(summary)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the retry plugin if retries are configured in the environment."""
+    config.addinivalue_line(
+        "markers",
+        f"{RETRIES_MARKER}(retries): number of times the test is run again in the same Nuke process if it fails.",
+    )
+    retries = os.getenv(RETRIES_ENV)
+    if retries:
+        config.pluginmanager.register(RetryPlugin(int(retries)), "nuke_test_retry")
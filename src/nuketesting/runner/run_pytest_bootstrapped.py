@@ -37,6 +37,12 @@ def _run_tests(packages_directory: str, test_directory: str, pytest_arguments: l
 
     import pytest
 
+    from nuketesting.runner.manifest import get_manifest_arguments
+    from nuketesting.runner.ordering import get_ordering_arguments
+    from nuketesting.runner.profiling import get_profiling_arguments
+    from nuketesting.runner.report import get_report_arguments
+    from nuketesting.runner.retry import get_retry_arguments
+
     if "nuke" in sys.modules:
         import nuke
 
@@ -48,6 +54,11 @@ def _run_tests(packages_directory: str, test_directory: str, pytest_arguments: l
     arguments = [test_directory]
     if pytest_arguments:
         arguments.extend(pytest_arguments)
+    arguments.extend(get_profiling_arguments())
+    arguments.extend(get_report_arguments())
+    arguments.extend(get_ordering_arguments())
+    arguments.extend(get_retry_arguments())
+    arguments.extend(get_manifest_arguments())
     sys.exit(pytest.main(arguments))
 
 
@@ -5,12 +5,18 @@ import platform
 import subprocess
 import sys
 from pathlib import Path
+from typing import Sequence
 
 import pytest
 
 import nuketesting
-from nuketesting.datamodel.constants import RUN_TESTS_SCRIPT
+from nuketesting.datamodel.constants import RUN_TESTS_SCRIPT, RUNNER_NAME_ENV
 from nuketesting.runner.debugging import get_debug_info
+from nuketesting.runner.manifest import get_manifest_arguments
+from nuketesting.runner.ordering import get_ordering_arguments
+from nuketesting.runner.profiling import get_profiling_arguments
+from nuketesting.runner.report import get_report_arguments
+from nuketesting.runner.retry import get_retry_arguments
 
 
 class RunnerException(Exception):  # noqa: N818
@@ -29,6 +35,7 @@ class Runner:
         executable_args: list[str] | None = None,
         pytest_args: tuple[str] | None = None,
         run_in_terminal_mode: bool = True,
+        name: str | None = None,
     ):
         """Initialize the testrunner with the test config.
 
@@ -37,6 +44,8 @@ class Runner:
             executable_args: optional list of arguments forwarded to the nuke executable.
             pytest_args: all arguments to pass to pytest
             run_in_terminal_mode: true if it should run using the nuke executable, false if not.
+            name: name of the runner configuration. Tests can read it from the `NUKE_TESTING_RUNNER_NAME`
+                environment variable, for example to store benchmark results per runner.
         """
         self._nuke_executable: Path = Path(nuke_executable)
         self._check_nuke_executable(self._nuke_executable)
@@ -44,9 +53,15 @@ class Runner:
         self._executable_args = executable_args if isinstance(executable_args, list) else []
         self._pytest_args: tuple[str] = pytest_args
         self._run_in_terminal_mode: bool = run_in_terminal_mode
+        self._name = name
 
         self._clean_executable_args()
 
+    @property
+    def run_in_terminal_mode(self) -> bool:
+        """True if the tests run in a separate Nuke process, false if they run in the current interpreter."""
+        return self._run_in_terminal_mode
+
     def _clean_executable_args(self) -> None:
         """Check and clean the executable args."""
         self._executable_args = [arg for arg in self._executable_args if arg and arg != "-t"]
@@ -93,15 +108,18 @@ class Runner:
             raise RunnerException(msg)
         return packages_path
 
-    def execute_tests(self, test_path: str | Path) -> int:
+    def execute_tests(self, test_path: str | Path, extra_pytest_args: Sequence[str] = ()) -> int:
         """Run the testrunner with provided arguments.
 
         Args:
             test_path: filepath to the tests. Can be relative to the current working directory.
                        Individual tests can be executed with the file.py::TestClass::test_function
                        syntax. For more details consult the pytest documentation.
+            extra_pytest_args: arguments for pytest in addition to the configured ones, like more test paths.
         """
-        return self._execute_in_nuke(test_path) if self._run_in_terminal_mode else self._execute_native(test_path)
+        if self._run_in_terminal_mode:
+            return self._execute_in_nuke(test_path, extra_pytest_args)
+        return self._execute_native(test_path, extra_pytest_args)
 
     def _get_packages_directory(self) -> str:
         """Get the PATH to the packages locations necessary for running tests."""
@@ -109,35 +127,25 @@ class Runner:
         testrunner_directory = Path(nuketesting.__file__).parent.parent
         return f"{packages_directory!s};{testrunner_directory!s}"
 
-    def _execute_in_nuke(self, test_path: str | Path) -> int:
+    def _execute_in_nuke(self, test_path: str | Path, extra_pytest_args: Sequence[str] = ()) -> int:
         """Execute the tests using the Nuke interpreter.
 
         Args:
             test_path: path to tests
+            extra_pytest_args: arguments for pytest in addition to the configured ones.
 
         Returns:
             int: exitcode of tests
         """
-        packages_directory = self._get_packages_directory()
-        arguments = [
-            str(self._nuke_executable),
-            *self._executable_args,
-            "-t",
-            str(RUN_TESTS_SCRIPT),
-            "--packages_directory",
-            str(packages_directory),
-            "--test_dir",
-            str(test_path),
-        ]
-        if self._pytest_args:
-            pytest_args = [f"--pytest_arg={arg}" for arg in self._pytest_args]
-            arguments.extend(pytest_args)
+        arguments = self._build_arguments(test_path, extra_pytest_args)
 
         # If a debugger is used, we need to forward the debug configuration to the
         # Nuke process. This here will use the environment variables to pass the
         # configuration because the bootstrap CLI is already very long and complex.
         env = os.environ.copy()
         env.update(get_debug_info())
+        if self._name:
+            env[RUNNER_NAME_ENV] = self._name
 
         try:
             subprocess.check_call(arguments, env=env)
@@ -145,11 +153,36 @@ class Runner:
             return err.returncode
         return 0
 
-    def _execute_native(self, test_path: str | Path) -> int:
+    def _build_arguments(self, test_path: str | Path, extra_pytest_args: Sequence[str] = ()) -> list[str]:
+        """Build the command line that runs the bootstrap script with the Nuke interpreter.
+
+        Args:
+            test_path: path to tests
+            extra_pytest_args: arguments for pytest in addition to the configured ones.
+
+        Returns:
+            The executable followed by all arguments.
+        """
+        packages_directory = self._get_packages_directory()
+        arguments = [
+            str(self._nuke_executable),
+            *self._executable_args,
+            "-t",
+            str(RUN_TESTS_SCRIPT),
+            "--packages_directory",
+            str(packages_directory),
+            "--test_dir",
+            str(test_path),
+        ]
+        arguments.extend(f"--pytest_arg={arg}" for arg in [*(self._pytest_args or ()), *extra_pytest_args])
+        return arguments
+
+    def _execute_native(self, test_path: str | Path, extra_pytest_args: Sequence[str] = ()) -> int:
         """Execute tests within the current interpreter
 
         Args:
             test_path: path to tests to run
+            extra_pytest_args: arguments for pytest in addition to the configured ones.
 
         Raises:
             RunnerException: if Nuke could still not be imported
@@ -168,5 +201,22 @@ class Runner:
 
         if self._pytest_args:
             arguments.extend(list(self._pytest_args))
-
-        return pytest.main(arguments)
+        arguments.extend(extra_pytest_args)
+        arguments.extend(get_profiling_arguments())
+        arguments.extend(get_report_arguments())
+        arguments.extend(get_ordering_arguments())
+        arguments.extend(get_retry_arguments())
+        arguments.extend(get_manifest_arguments())
+
+        if not self._name:
+            return pytest.main(arguments)
+        # Like the environment of the Nuke process, the runner name only applies to this run.
+        previous_name = os.environ.get(RUNNER_NAME_ENV)
+        os.environ[RUNNER_NAME_ENV] = self._name
+        try:
+            return pytest.main(arguments)
+        finally:
+            if previous_name is None:
+                del os.environ[RUNNER_NAME_ENV]
+            else:
+                os.environ[RUNNER_NAME_ENV] = previous_name
@@ -0,0 +1,104 @@
+"""Module for walking the upstream graph of nodes."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable
+
+from nuketesting.datamodel.constants import UI_KNOBS
+from nuketesting.node_tree_checks.graph import GraphNode, NodeGraph
+
+if TYPE_CHECKING:
+    import nuke
+
+KnobFilter = Callable[[str, "nuke.Knob"], bool]
+"""Function that decides by the name and the knob if a knob is part of the graph."""
+
+
+def is_image_knob(name: str, knob: nuke.Knob) -> bool:
+    """Check if the knob might change the image. Knobs of the node graph UI never do."""
+    return name not in UI_KNOBS
+
+
+def is_changed_knob(name: str, knob: nuke.Knob) -> bool:
+    """Check if the knob might change the image and differs from its default value."""
+    return name not in UI_KNOBS and knob.notDefault()
+
+
+def get_dependencies(node: nuke.Node) -> list[nuke.Node | None]:
+    """Get all nodes that the image of the provided node depends on.
+
+    Args:
+        node: node to get the dependencies for.
+
+    Returns:
+        The inputs of the node followed by the internal output nodes if the node is a group.
+        Disconnected inputs are None.
+    """
+    dependencies = [node.input(index) for index in range(node.inputs())]
+    dependencies.extend(get_group_outputs(node))
+    return dependencies
+
+
+def get_group_outputs(node: nuke.Node) -> list[nuke.Node]:
+    """Get the internal output nodes of groups and gizmos.
+
+    Args:
+        node: node that might be a group.
+
+    Returns:
+        All internal "Output" nodes or an empty list for regular nodes.
+    """
+    get_children = getattr(node, "nodes", None)
+    if not callable(get_children):
+        return []
+    return sorted(
+        (child for child in get_children() if child.Class() == "Output"),
+        key=lambda child: child.fullName(),
+    )
+
+
+def read_graph_node(node: nuke.Node, knob_filter: KnobFilter = is_changed_knob, prefix: str = "") -> GraphNode:
+    """Read the class, the knob values and the connections of a single node.
+
+    Args:
+        node: the node to read.
+        knob_filter: decides which knobs are stored.
+        prefix: the prefix to remove from all node names.
+    """
+    return GraphNode(
+        name=_relative_name(node, prefix),
+        node_class=node.Class(),
+        knobs={name: knob.toScript() for name, knob in node.knobs().items() if knob_filter(name, knob)},
+        inputs=tuple(_relative_name(node.input(index), prefix) for index in range(node.inputs())),
+        outputs=tuple(_relative_name(output, prefix) for output in get_group_outputs(node)),
+    )
+
+
+def read_upstream_graph(node: nuke.Node, knob_filter: KnobFilter = is_changed_knob) -> NodeGraph:
+    """Read the node and everything upstream of it, including the content of groups.
+
+    Args:
+        node: the node to start from.
+        knob_filter: decides which knobs are stored.
+
+    Returns:
+        The graph with the full names of the nodes.
+    """
+    nodes = {}
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        name = current.fullName()
+        if name in nodes:
+            continue
+        nodes[name] = read_graph_node(current, knob_filter)
+        stack.extend(dependency for dependency in get_dependencies(current) if dependency is not None)
+    return NodeGraph(nodes)
+
+
+def _relative_name(node: nuke.Node | None, prefix: str) -> str | None:
+    """Get the full name of the node without the prefix."""
+    if node is None:
+        return None
+    name = node.fullName()
+    return name[len(prefix) :] if prefix and name.startswith(prefix) else name
@@ -0,0 +1,82 @@
+"""Tests for timing callbacks and the gizmo profile assertions."""
+
+from __future__ import annotations
+
+import pytest
+
+from nuketesting.benchmark.callbacks import CallbackRecorder, CallbackTiming, GizmoProfile
+from nuketesting.benchmark.measure import BenchmarkStatistics
+
+
+@pytest.fixture
+def profile() -> GizmoProfile:
+    """Profile of a gizmo whose 'size' knob triggers three callbacks."""
+    return GizmoProfile(
+        "MyGizmo",
+        BenchmarkStatistics(0.02, 0.018, 0.022, 0.015, 0.03, 5),
+        {"size": CallbackTiming("size", [0.001, 0.002, 0.003]), "mix": CallbackTiming("mix", [0.0005])},
+    )
+
+
+def test_recorder_assigns_calls_to_trigger() -> None:
+    """Test that invocations are only recorded while a knob change is recorded."""
+    recorder = CallbackRecorder()
+    calls = []
+    callback = recorder.wrap(calls.append)
+
+    callback("untracked")
+    with recorder.trigger("size"):
+        callback("first")
+        callback("second")
+    with recorder.trigger("mix"):
+        pass
+
+    assert calls == ["untracked", "first", "second"]
+    assert recorder.timings["size"].calls == 2  # noqa: PLR2004
+    assert recorder.timings["mix"].calls == 0
+
+
+def test_recorder_records_failing_callbacks() -> None:
+    """Test that failing callbacks are recorded and still raise."""
+    recorder = CallbackRecorder()
+
+    def broken() -> None:
+        raise RuntimeError
+
+    with recorder.trigger("size"), pytest.raises(RuntimeError):
+        recorder.wrap(broken)()
+
+    assert recorder.timings["size"].calls == 1
+
+
+def test_creation_assertion(profile: GizmoProfile) -> None:
+    """Test that the median creation time is compared against the limit."""
+    profile.assert_creation_below(25)
+    with pytest.raises(AssertionError, match=r"Creating MyGizmo takes 20.00 ms, which is not below 20 ms"):
+        profile.assert_creation_below(20)
+
+
+def test_callback_calls_assertion(profile: GizmoProfile) -> None:
+    """Test that the number of invocations is checked per knob change."""
+    profile.assert_callback_calls_at_most(3)
+    profile.assert_callback_calls_at_most(1, knob="mix")
+    with pytest.raises(AssertionError, match=r"'size' triggers 3 calls \(limit 2\)"):
+        profile.assert_callback_calls_at_most(2)
+    with pytest.raises(KeyError, match="The knob 'missing' of MyGizmo was not changed"):
+        profile.assert_callback_calls_at_most(2, knob="missing")
+
+
+def test_callback_time_assertion(profile: GizmoProfile) -> None:
+    """Test that the duration of all invocations of a knob change is checked."""
+    profile.assert_callback_time_below(10)
+    with pytest.raises(AssertionError, match=r"'size' takes 6.00 ms \(limit 5 ms\)"):
+        profile.assert_callback_time_below(5)
+
+
+def test_format(profile: GizmoProfile) -> None:
+    """Test that the knobs are sorted by their callback time."""
+    lines = profile.format().splitlines()
+
+    assert lines[0] == "MyGizmo: creation median 20.00 ms (5 rounds), 4 callback calls"
+    assert lines[2].split() == ["size", "3", "6.00"]
+    assert lines[3].split() == ["mix", "1", "0.50"]
@@ -0,0 +1,48 @@
+"""Tests for profiling the creation and the knobChanged callbacks of groups in Nuke."""
+
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+nuke = pytest.importorskip("nuke")
+
+from nuketesting.benchmark.gizmo_profiler import profile_gizmo
+
+KNOB_CHANGED = "record_knob_change(nuke.thisNode().Class(), nuke.thisKnob().name())"
+
+
+def _create_group() -> nuke.Node:
+    """Create a group with two knobs whose knobChanged script records every change."""
+    group = nuke.nodes.Group()
+    group.addKnob(nuke.Int_Knob("size"))
+    group.addKnob(nuke.Int_Knob("mix"))
+    group["knobChanged"].setValue(KNOB_CHANGED)
+    return group
+
+
+def test_group_callbacks_counted(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the knobChanged script and the registered callbacks run once for every knob change."""
+    changes = []
+    registered = []
+    main = sys.modules["__main__"]
+    monkeypatch.setattr(main, "nuke", nuke, raising=False)
+    monkeypatch.setattr(main, "record_knob_change", lambda *change: changes.append(change), raising=False)
+
+    def callback() -> None:
+        registered.append(nuke.thisKnob().name())
+
+    nuke.addKnobChanged(callback, nodeClass="Group")
+    try:
+        profile = profile_gizmo(_create_group, repeats=1, warmup=0, knob_values={"size": 3, "mix": 1})
+    finally:
+        nuke.removeKnobChanged(callback, nodeClass="Group")
+
+    assert changes == [("Group", "size"), ("Group", "mix")]
+    assert registered == ["size", "mix"]
+    assert profile.callbacks["size"].calls == 2  # noqa: PLR2004
+    assert profile.callbacks["mix"].calls == 2  # noqa: PLR2004
+    profile.assert_callback_calls_at_most(2)
+    with pytest.raises(AssertionError, match="'size' triggers 2 calls"):
+        profile.assert_callback_calls_at_most(1, knob="size")
@@ -0,0 +1,42 @@
+"""Tests for the statistics of time measurements."""
+
+from __future__ import annotations
+
+import pytest
+
+from nuketesting.benchmark.measure import BenchmarkStatistics, find_regression, measure, summarize
+
+
+def test_summarize() -> None:
+    """Test that the statistics are robust against single outliers."""
+    statistics = summarize([1.0, 5.0, 2.0, 100.0, 3.0])
+
+    assert statistics == BenchmarkStatistics(median=3.0, q1=2.0, q3=5.0, minimum=1.0, maximum=100.0, rounds=5)
+    assert statistics.iqr == pytest.approx(3.0)
+    assert BenchmarkStatistics.from_dict(statistics.to_dict()) == statistics
+
+
+def test_measure_calls_setup_before_every_call() -> None:
+    """Test that warmup calls are not measured and setup runs before every call."""
+    calls = []
+
+    durations = measure(lambda: calls.append("call"), warmup=2, repeats=3, setup=lambda: calls.append("setup"))
+
+    assert len(durations) == 3  # noqa: PLR2004
+    assert calls == ["setup", "call"] * 5
+
+
+@pytest.mark.parametrize(
+    ("current", "regression"),
+    [
+        (BenchmarkStatistics(1.1, 1.0, 1.2, 0.9, 1.3, 5), False),
+        (BenchmarkStatistics(1.5, 1.0, 2.0, 0.9, 2.1, 5), False),
+        (BenchmarkStatistics(1.5, 1.4, 1.6, 1.3, 1.7, 5), True),
+    ],
+    ids=["below_threshold", "overlapping_quartiles", "regression"],
+)
+def test_find_regression(current: BenchmarkStatistics, regression: bool) -> None:
+    """Test that only clear slowdowns above the threshold are regressions."""
+    baseline = BenchmarkStatistics(1.0, 0.9, 1.1, 0.8, 1.2, 5)
+
+    assert (find_regression(current, baseline, threshold=0.2) is not None) == regression
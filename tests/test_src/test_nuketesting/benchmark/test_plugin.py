@@ -0,0 +1,96 @@
+"""Tests for the benchmark fixture and its baselines."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from nuketesting.benchmark.baseline import BaselineStore, get_environment_key
+from nuketesting.benchmark.measure import BenchmarkStatistics
+from nuketesting.benchmark.node_timings import NodeProfile, NodeTiming, save_profiles, top_nodes
+from nuketesting.benchmark.plugin import BenchmarkSession, NukeBenchmark, format_profile
+from nuketesting.datamodel.constants import RUNNER_NAME_ENV
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_environment_key_uses_runner_name(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that baselines of different runners are separated."""
+    monkeypatch.setenv(RUNNER_NAME_ENV, "nuke15")
+
+    assert get_environment_key().startswith("nuke15/")
+
+
+def test_baseline_store_roundtrip(tmp_path: Path) -> None:
+    """Test that baselines are stored per environment."""
+    statistics = BenchmarkStatistics(1.0, 0.9, 1.1, 0.8, 1.2, 5)
+    store = BaselineStore(tmp_path / "baseline.json")
+    store.set("test_blur", "nuke15/15.1v1", statistics)
+    store.save()
+
+    loaded = BaselineStore(tmp_path / "baseline.json")
+    assert loaded.get("test_blur", "nuke15/15.1v1") == statistics
+    assert loaded.get("test_blur", "nuke14/14.0v5") is None
+
+
+def test_baseline_store_merges_parallel_saves(tmp_path: Path) -> None:
+    """Test that stores of parallel processes keep the baselines that the other stores saved."""
+    first = BaselineStore(tmp_path / "baseline.json")
+    second = BaselineStore(tmp_path / "baseline.json")
+    first.set("test_a", "env", BenchmarkStatistics(1.0, 0.9, 1.1, 0.8, 1.2, 5))
+    second.set("test_b", "env", BenchmarkStatistics(2.0, 1.9, 2.1, 1.8, 2.2, 5))
+
+    first.save()
+    second.save()
+
+    loaded = BaselineStore(tmp_path / "baseline.json")
+    assert loaded.get("test_a", "env").median == 1.0
+    assert loaded.get("test_b", "env").median == 2.0  # noqa: PLR2004
+    assert not (tmp_path / "baseline.json.lock").exists()
+
+
+def test_benchmark_updates_baseline(tmp_path: Path) -> None:
+    """Test that update mode stores the measurement instead of comparing it."""
+    session = BenchmarkSession(BaselineStore(tmp_path / "baseline.json"), "env", update=True, repeats=3)
+
+    statistics = NukeBenchmark("test_id", session)(lambda: None)
+
+    assert session.store.get("test_id", "env") == statistics
+    assert statistics.rounds == session.repeats
+
+
+def test_benchmark_fails_on_regression(tmp_path: Path) -> None:
+    """Test that a benchmark slower than its baseline fails the test."""
+    session = BenchmarkSession(BaselineStore(tmp_path / "baseline.json"), "env")
+    session.store.set("test_id", "env", BenchmarkStatistics(0.0, 0.0, 0.0, 0.0, 0.0, 5))
+    benchmark = NukeBenchmark("test_id", session)
+
+    benchmark(lambda: None)  # A median of zero can't be compared.
+    session.store.set("test_id#2", "env", BenchmarkStatistics(1e-9, 1e-9, 1e-9, 1e-9, 1e-9, 5))
+    with pytest.raises(pytest.fail.Exception, match="test_id#2"):
+        benchmark(lambda: sum(range(10000)))
+
+
+def test_node_profiles_are_ranked_and_saved(tmp_path: Path) -> None:
+    """Test that only the slowest nodes are reported and stored."""
+    timings = [
+        NodeTiming("Gizmo1.Blur1", "Blur", engine=5000, calls=4),
+        NodeTiming("Gizmo1.Merge1", "Merge2", request=10, engine=20000, calls=4),
+        NodeTiming("Gizmo1.Dot1", "Dot"),
+    ]
+    profile = NodeProfile(nodes=top_nodes(timings, count=2), memory_usage=1024**2)
+
+    assert [timing.name for timing in profile.nodes] == ["Gizmo1.Merge1", "Gizmo1.Blur1"]
+    assert format_profile(profile).splitlines()[1].split()[:6] == [
+        "Gizmo1.Merge1",
+        "Merge2",
+        "0.00",
+        "0.00",
+        "0.01",
+        "20.00",
+    ]
+    save_profiles({"test_id": profile}, tmp_path / "profile.json")
+    assert json.loads((tmp_path / "profile.json").read_text())["test_id"]["nodes"][0]["engine"] == 20000  # noqa: PLR2004
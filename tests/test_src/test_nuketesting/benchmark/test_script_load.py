@@ -0,0 +1,62 @@
+"""Tests for the script profile assertions and their report."""
+
+from __future__ import annotations
+
+import pytest
+
+from nuketesting.benchmark.measure import BenchmarkStatistics
+from nuketesting.benchmark.script_load import ScriptProfile, format_profiles
+
+
+@pytest.fixture
+def profile() -> ScriptProfile:
+    """Profile of a script that loads in 200 ms and renders its first frame in 50 ms."""
+    return ScriptProfile(
+        "comp.nk",
+        BenchmarkStatistics(0.2, 0.19, 0.21, 0.18, 0.25, 5),
+        node_count=120,
+        memory_delta=64 * 1024**2,
+        first_render=BenchmarkStatistics(0.05, 0.04, 0.06, 0.04, 0.07, 5),
+    )
+
+
+def test_assertions_pass_within_limits(profile: ScriptProfile) -> None:
+    """Test that scripts within all limits pass."""
+    profile.assert_load_below(250)
+    profile.assert_nodes_at_most(120)
+    profile.assert_memory_below(65)
+    profile.assert_first_render_below(60)
+
+
+@pytest.mark.parametrize(
+    ("assertion", "limit", "message"),
+    [
+        ("assert_load_below", 200, r"Loading 'comp.nk' takes 200.00 ms, which is not below 200 ms."),
+        ("assert_nodes_at_most", 100, r"'comp.nk' contains 120 nodes \(limit 100\)."),
+        ("assert_memory_below", 64, r"Loading 'comp.nk' uses 64.0 MB, which is not below 64 MB."),
+        ("assert_first_render_below", 10, r"Rendering the first frame of 'comp.nk' takes 50.00 ms"),
+    ],
+)
+def test_assertions_fail_above_limits(profile: ScriptProfile, assertion: str, limit: float, message: str) -> None:
+    """Test that every exceeded limit fails with a descriptive message."""
+    with pytest.raises(AssertionError, match=message):
+        getattr(profile, assertion)(limit)
+
+
+def test_first_render_without_write_nodes(profile: ScriptProfile) -> None:
+    """Test that a missing render measurement fails instead of passing silently."""
+    profile.first_render = None
+
+    with pytest.raises(AssertionError, match="no Write nodes"):
+        profile.assert_first_render_below(1000)
+
+
+def test_format_profiles_slowest_first(profile: ScriptProfile) -> None:
+    """Test that the table lists the slowest loading script first."""
+    fast = ScriptProfile("roto.nk", BenchmarkStatistics(0.01, 0.01, 0.01, 0.01, 0.01, 5), 3, 0)
+
+    lines = format_profiles([fast, profile]).splitlines()
+
+    assert lines[1].startswith("comp.nk")
+    assert lines[2].startswith("roto.nk")
+    assert lines[2].split()[-1] == "-"
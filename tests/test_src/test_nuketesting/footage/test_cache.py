@@ -0,0 +1,146 @@
+"""Tests for the footage cache."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from nuketesting.footage.cache import FootageCache, expand_sequence
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> Path:
+    """Directory that stands in for the network storage with a sequence of three frames."""
+    directory = tmp_path / "storage" / "plates"
+    directory.mkdir(parents=True)
+    for frame in (1001, 1002, 1003):
+        (directory / f"plate.{frame}.exr").write_bytes(f"frame {frame}".encode())
+    return directory
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> FootageCache:
+    """Empty cache with a budget of 20 bytes."""
+    return FootageCache(tmp_path / "cache", max_bytes=20)
+
+
+@pytest.mark.parametrize(
+    ("pattern", "expected"),
+    [
+        ("plate.%04d.exr", ["plate.0009.exr", "plate.1001.exr"]),
+        ("plate.%d.exr", ["plate.9.exr", "plate.1001.exr"]),
+        ("plate.###.exr", ["plate.009.exr", "plate.1001.exr"]),
+        ("still.exr", ["still.exr"]),
+    ],
+)
+def test_expand_sequence(pattern: str, expected: list[str]) -> None:
+    """Test that printf and hash patterns are expanded."""
+    assert expand_sequence(pattern, [9, 1001]) == expected
+
+
+def test_localize(cache: FootageCache, storage: Path) -> None:
+    """Test that files are copied once and keep their names."""
+    local_file = cache.localize(storage / "plate.1001.exr")
+
+    assert local_file.name == "plate.1001.exr"
+    assert local_file.read_bytes() == b"frame 1001"
+    assert cache.localize(storage / "plate.1001.exr") == local_file
+    assert cache.nbytes == len(b"frame 1001")
+
+
+def test_identical_files_stored_once(cache: FootageCache, storage: Path, tmp_path: Path) -> None:
+    """Test that files with the same content share their storage."""
+    copy = tmp_path / "other" / "plate.1001.exr"
+    copy.parent.mkdir()
+    copy.write_bytes((storage / "plate.1001.exr").read_bytes())
+
+    first = cache.localize(storage / "plate.1001.exr")
+    second = cache.localize(copy)
+
+    assert first != second
+    assert first.samefile(second)
+    assert cache.nbytes == len(b"frame 1001")
+
+
+def test_changed_source_copied_again(cache: FootageCache, storage: Path) -> None:
+    """Test that the local copy is updated once the source changed."""
+    source = storage / "plate.1001.exr"
+    cache.localize(source)
+    source.write_bytes(b"new render")
+
+    assert cache.localize(source).read_bytes() == b"new render"
+
+
+def test_localize_sequence(cache: FootageCache, storage: Path) -> None:
+    """Test that the existing frames are localized and the pattern points to the local files."""
+    local_pattern = cache.localize_sequence(str(storage / "plate.%04d.exr"), range(1000, 1004))
+
+    assert local_pattern.endswith("/plate.%04d.exr")
+    assert [path.split("/")[-1] for path in expand_sequence(local_pattern, [1001])] == ["plate.1001.exr"]
+    assert (cache.get_local_directory(storage) / "plate.1003.exr").read_bytes() == b"frame 1003"
+    assert not (cache.get_local_directory(storage) / "plate.1000.exr").exists()
+    assert cache.localize_sequence(str(storage / "missing.%04d.exr"), [1001]) is None
+
+
+def test_evict_least_recently_used(cache: FootageCache, storage: Path) -> None:
+    """Test that the least recently used files are removed until the cache fits into the budget."""
+    first = cache.localize(storage / "plate.1001.exr")
+    second = cache.localize(storage / "plate.1002.exr")
+    third = cache.localize(storage / "plate.1003.exr")
+    for index, local_file in enumerate([second, first, third]):
+        os.utime(local_file.with_name(f".{local_file.name}.source"), (index, index))
+
+    assert cache.evict(grace_period=0) == len(b"frame 1002")
+    assert not second.exists()
+    assert first.exists()
+    assert third.exists()
+    assert cache.nbytes == 20  # noqa: PLR2004
+
+
+def test_recently_used_files_kept(cache: FootageCache, storage: Path) -> None:
+    """Test that files within the grace period are kept even if the budget is exceeded."""
+    for frame in (1001, 1002, 1003):
+        cache.localize(storage / f"plate.{frame}.exr")
+
+    assert cache.evict() == 0
+    assert cache.nbytes == 30  # noqa: PLR2004
+
+
+def test_copies_without_hardlinks(cache: FootageCache, storage: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that copies count against the budget and objects of used copies are kept."""
+
+    def link(source: Path, target: Path) -> None:
+        raise OSError
+
+    monkeypatch.setattr(os, "link", link)
+    first = cache.localize(storage / "plate.1001.exr")
+    second = cache.localize(storage / "plate.1002.exr")
+    os.utime(second.with_name(f".{second.name}.source"), (0, 0))
+
+    assert cache.nbytes == 40  # noqa: PLR2004
+    assert cache.evict(grace_period=0) == len(b"frame 1002") * 2
+    assert first.read_bytes() == b"frame 1001"
+    assert not second.exists()
+    assert cache.nbytes == 20  # noqa: PLR2004
+
+
+def test_files_removed_concurrently(cache: FootageCache, storage: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that files which another process removes while the cache is scanned are skipped."""
+    for frame in (1001, 1002, 1003):
+        local_file = cache.localize(storage / f"plate.{frame}.exr")
+        os.utime(local_file.with_name(f".{local_file.name}.source"), (frame, frame))
+    glob = Path.glob
+
+    def glob_with_removed_files(self: Path, pattern: str) -> Iterator[Path]:
+        for path in glob(self, pattern):
+            yield path
+            yield path.with_name(f"{path.name}.removed")
+
+    monkeypatch.setattr(Path, "glob", glob_with_removed_files)
+
+    assert cache.nbytes == 30  # noqa: PLR2004
+    assert cache.evict(grace_period=0) == len(b"frame 1001")
+    assert cache.nbytes == 20  # noqa: PLR2004
@@ -6,7 +6,14 @@ nuke = pytest.importorskip("nuke")
 
 from unittest.mock import MagicMock
 
-from nuketesting.bbox_checks.bbox_checker import assert_bbox_shape, assert_same_bbox
+from nuketesting.bbox_checks.bbox_checker import (
+    assert_bbox_shape,
+    assert_bbox_shapes,
+    assert_same_bbox,
+    assert_same_bboxes,
+    collect_bboxes,
+    get_bbox,
+)
 
 
 def test_assert_same_bbox() -> None:
@@ -97,3 +104,53 @@ class TestAssertBBoxShapeWrongInput:
         node = MagicMock(spec=nuke.Node)
         with pytest.raises(TypeError):
             assert_bbox_shape(node, wrong_instance)
+
+
+def test_get_bbox() -> None:
+    """Test that the bbox is returned as left, bottom, right and top."""
+    crop = nuke.nodes.Crop(box="10 20 30 40", crop=False)
+    assert get_bbox(crop) == [10, 20, 30, 40]
+
+
+@pytest.fixture
+def animated_crop() -> nuke.Node:
+    """Create a crop whose right side moves from 100 at frame 1 to 200 at frame 2."""
+    crop = nuke.nodes.Crop(box="0 0 100 100", crop=False)
+    crop["box"].setAnimated(2)
+    crop["box"].setValueAt(100, 1, 2)
+    crop["box"].setValueAt(200, 2, 2)
+    return crop
+
+
+def test_collect_bboxes(animated_crop: nuke.Node) -> None:
+    """Test that the bounding boxes of all nodes are collected for all frames."""
+    constant = nuke.nodes.Constant()
+    nuke.frame(5)
+
+    table = collect_bboxes([animated_crop, constant], frames=[1, 2])
+
+    assert table.get(animated_crop.fullName(), 1) == [0, 0, 100, 100]
+    assert table.get(animated_crop.fullName(), 2) == [0, 0, 200, 100]
+    assert table.get(constant.fullName(), 2) == get_bbox(constant)
+    assert nuke.frame() == 5  # noqa: PLR2004
+
+
+def test_assert_same_bboxes_reports_all_frames(animated_crop: nuke.Node) -> None:
+    """Test that mismatches of all frames are reported at once."""
+    static_crop = nuke.nodes.Crop(box="0 0 50 100", crop=False)
+
+    with pytest.raises(AssertionError) as error:
+        assert_same_bboxes([animated_crop], [static_crop], frames=[1, 2])
+
+    assert error.match("2 bounding boxes do not match")
+    assert error.match("Frame 1:")
+    assert error.match("Frame 2:")
+
+
+def test_assert_bbox_shapes(animated_crop: nuke.Node) -> None:
+    """Test that only the frames that differ from the shape are reported."""
+    with pytest.raises(AssertionError) as error:
+        assert_bbox_shapes({animated_crop: "0 0 100 100"}, frames=[1, 2])
+
+    assert error.match("1 bounding boxes do not match")
+    assert error.match("Frame 2:")
@@ -0,0 +1,59 @@
+"""Tests for the bounding box snapshots."""
+
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING
+
+import pytest
+
+nuke = pytest.importorskip("nuke")
+
+from nuketesting.bbox_checks.bbox_checker import BBoxTable
+from nuketesting.bbox_checks.bbox_snapshot import (
+    assert_bbox_snapshot,
+    diff_bbox_snapshots,
+    load_bbox_snapshot,
+    save_bbox_snapshot,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_save_and_load(tmp_path: Path) -> None:
+    """Test that a stored snapshot is loaded unchanged."""
+    table = BBoxTable(nodes=("Blur1", "Group1.Crop1"), frames=(1, 2), data=array("i", range(16)))
+    filepath = tmp_path / "bboxes.json"
+
+    save_bbox_snapshot(table, filepath)
+
+    assert load_bbox_snapshot(filepath) == table
+
+
+def test_diff_reports_nodes_and_growth() -> None:
+    """Test that missing, new and grown nodes are reported."""
+    expected = BBoxTable(nodes=("Blur1", "Crop1"), frames=(1,), data=array("i", [0, 0, 10, 10, 0, 0, 5, 5]))
+    actual = BBoxTable(nodes=("Blur1", "Grade1"), frames=(1,), data=array("i", [-5, -5, 15, 15, 0, 0, 5, 5]))
+
+    assert diff_bbox_snapshots(expected, actual) == [
+        "Missing node 'Crop1'",
+        "New node 'Grade1'",
+        "Frame 1 'Blur1': [0, 0, 10, 10] -> [-5, -5, 15, 15] (area x4.00)",
+    ]
+
+
+def test_assert_bbox_snapshot(tmp_path: Path) -> None:
+    """Test that a changed bounding box fails against the stored snapshot."""
+    filepath = tmp_path / "bboxes.json"
+    crop = nuke.nodes.Crop(box="0 0 100 100", crop=False)
+
+    with pytest.raises(AssertionError, match="does not exist"):
+        assert_bbox_snapshot(filepath)
+
+    assert_bbox_snapshot(filepath, update=True)
+    assert_bbox_snapshot(filepath)
+
+    crop["box"].setValue([0, 0, 200, 100])
+    with pytest.raises(AssertionError, match=f"'{crop.name()}': \\[0, 0, 100, 100\\] -> \\[0, 0, 200, 100\\]"):
+        assert_bbox_snapshot(filepath)
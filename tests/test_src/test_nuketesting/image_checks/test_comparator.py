@@ -0,0 +1,65 @@
+"""Tests for the shared checks of the image comparators."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+nuke = pytest.importorskip("nuke")
+
+from nuketesting.image_checks.comparator import ImageComparator, Mismatch
+
+
+class PixelComparator(ImageComparator):
+    """Comparator whose pixel comparison is replaced by a mock in the tests."""
+
+    def _find_mismatch(self, *args: object) -> Mismatch | None:
+        return None
+
+
+def test_same_graph_skips_pixel_comparison() -> None:
+    """Test that equal upstream graphs are considered equal without comparing pixels."""
+    noise_a = nuke.nodes.Noise()
+    noise_b = nuke.nodes.Noise()
+
+    with patch.object(PixelComparator, "_find_mismatch") as find_mismatch:
+        PixelComparator().assert_equal(noise_a, noise_b)
+
+    find_mismatch.assert_not_called()
+
+
+def test_pixel_mismatch_reported_before_fingerprint() -> None:
+    """Test that the precise pixel mismatch is reported and different fingerprints only reject missed changes."""
+    white = nuke.nodes.Constant(color=1)
+    black = nuke.nodes.Constant(color=0)
+    comparator = PixelComparator(use_fingerprint=True)
+
+    with patch.object(PixelComparator, "_find_mismatch", return_value=Mismatch("Point(0,0) rgba.red: 1 != 0")):
+        with pytest.raises(AssertionError, match=r"Point\(0,0\)"):
+            comparator.assert_equal(white, black)
+        with pytest.raises(AssertionError, match=r"Point\(0,0\)"):
+            PixelComparator().assert_equal(white, black)
+
+    with pytest.raises(AssertionError, match="Proxy cell"):
+        comparator.assert_equal(white, black)
+    PixelComparator().assert_equal(white, black)
+
+
+@pytest.mark.parametrize(("trust_fingerprint", "expected_calls"), [(True, 0), (False, 1)])
+def test_trust_fingerprint(trust_fingerprint: bool, expected_calls: int) -> None:
+    """Test that equal fingerprints only skip the pixel comparison if they are trusted."""
+    noise = nuke.nodes.Noise()
+    grade = nuke.nodes.Grade(white=1.0001, inputs=[noise])
+    grade["white"].setValue(1)
+
+    with patch.object(PixelComparator, "_find_mismatch", return_value=None) as find_mismatch:
+        PixelComparator(use_fingerprint=True, trust_fingerprint=trust_fingerprint).assert_equal(noise, grade)
+
+    assert find_mismatch.call_count == expected_calls
+
+
+def test_pixel_comparison_is_abstract() -> None:
+    """Test that comparators without a pixel comparison can't be created."""
+    with pytest.raises(TypeError):
+        ImageComparator()
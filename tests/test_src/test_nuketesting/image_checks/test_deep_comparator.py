@@ -0,0 +1,82 @@
+"""Tests for the deep comparator."""
+
+from __future__ import annotations
+
+from array import array
+from unittest.mock import patch
+
+import pytest
+
+nuke = pytest.importorskip("nuke")
+
+from nuketesting.image_checks.deep_comparator import DeepBuffer, DeepComparator, find_deep_mismatch
+from nuketesting.image_checks.image_buffer import Region
+
+
+@pytest.fixture
+def deep() -> nuke.Node:
+    """Create a small deep image."""
+    constant = nuke.nodes.Constant(color=0.5, format="square_256")
+    return nuke.nodes.DeepFromImage(inputs=[constant])
+
+
+def test_same_deep_image(deep: nuke.Node) -> None:
+    """Test that the samples of different graphs with equal deep output are compared and pass."""
+    unchanged = nuke.nodes.DeepTransform(translate=[0, 0, 0], inputs=[deep])
+
+    with patch(
+        "nuketesting.image_checks.deep_comparator.find_deep_mismatch", wraps=find_deep_mismatch
+    ) as find_mismatch:
+        DeepComparator().assert_equal(deep, unchanged)
+
+    find_mismatch.assert_called_once()
+
+
+def test_different_depth(deep: nuke.Node) -> None:
+    """Test that moved samples are detected."""
+    moved = nuke.nodes.DeepTransform(translate=[0, 0, 1], inputs=[deep])
+
+    with pytest.raises(AssertionError, match="Deep samples differ"):
+        DeepComparator().assert_equal(deep, moved)
+
+
+def _buffer(counts: list[int], data: list[float]) -> DeepBuffer:
+    """Create a deep buffer of a single row."""
+    return DeepBuffer(
+        region=Region(0, 0, len(counts), 1),
+        channels=("deep.front", "deep.back"),
+        counts=array("I", counts),
+        data=array("f", data),
+    )
+
+
+def test_find_deep_mismatch_counts() -> None:
+    """Test that pixels with different sample counts are reported."""
+    a_buffer = _buffer([1, 2], [1, 1, 1, 1, 2, 2])
+    b_buffer = _buffer([1, 1], [1, 1, 1, 1])
+
+    assert (
+        find_deep_mismatch(a_buffer, b_buffer) == "Sample counts differ in 1 pixels. First: Point(1,0) 2 != 1 samples"
+    )
+
+
+def test_find_deep_mismatch_tolerance() -> None:
+    """Test that value differences are only reported outside the tolerance."""
+    a_buffer = _buffer([0, 2], [1, 1, 2, 2])
+    b_buffer = _buffer([0, 2], [1, 1, 2, 2.5])
+
+    assert find_deep_mismatch(a_buffer, b_buffer, tolerance=1) is None
+    assert find_deep_mismatch(a_buffer, b_buffer) == (
+        "Deep samples differ in 1 pixels (1 values). First: Point(1,0) sample 1 deep.back: 2.0 != 2.5"
+    )
+
+
+def test_find_deep_mismatch_nan() -> None:
+    """Test that NaN values only match NaN values."""
+    a_buffer = _buffer([1], [1, float("nan")])
+
+    assert find_deep_mismatch(a_buffer, _buffer([1], [1, float("nan")])) is None
+    assert find_deep_mismatch(a_buffer, _buffer([1], [1, 2])) == (
+        "Deep samples differ in 1 pixels (1 values). First: Point(0,0) sample 0 deep.back: nan != 2.0"
+    )
+    assert find_deep_mismatch(_buffer([1], [1, 2]), a_buffer, tolerance=1) is not None
@@ -0,0 +1,127 @@
+"""Tests for writing diff artifacts."""
+
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+
+from nuketesting.image_checks.diff_artifacts import (
+    ARTIFACTS_ENV,
+    MAX_IMAGE_SIZE,
+    MAX_TILES,
+    _write_heatmap,
+    get_artifacts_directory,
+    write_diff_artifacts,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@dataclass
+class FakeBuffer:
+    """Buffer with the same layout as the ImageBuffer, without requiring nuke."""
+
+    channels: tuple[str, ...]
+    data: array
+    columns: range
+    rows: range
+    region: tuple[int, int, int, int] = (0, 0, 0, 0)
+    step: int = 1
+
+    def value(self, column: int, row: int, channel: int = 0) -> float:
+        return self.data[(row * len(self.columns) + column) * len(self.channels) + channel]
+
+
+def _buffer(width: int, height: int, values: dict[tuple[int, int], float] | None = None) -> FakeBuffer:
+    """Create a single channel rgba.red buffer with the given pixels set."""
+    data = array("f", [0.0] * width * height)
+    for (column, row), value in (values or {}).items():
+        data[row * width + column] = value
+    return FakeBuffer(("rgba.red",), data, range(width), range(height), (0, 0, width, height))
+
+
+def _read_png_size(filepath: Path) -> tuple[int, int]:
+    """Read the width and height of a PNG file and check that the data is valid."""
+    content = filepath.read_bytes()
+    assert content.startswith(b"\x89PNG\r\n\x1a\n")
+    width, height = struct.unpack(">II", content[16:24])
+    idat_length = struct.unpack(">I", content[33:37])[0]
+    raw = zlib.decompress(content[41 : 41 + idat_length])
+    assert len(raw) == height * (width * 3 + 1)
+    return width, height
+
+
+def test_artifacts_directory_from_environment(tmp_path: Path) -> None:
+    """Test that artifacts are disabled unless a directory is configured."""
+    with patch.dict("os.environ", {}, clear=True):
+        assert get_artifacts_directory() is None
+        assert get_artifacts_directory(tmp_path) == tmp_path
+
+    with patch.dict("os.environ", {ARTIFACTS_ENV: str(tmp_path)}):
+        assert get_artifacts_directory() == tmp_path
+
+
+def test_write_artifacts(tmp_path: Path) -> None:
+    """Test that summary, heatmap and tiles are written for a mismatch."""
+    a_layers = {"rgba": _buffer(64, 40)}
+    b_layers = {"rgba": _buffer(64, 40, {(3, 5): 1.0, (50, 30): 0.5})}
+
+    with patch.dict("os.environ", {"PYTEST_CURRENT_TEST": "tests/test_a.py::test_b[x/y] (call)"}):
+        target = write_diff_artifacts(tmp_path, "Point(3,5) rgba.red: 0.0 != 1.0", a_layers, b_layers)
+
+    assert target.parent == tmp_path
+    assert "/" not in target.name
+    summary = json.loads((target / "summary.json").read_text())
+    assert summary["message"] == "Point(3,5) rgba.red: 0.0 != 1.0"
+    assert summary["channels"]["rgba.red"]["max_difference"] == 1.0
+    assert summary["channels"]["rgba.red"]["differing_pixels"] == len(summary["tiles"])
+    assert summary["tiles"][0]["x"] == summary["tiles"][0]["y"] == 0
+
+    width, height = _read_png_size(target / "heatmap.png")
+    assert max(width, height) <= MAX_IMAGE_SIZE
+    assert width / height == pytest.approx(64 / 40)
+    assert len(list(target.glob("tile_*.png"))) == len(summary["tiles"])
+
+
+def test_write_artifacts_bounded(tmp_path: Path) -> None:
+    """Test that big buffers with many differences produce a limited amount of data."""
+    a_layers = {"rgba": _buffer(1024, 256)}
+    b_layers = {"rgba": _buffer(1024, 256, {(column, column % 256): 1.0 for column in range(0, 1024, 7)})}
+
+    target = write_diff_artifacts(tmp_path, "message", a_layers, b_layers)
+
+    assert max(_read_png_size(target / "heatmap.png")) <= MAX_IMAGE_SIZE
+    assert len(list(target.glob("tile_*.png"))) == MAX_TILES
+
+
+def test_heatmap_keeps_peak_of_reduced_block(tmp_path: Path) -> None:
+    """Test that the biggest difference of a reduced block is shown, also if it is not in the first row."""
+    width = 2 * MAX_IMAGE_SIZE
+    differences = [0.0] * width * 2
+    differences[0] = 0.5
+    differences[width + 1] = 1.0
+
+    with patch("nuketesting.image_checks.diff_artifacts._write_png") as write_png:
+        _write_heatmap(tmp_path / "heatmap.png", differences, width)
+
+    rows = write_png.call_args[0][1]
+    assert rows[0][:3] == bytes((255, 255, 255))
+
+
+def test_write_artifacts_twice(tmp_path: Path) -> None:
+    """Test that multiple failures of the same test don't overwrite each other."""
+    layers = {"rgba": _buffer(2, 2, {(0, 0): 1})}
+
+    first = write_diff_artifacts(tmp_path, "first", {"rgba": _buffer(2, 2)}, layers)
+    second = write_diff_artifacts(tmp_path, "second", {"rgba": _buffer(2, 2)}, layers)
+
+    assert first != second
+    assert json.loads((first / "summary.json").read_text())["message"] == "first"
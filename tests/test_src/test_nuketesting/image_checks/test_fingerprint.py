@@ -0,0 +1,55 @@
+"""Tests for image fingerprints."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+nuke = pytest.importorskip("nuke")
+
+from nuketesting.image_checks.fingerprint import ImageFingerprint, assert_fingerprint, compute_fingerprint
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_fingerprint_statistics() -> None:
+    """Test that the statistics reflect the image content."""
+    constant = nuke.nodes.Constant(channels="rgba", color=[0.5, 0, 0, 1])
+
+    fingerprint = compute_fingerprint(constant)
+
+    assert fingerprint.channels["rgba.red"].mean == pytest.approx(0.5)
+    assert fingerprint.channels["rgba.red"].maximum == pytest.approx(0.5)
+    assert fingerprint.channels["rgba.green"].total == 0
+
+
+def test_fingerprint_equal_for_equal_images() -> None:
+    """Test that two nodes with the same image have the same fingerprint."""
+    noise_a = nuke.nodes.Noise()
+    noise_b = nuke.nodes.Noise()
+    noise_b["xpos"].setValue(500)
+
+    assert compute_fingerprint(noise_a) == compute_fingerprint(noise_b)
+
+
+def test_fingerprint_save_and_load(tmp_path: Path) -> None:
+    """Test that stored fingerprints can be compared with nodes."""
+    noise = nuke.nodes.Noise()
+    filepath = tmp_path / "noise.json"
+    compute_fingerprint(noise).save(filepath)
+
+    assert ImageFingerprint.load(filepath) == compute_fingerprint(noise)
+    assert_fingerprint(noise, filepath)
+
+
+def test_assert_fingerprint_mismatch() -> None:
+    """Test that a changed node does not match the stored fingerprint."""
+    noise = nuke.nodes.Noise()
+    fingerprint = compute_fingerprint(noise)
+
+    noise["size"].setValue(10)
+
+    with pytest.raises(AssertionError, match="does not match the fingerprint"):
+        assert_fingerprint(noise, fingerprint)
@@ -0,0 +1,105 @@
+"""Tests for rendering image buffers."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+nuke = pytest.importorskip("nuke")
+
+from nuketesting.image_checks import image_buffer
+from nuketesting.image_checks.image_buffer import Region, render_buffer, sample_layers
+from nuketesting.image_checks.render_cache import RenderCache
+
+
+@pytest.fixture
+def cache() -> RenderCache:
+    """Create an empty render cache."""
+    return RenderCache()
+
+
+def test_render_buffer_values() -> None:
+    """Test that the rendered values match the sampled pixels."""
+    expression = nuke.nodes.Expression(expr0="x", expr1="y")
+
+    buffer = render_buffer(expression, ["rgba.red", "rgba.green"], Region(10, 20, 13, 22), cache=None)
+
+    assert len(buffer.data) == len(buffer.columns) * len(buffer.rows) * len(buffer.channels)
+    assert buffer.value(column=1, row=1, channel=0) - buffer.value(column=0, row=1, channel=0) == 1
+    assert buffer.value(column=2, row=1, channel=1) - buffer.value(column=2, row=0, channel=1) == 1
+
+
+def test_render_buffer_cached(cache: RenderCache) -> None:
+    """Test that equal graphs are only rendered once."""
+    noise_a = nuke.nodes.Noise()
+    noise_b = nuke.nodes.Noise()
+
+    buffer_a = render_buffer(noise_a, ["rgba.red"], step=100, cache=cache)
+    buffer_b = render_buffer(noise_b, ["rgba.red"], step=100, cache=cache)
+
+    assert buffer_a is buffer_b
+    assert len(cache) == 1
+
+
+def test_render_buffer_cache_invalidated(cache: RenderCache) -> None:
+    """Test that knob changes invalidate the cached buffer."""
+    noise = nuke.nodes.Noise()
+    buffer_a = render_buffer(noise, ["rgba.red"], step=100, cache=cache)
+
+    noise["size"].setValue(10)
+    buffer_b = render_buffer(noise, ["rgba.red"], step=100, cache=cache)
+
+    assert buffer_a is not buffer_b
+    assert buffer_a.data != buffer_b.data
+
+
+def test_render_buffer_outside_bbox() -> None:
+    """Test that pixels outside the bounding box are zero instead of repeating the edge pixels."""
+    white = nuke.nodes.Constant(color=1)
+    crop = nuke.nodes.Crop(box="10 10 20 20", crop=False, inputs=[white])
+
+    buffer = render_buffer(crop, ["rgba.red"], Region(0, 0, 30, 30), cache=None)
+
+    assert buffer.value(column=15, row=15) == 1
+    assert buffer.value(column=5, row=15) == 0
+    assert buffer.value(column=25, row=25) == 0
+
+
+def test_render_buffer_animated_bbox() -> None:
+    """Test that the bounding box is read at the rendered frame instead of the current frame."""
+    white = nuke.nodes.Constant(color=1)
+    crop = nuke.nodes.Crop(box="0 0 10 10", crop=False, inputs=[white])
+    crop["box"].setAnimated(2)
+    crop["box"].setValueAt(10, 1, 2)
+    crop["box"].setValueAt(30, 2, 2)
+    nuke.frame(1)
+
+    buffer = render_buffer(crop, ["rgba.red"], Region(0, 0, 30, 10), frame=2, cache=None)
+
+    assert buffer.value(column=25, row=5) == 1
+    assert nuke.frame() == 1
+
+
+def test_sample_layers() -> None:
+    """Test that channels are sampled into one interleaved buffer per layer."""
+    constant = nuke.nodes.Constant(channels="rgba", color=[0.1, 0.2, 0.3, 0.4])
+    depth = nuke.nodes.AddChannels(channels="depth", inputs=[constant])
+
+    layers = sample_layers(depth, depth.channels(), Region(0, 0, 2, 2), cache=None)
+
+    assert set(layers) == {"rgba", "depth"}
+    assert layers["rgba"].channels == ("rgba.alpha", "rgba.blue", "rgba.green", "rgba.red")
+    assert layers["rgba"].value(column=1, row=1, channel=3) == pytest.approx(0.1)
+
+
+def test_sample_layers_hashes_graph_once(cache: RenderCache) -> None:
+    """Test that the upstream graph is hashed once for all layers, or not at all if the hash is given."""
+    constant = nuke.nodes.Constant(channels="rgba")
+    depth = nuke.nodes.AddChannels(channels="depth", inputs=[constant])
+
+    with patch.object(image_buffer, "hash_node_graph", wraps=image_buffer.hash_node_graph) as hash_node_graph:
+        sample_layers(depth, depth.channels(), Region(0, 0, 2, 2), cache=cache)
+        assert hash_node_graph.call_count == 1
+        sample_layers(depth, depth.channels(), Region(0, 0, 2, 2), step=2, cache=cache, graph_hash="known")
+        assert hash_node_graph.call_count == 1
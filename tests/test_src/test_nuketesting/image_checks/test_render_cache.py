@@ -0,0 +1,149 @@
+"""Tests for the render cache."""
+
+from __future__ import annotations
+
+from array import array
+from unittest.mock import MagicMock
+
+import pytest
+
+from nuketesting.image_checks.render_cache import RenderCache, hash_node_graph
+
+
+class FakeNode:
+    """Minimal stand-in for nuke nodes that provides everything required for hashing."""
+
+    def __init__(self, name: str, node_class: str, knobs: dict[str, str], inputs: list[FakeNode | None] = ()):
+        self._name = name
+        self._class = node_class
+        self._knobs = {knob: MagicMock(**{"toScript.return_value": value}) for knob, value in knobs.items()}
+        self._inputs = list(inputs)
+
+    def fullName(self) -> str:  # noqa: N802
+        return self._name
+
+    def Class(self) -> str:  # noqa: N802
+        return self._class
+
+    def knobs(self) -> dict[str, MagicMock]:
+        return self._knobs
+
+    def inputs(self) -> int:
+        return len(self._inputs)
+
+    def input(self, index: int) -> FakeNode | None:
+        return self._inputs[index]
+
+
+def _buffer(size: int) -> MagicMock:
+    """Create a buffer mock with the given size in bytes."""
+    return MagicMock(nbytes=size, data=array("f"))
+
+
+def test_hash_equal_graphs() -> None:
+    """Test that graphs with the same content have the same fingerprint regardless of names and positions."""
+    noise_a = FakeNode("Noise1", "Noise", {"size": "350", "xpos": "0"})
+    noise_b = FakeNode("Noise2", "Noise", {"size": "350", "xpos": "100"})
+
+    blur_a = FakeNode("Blur1", "Blur", {"size": "10"}, [noise_a])
+    blur_b = FakeNode("Blur2", "Blur", {"size": "10"}, [noise_b])
+
+    assert hash_node_graph(blur_a) == hash_node_graph(blur_b)
+
+
+@pytest.mark.parametrize(
+    ("upstream_class", "upstream_knobs"),
+    [("Noise", {"size": "351"}), ("Constant", {"size": "350"}), ("Noise", {"size": "350", "zoffset": "1"})],
+)
+def test_hash_upstream_change(upstream_class: str, upstream_knobs: dict[str, str]) -> None:
+    """Test that changes upstream change the fingerprint of the downstream node."""
+    reference = FakeNode("Blur1", "Blur", {"size": "10"}, [FakeNode("Noise1", "Noise", {"size": "350"})])
+    changed = FakeNode("Blur1", "Blur", {"size": "10"}, [FakeNode("Noise1", upstream_class, upstream_knobs)])
+
+    assert hash_node_graph(reference) != hash_node_graph(changed)
+
+
+def test_hash_input_order() -> None:
+    """Test that swapped inputs are detected."""
+    first = FakeNode("A", "Constant", {"color": "1"})
+    second = FakeNode("B", "Constant", {"color": "0"})
+
+    merge = FakeNode("Merge1", "Merge2", {}, [first, second])
+    swapped = FakeNode("Merge2", "Merge2", {}, [second, first])
+    disconnected = FakeNode("Merge3", "Merge2", {}, [first, None])
+
+    fingerprints = [hash_node_graph(merge), hash_node_graph(swapped), hash_node_graph(disconnected)]
+    assert len(set(fingerprints)) == len(fingerprints)
+
+
+def test_hash_knob_filter() -> None:
+    """Test that only the knobs of the filter are part of the fingerprint."""
+    small = FakeNode("Noise1", "Noise", {"size": "10", "zoffset": "0"})
+    large = FakeNode("Noise2", "Noise", {"size": "350", "zoffset": "0"})
+
+    def ignore_size(name: str, knob: MagicMock) -> bool:
+        return name != "size"
+
+    assert hash_node_graph(small) != hash_node_graph(large)
+    assert hash_node_graph(small, ignore_size) == hash_node_graph(large, ignore_size)
+
+
+def test_hash_deep_graph() -> None:
+    """Test that long node chains don't hit the recursion limit."""
+    node = FakeNode("Constant1", "Constant", {})
+    for index in range(5000):
+        node = FakeNode(f"Grade{index}", "Grade", {}, [node])
+
+    assert hash_node_graph(node)
+
+
+def test_cache_returns_stored_buffer() -> None:
+    """Test that stored buffers are returned."""
+    cache = RenderCache()
+    buffer = _buffer(10)
+
+    cache.put("key", buffer)
+
+    assert cache.get("key") is buffer
+    assert cache.nbytes == buffer.nbytes
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    """Test that the least recently used buffers are evicted once the budget is exceeded."""
+    cache = RenderCache(max_bytes=30)
+    cache.put("a", _buffer(10))
+    cache.put("b", _buffer(10))
+    cache.put("c", _buffer(10))
+    cache.get("a")
+
+    cache.put("d", _buffer(10))
+
+    assert "b" not in cache
+    assert all(key in cache for key in "acd")
+    assert cache.nbytes == cache.max_bytes
+
+
+def test_cache_skips_too_large_buffers() -> None:
+    """Test that buffers bigger than the budget won't evict the complete cache."""
+    cache = RenderCache(max_bytes=30)
+    cache.put("a", _buffer(10))
+
+    cache.put("huge", _buffer(31))
+
+    assert "huge" not in cache
+    assert "a" in cache
+
+
+def test_cache_replace_and_clear() -> None:
+    """Test that replacing keys keeps the byte count correct and clear removes everything."""
+    cache = RenderCache()
+    replacement = _buffer(20)
+    cache.put("a", _buffer(10))
+    cache.put("a", replacement)
+    assert cache.nbytes == replacement.nbytes
+    assert len(cache) == 1
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.nbytes == 0
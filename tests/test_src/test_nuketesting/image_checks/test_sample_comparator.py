@@ -137,3 +137,36 @@ def test_sample_comparator_equal_outer_corner_different_formats(
     expr = nuke.nodes.Expression(expr0=f"x=={width - 1} && y=={height - 1}", inputs=[reformat])
     with pytest.raises(AssertionError):
         comparator.assert_equal(reformat, expr)
+
+
+def test_sample_comparator_equal_outside_format(comparator: SampleComparator) -> None:
+    """Test that pixels outside the format but inside the bounding box are compared."""
+    transform = nuke.nodes.Transform(translate=[3000, 0], inputs=[nuke.nodes.Noise()])
+    crop = nuke.nodes.Crop(box="0 0 2048 1556", inputs=[transform])
+
+    with pytest.raises(AssertionError):
+        comparator.assert_equal(crop, transform)
+
+
+def test_sample_comparator_equal_small_bbox(black: nuke.Node, comparator: SampleComparator) -> None:
+    """Test that content in a small bounding box is compared against the empty area of the other node."""
+    rectangle = nuke.nodes.Rectangle(area="500 500 510 510", inputs=[black])
+    empty = nuke.nodes.Crop(box="500 500 510 510", inputs=[black])
+
+    with pytest.raises(AssertionError):
+        comparator.assert_equal(empty, rectangle)
+
+
+def test_sample_comparator_structural_mismatch(black: nuke.Node, comparator: SampleComparator) -> None:
+    """Test that channels which only exist on one node are reported by name."""
+    extra_layer = nuke.nodes.AddChannels(channels="depth", inputs=[black])
+
+    with pytest.raises(AssertionError, match=r"Only in '.+': \['depth.Z'\]"):
+        comparator.assert_equal(extra_layer, black)
+
+
+def test_sample_comparator_assert_equal_on_class(white: nuke.Node, black: nuke.Node) -> None:
+    """Test that `assert_equal` can still be called like the former static method."""
+    SampleComparator.assert_equal(black, black)
+    with pytest.raises(AssertionError):
+        SampleComparator.assert_equal(white, black)
@@ -0,0 +1,63 @@
+"""Tests for choosing sample points and the confidence bounds."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from nuketesting.image_checks.sampling import SEED_ENV, get_seed, stratified_points, upper_confidence_bound
+
+
+def _region(x: int, y: int, width: int, height: int) -> SimpleNamespace:
+    """Create a stand-in for a region, which needs nuke."""
+    return SimpleNamespace(x=x, y=y, width=width, height=height)
+
+
+def test_stratified_points_cover_region() -> None:
+    """Test that the points stay inside the region and are spread over all of it."""
+    region = _region(-100, 50, 400, 200)
+    budget = 200
+
+    points = stratified_points(region, budget, seed=1)
+
+    assert 0 < len(points) <= budget
+    assert all(-100 <= x < 300 and 50 <= y < 250 for x, y in points)  # noqa: PLR2004
+    assert {x * 4 // 400 for x, _ in points} == {-1, 0, 1, 2}
+    assert points == sorted(points, key=lambda point: (point[1], point[0]))
+
+
+def test_stratified_points_reproducible() -> None:
+    """Test that the seed decides which pixels are chosen."""
+    region = _region(0, 0, 1920, 1080)
+
+    assert stratified_points(region, 100, seed=3) == stratified_points(region, 100, seed=3)
+    assert stratified_points(region, 100, seed=3) != stratified_points(region, 100, seed=4)
+
+
+def test_stratified_points_small_region() -> None:
+    """Test that a region smaller than the budget never returns more points than pixels."""
+    assert len(stratified_points(_region(0, 0, 2, 3), 1000, seed=0)) == 2 * 3
+    assert stratified_points(_region(0, 0, 0, 10), 1000, seed=0) == []
+
+
+def test_get_seed_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that an explicit seed wins over the environment."""
+    monkeypatch.setenv(SEED_ENV, "42")
+
+    assert get_seed() == int("42")
+    assert get_seed(7) == int("7")
+
+
+@pytest.mark.parametrize(
+    ("mismatches", "samples", "expected"),
+    [(0, 1000, 0.002991), (10, 1000, 0.016903), (0, 0, 1.0), (5, 5, 1.0)],
+)
+def test_upper_confidence_bound(mismatches: int, samples: int, expected: float) -> None:
+    """Test the bound against known Clopper-Pearson values."""
+    assert upper_confidence_bound(mismatches, samples) == pytest.approx(expected, abs=1e-5)
+
+
+def test_upper_confidence_bound_shrinks_with_samples() -> None:
+    """Test that more samples give a tighter bound."""
+    assert upper_confidence_bound(0, 10000) < upper_confidence_bound(0, 1000) < upper_confidence_bound(0, 100)
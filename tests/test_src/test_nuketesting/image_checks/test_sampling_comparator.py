@@ -0,0 +1,39 @@
+"""Tests for the sampling comparator."""
+
+from __future__ import annotations
+
+import pytest
+
+nuke = pytest.importorskip("nuke")
+
+from nuketesting.image_checks.sampling_comparator import SamplingComparator
+
+
+def test_equal_images_pass() -> None:
+    """Test that equal images pass and report a tight bound."""
+    noise = nuke.nodes.Noise()
+    grade = nuke.nodes.Grade(inputs=[noise])
+    comparator = SamplingComparator(budget=500, seed=1, use_fingerprint=False)
+
+    comparator.assert_equal(noise, grade)
+
+    assert comparator.last_result.mismatches == 0
+    assert comparator.last_result.upper_bound < 0.01  # noqa: PLR2004
+
+
+def test_different_images_report_seed() -> None:
+    """Test that a failure contains the seed to reproduce it."""
+    white = nuke.nodes.Constant(color=1)
+    black = nuke.nodes.Constant(color=0)
+    comparator = SamplingComparator(budget=100, seed=1234, use_fingerprint=False)
+
+    with pytest.raises(AssertionError, match="seed 1234"):
+        comparator.assert_equal(white, black)
+
+
+def test_tolerance() -> None:
+    """Test that differences within the tolerance are ignored."""
+    constant = nuke.nodes.Constant(color=0.5)
+    graded = nuke.nodes.Grade(add=0.001, inputs=[constant])
+
+    SamplingComparator(budget=100, tolerance=0.01, use_fingerprint=False).assert_equal(constant, graded)
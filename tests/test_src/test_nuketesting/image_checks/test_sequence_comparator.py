@@ -0,0 +1,67 @@
+"""Tests for the sequence comparator."""
+
+from __future__ import annotations
+
+import pytest
+
+nuke = pytest.importorskip("nuke")
+
+from nuketesting.image_checks.sequence_comparator import SequenceComparator
+
+
+@pytest.fixture
+def black() -> nuke.Node:
+    """Create a black constant."""
+    return nuke.nodes.Constant(color=0)
+
+
+@pytest.fixture
+def flashing() -> nuke.Node:
+    """Create a constant that turns white after frame 3."""
+    constant = nuke.nodes.Constant()
+    constant["color"].setExpression("frame > 3")
+    return constant
+
+
+def test_sequence_equal(black: nuke.Node) -> None:
+    """Test that different graphs with equal output pass.
+
+    The unchanged Grade changes the graph, so the frames are rendered and compared instead of matching by hash.
+    """
+    unchanged = nuke.nodes.Grade(inputs=[black])
+
+    SequenceComparator().assert_equal(black, unchanged, range(1, 6))
+
+
+@pytest.mark.slow
+def test_sequence_equal_in_workers(black: nuke.Node) -> None:
+    """Test that different graphs with equal output pass in parallel workers."""
+    unchanged = nuke.nodes.Grade(inputs=[black])
+
+    SequenceComparator(workers=2).assert_equal(black, unchanged, range(1, 6))
+
+
+def test_sequence_reports_all_failing_frames(black: nuke.Node, flashing: nuke.Node) -> None:
+    """Test that every failing frame is reported."""
+    with pytest.raises(AssertionError) as error:
+        SequenceComparator().assert_equal(black, flashing, range(1, 6))
+
+    assert error.match("Frame 4")
+    assert error.match("Frame 5")
+    assert "Frame 3" not in str(error.value)
+
+
+def test_sequence_stop_on_first_failure(black: nuke.Node, flashing: nuke.Node) -> None:
+    """Test that the comparison stops at the first failing frame."""
+    results = list(SequenceComparator().compare(black, flashing, range(1, 10), stop_on_first_failure=True))
+
+    assert [result.frame for result in results] == [1, 2, 3, 4]
+    assert not results[-1].passed
+
+
+@pytest.mark.slow
+def test_sequence_in_workers(black: nuke.Node, flashing: nuke.Node) -> None:
+    """Test that parallel workers report the same frames as the comparison in the current session."""
+    results = SequenceComparator(workers=2).compare(black, flashing, range(1, 6))
+
+    assert sorted(result.frame for result in results if not result.passed) == [4, 5]
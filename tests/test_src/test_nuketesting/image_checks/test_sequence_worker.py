@@ -0,0 +1,29 @@
+"""Tests for the sequence worker script."""
+
+from __future__ import annotations
+
+import pytest
+
+from nuketesting.image_checks.sequence_worker import _parse_args, format_result, parse_result
+
+
+@pytest.mark.parametrize(("frame", "error"), [(1, None), (1001, "Point(0,0): 0.0 != 1.0"), (-5, "multi\nline")])
+def test_result_round_trip(frame: int, error: str | None) -> None:
+    """Test that formatted results can be parsed again."""
+    assert parse_result(format_result(frame, error)) == (frame, error)
+
+
+@pytest.mark.parametrize("line", ["", "Nuke 15.1v1, 64 bit, built Jun  6 2024.", "Loading script ..."])
+def test_parse_other_output(line: str) -> None:
+    """Test that regular output of Nuke is ignored."""
+    assert parse_result(line) is None
+
+
+def test_parse_args() -> None:
+    """Test that the frames are parsed into a list of ints."""
+    parsed_arguments = _parse_args(
+        ["--packages_directory", "pkg", "--script", "a.nk", "--node_a", "A", "--node_b", "B", "--frames", "1,3,5"]
+    )
+
+    assert parsed_arguments.frames == [1, 3, 5]
+    assert parsed_arguments.script == "a.nk"
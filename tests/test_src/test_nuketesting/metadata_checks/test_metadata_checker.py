@@ -0,0 +1,60 @@
+"""Tests for the metadata checks of nodes."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+
+nuke = pytest.importorskip("nuke")
+
+from nuketesting.metadata_checks.metadata_checker import (
+    MetadataCache,
+    assert_metadata_matches,
+    assert_same_metadata,
+    collect_metadata,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def metadata_node() -> nuke.Node:
+    """Create a node with custom metadata."""
+    constant = nuke.nodes.Constant()
+    return nuke.nodes.ModifyMetaData(metadata="{set custom/value 1.5}", inputs=[constant])
+
+
+def test_collect_metadata_uses_cache(metadata_node: nuke.Node) -> None:
+    """Test that every frame is only read once."""
+    cache = MetadataCache()
+    first = collect_metadata(metadata_node, frames=[1, 2], cache=cache)
+
+    with patch.object(nuke.Node, "metadata") as read:
+        second = collect_metadata(metadata_node, frames=[1, 2], cache=cache)
+
+    read.assert_not_called()
+    assert first == second
+    assert first[1]["custom/value"] == "1.5"
+
+
+def test_assert_same_metadata(metadata_node: nuke.Node) -> None:
+    """Test that different metadata is reported."""
+    other = nuke.nodes.ModifyMetaData(metadata="{set custom/value 2}", inputs=[metadata_node.input(0)])
+
+    assert_same_metadata(metadata_node, metadata_node, frames=[1, 2])
+    with pytest.raises(AssertionError, match="custom/value"):
+        assert_same_metadata(metadata_node, other, include=["custom/*"])
+
+
+def test_assert_metadata_matches(metadata_node: nuke.Node, tmp_path: Path) -> None:
+    """Test that metadata can be compared against a stored file."""
+    filepath = tmp_path / "metadata.json"
+
+    with pytest.raises(AssertionError, match="does not exist"):
+        assert_metadata_matches(metadata_node, filepath)
+
+    assert_metadata_matches(metadata_node, filepath, frames=[1, 2], update=True)
+    assert_metadata_matches(metadata_node, filepath)
@@ -0,0 +1,50 @@
+"""Tests for filtering and comparing metadata."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from nuketesting.metadata_checks.metadata_diff import diff_metadata, filter_keys, load_metadata, save_metadata
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_filter_keys_excludes_modification_times() -> None:
+    """Test that volatile keys are removed by default."""
+    metadata = {"input/mtime": "2024-01-01", "input/width": 64, "exr/owner": "me"}
+
+    assert filter_keys(metadata) == {"input/width": 64, "exr/owner": "me"}
+    assert filter_keys(metadata, include=["exr/*"]) == {"exr/owner": "me"}
+    assert filter_keys(metadata, exclude=[]) == metadata
+
+
+def test_diff_metadata_reports_all_frames() -> None:
+    """Test that missing, new and changed keys of all frames are reported."""
+    expected = {1: {"a": 1, "b": "x"}, 2: {"a": 1}}
+    actual = {1: {"a": 2, "c": 0}, 2: {"a": 1}}
+
+    assert diff_metadata(expected, actual) == [
+        "Frame 1: missing key 'b'",
+        "Frame 1: new key 'c'",
+        "Frame 1 'a': 1 != 2",
+    ]
+
+
+def test_diff_metadata_tolerance() -> None:
+    """Test that numbers and matrices are compared with the tolerance."""
+    expected = {1: {"exr/worldToCamera": [1.0, 0.0, 0.5], "fps": 24.0}}
+    actual = {1: {"exr/worldToCamera": (1.0, 0.0, 0.5001), "fps": 24.0001}}
+
+    assert diff_metadata(expected, actual, tolerance=0.001) == []
+    assert len(diff_metadata(expected, actual)) == len(expected[1])
+
+
+def test_save_and_load(tmp_path: Path) -> None:
+    """Test that stored metadata keeps its frames and values."""
+    metadata = {1001: {"input/width": 64, "exr/owner": "me"}, 1002: {"input/width": 64}}
+    filepath = tmp_path / "metadata.json"
+
+    save_metadata(metadata, filepath)
+
+    assert load_metadata(filepath) == metadata
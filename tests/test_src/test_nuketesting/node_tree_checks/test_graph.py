@@ -0,0 +1,76 @@
+"""Tests for the node graph model and its diff."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from nuketesting.node_tree_checks.graph import GraphNode, NodeGraph, diff_graphs
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _chain(blur_size: str = "10", read_name: str = "Read1") -> NodeGraph:
+    """Create a graph of a read, a blur and a write node."""
+    return NodeGraph.from_nodes(
+        [
+            GraphNode(read_name, "Read", {"file": "plate.exr"}),
+            GraphNode("Blur1", "Blur", {"size": blur_size}, inputs=(read_name,)),
+            GraphNode("Write1", "Write", {"file": "out.exr"}, inputs=("Blur1",)),
+        ]
+    )
+
+
+def test_equal_graphs() -> None:
+    """Test that equal graphs have no differences."""
+    assert diff_graphs(_chain(), _chain()) == []
+
+
+def test_names_are_not_hashed() -> None:
+    """Test that renamed nodes keep their hash."""
+    assert _chain().get_hash("Write1") == _chain(read_name="Plate").get_hash("Write1")
+
+
+def test_changed_knob_reported_once() -> None:
+    """Test that only the changed node is reported and not the nodes below it."""
+    assert diff_graphs(_chain(), _chain(blur_size="20")) == ["Node 'Blur1': knob size 10 != 20"]
+
+
+def test_equal_subtrees_skipped() -> None:
+    """Test that upstream nodes of equal subtrees are never visited."""
+    graph_a = _chain()
+    graph_b = _chain()
+    graph_b.nodes["Read1"] = GraphNode("Read1", "Constant")
+
+    assert diff_graphs(graph_a, graph_b, roots=[("Blur1", "Blur1")]) == ["Node 'Read1': class Read != Constant"]
+    assert diff_graphs(_chain(), _chain(), roots=[("Read1", "Read1")]) == []
+
+
+def test_roots_only_in_one_graph() -> None:
+    """Test that unmatched roots are reported."""
+    graph_b = _chain()
+    graph_b.nodes["Viewer1"] = GraphNode("Viewer1", "Viewer", inputs=("Blur1",))
+
+    assert diff_graphs(_chain(), graph_b) == ["Only in second graph: 'Viewer1'"]
+
+
+def test_deep_graph() -> None:
+    """Test that long chains do not hit the recursion limit."""
+    length = 5000
+    nodes = [GraphNode("Node0", "Constant")]
+    nodes.extend(GraphNode(f"Node{index}", "Grade", inputs=(f"Node{index - 1}",)) for index in range(1, length))
+    graph = NodeGraph.from_nodes(nodes)
+
+    assert graph.roots == [f"Node{length - 1}"]
+    assert diff_graphs(graph, NodeGraph.from_nodes(nodes)) == []
+
+
+def test_save_and_load(tmp_path: Path) -> None:
+    """Test that a stored graph is loaded unchanged."""
+    graph = _chain()
+    graph.nodes["Group1"] = GraphNode("Group1", "Group", inputs=(None,), outputs=("Group1.Output1",))
+    filepath = tmp_path / "graph.json"
+
+    graph.save(filepath)
+
+    assert NodeGraph.load(filepath) == graph
@@ -0,0 +1,163 @@
+"""Tests for the .nk script parser."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from nuketesting.node_tree_checks.graph import diff_graphs
+from nuketesting.node_tree_checks.nk_parser import parse_knobs, parse_script, parse_script_lines, split_commands
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from nuketesting.node_tree_checks.graph import NodeGraph
+
+SCRIPT = r"""#! /usr/local/Nuke14.0v5/libnuke-14.0.5.so -nx
+version 14.0 v5
+define_window_layout_xml {<?xml version="1.0" encoding="UTF-8"?>
+<layout version="1.0">
+</layout>
+}
+Root {
+ inputs 0
+ name /tmp/test.nk
+ format "2048 1556 0 0 2048 1556 1 2K_Super_35(full-ap)"
+}
+Read {
+ inputs 0
+ file /plates/plate.####.exr
+ name Read1
+ xpos 0
+ ypos -100
+}
+set N1 [stack 0]
+Blur {
+ size {{curve x1 0 x10 5}}
+ name Blur1
+}
+push $N1
+Constant {
+ inputs 0
+ color {1 0 0 1}
+ name Constant1
+}
+Merge2 {
+ inputs 2+1
+ name Merge1
+}
+Group {
+ name Group1
+ addUserKnob {20 User}
+ addUserKnob {7 amount}
+ amount 0.5
+}
+ Input {
+  inputs 0
+  name Input1
+ }
+ Grade {
+  white 2
+  name Grade1
+ }
+ Output {
+  name Output1
+ }
+end_group
+clone node1|Blur|2 Blur {
+ size 3
+ name Blur2
+ label "quote \" and \{brace"
+}
+set C2 [stack 0]
+push 0
+clone $C2 {
+ name Blur3
+}
+Write {
+ name Write1
+}
+"""
+
+
+@pytest.fixture
+def graph() -> NodeGraph:
+    """Parse the example script."""
+    return parse_script_lines(SCRIPT.splitlines(keepends=True))
+
+
+def test_nodes_and_knobs(graph: NodeGraph) -> None:
+    """Test that all nodes are read with their knobs, but without UI knobs."""
+    assert list(graph.nodes) == [
+        "Read1",
+        "Blur1",
+        "Constant1",
+        "Merge1",
+        "Group1",
+        "Group1.Input1",
+        "Group1.Grade1",
+        "Group1.Output1",
+        "Blur2",
+        "Blur3",
+        "Write1",
+    ]
+    assert graph.nodes["Read1"].knobs == {"file": "/plates/plate.####.exr"}
+    assert graph.nodes["Blur1"].knobs == {"size": "{curve x1 0 x10 5}"}
+    assert graph.nodes["Group1"].knobs == {"addUserKnob": "20 User\n7 amount", "amount": "0.5"}
+
+
+def test_stack_connections(graph: NodeGraph) -> None:
+    """Test that the stack commands connect the nodes like in Nuke."""
+    assert graph.nodes["Blur1"].inputs == ("Read1",)
+    assert graph.nodes["Merge1"].inputs == ("Constant1", "Read1", "Blur1")
+    assert graph.nodes["Group1"].inputs == ("Merge1",)
+    assert graph.nodes["Blur3"].inputs == (None,)
+    assert graph.nodes["Write1"].inputs == ("Blur3",)
+
+
+def test_groups(graph: NodeGraph) -> None:
+    """Test that groups have their own stack and know their output nodes."""
+    assert graph.nodes["Group1.Input1"].inputs == ()
+    assert graph.nodes["Group1.Grade1"].inputs == ("Group1.Input1",)
+    assert graph.nodes["Group1"].outputs == ("Group1.Output1",)
+    assert graph.nodes["Blur2"].inputs == ("Group1",)
+
+
+def test_clones(graph: NodeGraph) -> None:
+    """Test that clones share the class and knobs of the original."""
+    assert graph.nodes["Blur2"].node_class == "Blur"
+    assert graph.nodes["Blur3"].node_class == "Blur"
+    assert graph.nodes["Blur3"].knobs == graph.nodes["Blur2"].knobs == {"size": "3"}
+
+
+def test_gizmo_file(tmp_path: Path) -> None:
+    """Test that gizmo files without node names are read."""
+    gizmo = tmp_path / "MyGizmo.gizmo"
+    gizmo.write_text(
+        "version 14.0 v5\nGizmo {\n inputs 0\n}\n Constant {\n  inputs 0\n  name C\n }\n Output {\n  name Output1\n }\nend_group\n"
+    )
+
+    graph = parse_script(gizmo)
+
+    assert graph.roots == ["Gizmo1"]
+    assert graph.nodes["Gizmo1.Output1"].inputs == ("Gizmo1.C",)
+
+
+def test_compare_scripts(graph: NodeGraph) -> None:
+    """Test that parsed scripts can be diffed with the tree comparison."""
+    changed = parse_script_lines(SCRIPT.replace("white 2", "white 3").splitlines(keepends=True))
+
+    assert diff_graphs(graph, changed) == ["Node 'Group1.Grade1': knob white 2 != 3"]
+
+
+def test_split_commands_continued_lines() -> None:
+    """Test that open quotes and trailing backslashes continue a command."""
+    lines = ['label "first\n', 'second"\n', "push \\\n", "0\n"]
+
+    assert list(split_commands(lines)) == ['label "first\nsecond"', "push \\\n0"]
+
+
+def test_parse_knobs_keeps_inner_braces() -> None:
+    """Test that only a single outer pair of braces is removed."""
+    assert parse_knobs(" a {1} {2}\n b {{1} {2}}\n") == {"a": "{1} {2}", "b": "{1} {2}"}
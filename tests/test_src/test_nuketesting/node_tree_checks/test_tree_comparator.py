@@ -0,0 +1,40 @@
+"""Tests for the node tree comparator."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+nuke = pytest.importorskip("nuke")
+
+from nuketesting.node_tree_checks.tree_comparator import NodeTreeComparator, read_node_graph
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_equal_trees() -> None:
+    """Test that equal trees with different names and positions pass."""
+    blur_a = nuke.nodes.Blur(size=5, inputs=[nuke.nodes.Constant()])
+    blur_b = nuke.nodes.Blur(size=5, xpos=500, inputs=[nuke.nodes.Constant()])
+
+    NodeTreeComparator().assert_equal(blur_a, blur_b)
+
+
+def test_different_knob() -> None:
+    """Test that a different knob value is reported."""
+    blur_a = nuke.nodes.Blur(size=5, inputs=[nuke.nodes.Constant()])
+    blur_b = nuke.nodes.Blur(size=5, inputs=[nuke.nodes.Constant(color=1)])
+
+    with pytest.raises(AssertionError, match="knob color"):
+        NodeTreeComparator().assert_equal(blur_a, blur_b)
+
+
+def test_assert_matches(tmp_path: Path) -> None:
+    """Test that the script can be compared against a stored graph."""
+    nuke.nodes.Blur(size=5, inputs=[nuke.nodes.Constant()])
+    filepath = tmp_path / "graph.json"
+    read_node_graph().save(filepath)
+
+    NodeTreeComparator().assert_matches(filepath)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import json
+import os
 from pathlib import Path
 from unittest.mock import MagicMock, call, patch
 
@@ -10,6 +12,12 @@ import pytest
 from click.testing import CliRunner
 
 from nuketesting.runner.cli import CLICommandError, CLIRunArguments, _run_tests, main
+from nuketesting.runner.history import RunHistory
+from nuketesting.runner.manifest import MANIFEST_ENV_FILE
+from nuketesting.runner.ordering import DEFAULT_STATE_FILE, ORDER_ENV_MODE, STATE_ENV_FILE
+from nuketesting.runner.profiling import PROFILE_ENV_DIR, PROFILE_ENV_MODE
+from nuketesting.runner.protocol import AGENT_TOKEN_ENV
+from nuketesting.runner.report import REPORT_ENV_FILE, TestResult
 from nuketesting.runner.runner import Runner
 
 pytest.importorskip(
@@ -50,6 +58,12 @@ class TestArgumentParsing:
             run_in_terminal_mode=True,
             pytest_args=(),
             runner_name=None,
+            profile=None,
+            profile_dir="profiles",
+            history=None,
+            order=None,
+            state_file=None,
+            retries=0,
         )
 
     def test_pass_all_arguments_to_data_object(self) -> None:
@@ -78,6 +92,18 @@ class TestArgumentParsing:
                     "-x",
                     "-r",
                     "Boomer",
+                    "--profile",
+                    "sampling",
+                    "--profile-dir",
+                    "out",
+                    "--history",
+                    "history.db",
+                    "--order",
+                    "last-failed",
+                    "--state-file",
+                    "state.json",
+                    "--retries",
+                    "2",
                 ],
             )
 
@@ -88,6 +114,12 @@ class TestArgumentParsing:
             run_in_terminal_mode=False,
             pytest_args=("-v test", "-x"),
             runner_name="Boomer",
+            profile="sampling",
+            profile_dir="out",
+            history="history.db",
+            order="last-failed",
+            state_file="state.json",
+            retries=2,
         )
         run_tests_mock.assert_called_once_with(expected_cli_return_value)
 
@@ -137,6 +169,62 @@ class TestRunnerExecution:
             1928
         )  # As the CLIRunner object from click is returning 0 as exit code always.
 
+    def test_results_recorded_in_history(self, runner: MagicMock, sys_exit: MagicMock, tmp_path: Path) -> None:
+        """Test that the results of the report file are stored in the history."""
+
+        def execute_tests(test_path: Path) -> int:
+            with Path(os.environ[REPORT_ENV_FILE]).open("a") as report:
+                report.write(json.dumps(TestResult("test_a.py::test_slow", duration=2.0).to_dict()) + "\n")
+            return 0
+
+        runner.return_value.execute_tests.side_effect = execute_tests
+        history_file = tmp_path / "history.db"
+
+        _run_tests(CLIRunArguments(".", nuke_executable="nuke", history=history_file))
+
+        sys_exit.assert_called_once_with(0)
+        assert REPORT_ENV_FILE not in os.environ
+        with RunHistory(history_file) as history:
+            assert history.get_durations() == {"test_a.py::test_slow": 2.0}
+
+    def test_ordering_configured_during_run(self, runner: MagicMock, tmp_path: Path) -> None:
+        """Test that the ordering reaches the tests through the environment only during the run."""
+        environment = {}
+        runner.return_value.execute_tests.side_effect = lambda test_path: environment.update(os.environ) or 0
+
+        state_file = tmp_path / "state.json"
+
+        _run_tests(CLIRunArguments(".", nuke_executable="nuke", order="failed-first", state_file=state_file))
+
+        assert environment[STATE_ENV_FILE] == str(state_file)
+        assert environment[ORDER_ENV_MODE] == "failed-first"
+        assert STATE_ENV_FILE not in os.environ
+        assert ORDER_ENV_MODE not in os.environ
+
+    def test_profiling_configured_during_run(self, runner: MagicMock, tmp_path: Path) -> None:
+        """Test that the profiling reaches the tests through the environment only during the run."""
+        environment = {}
+        runner.return_value.execute_tests.side_effect = lambda test_path: environment.update(os.environ) or 0
+
+        _run_tests(CLIRunArguments(".", nuke_executable="nuke", profile="sampling", profile_dir=tmp_path))
+
+        assert environment[PROFILE_ENV_MODE] == "sampling"
+        assert environment[PROFILE_ENV_DIR] == str(tmp_path)
+        assert PROFILE_ENV_MODE not in os.environ
+        assert PROFILE_ENV_DIR not in os.environ
+
+    def test_ordering_only_configured_if_requested(self, runner: MagicMock, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the state file is only written for ordered runs or an explicit state file."""
+        monkeypatch.delenv(STATE_ENV_FILE, raising=False)
+        environments = []
+        runner.return_value.execute_tests.side_effect = lambda test_path: environments.append(dict(os.environ)) or 0
+
+        _run_tests(CLIRunArguments(".", nuke_executable="nuke"))
+        _run_tests(CLIRunArguments(".", nuke_executable="nuke", order="last-failed"))
+
+        assert STATE_ENV_FILE not in environments[0]
+        assert environments[1][STATE_ENV_FILE] == str(DEFAULT_STATE_FILE.absolute())
+
 
 class TestConfigOptions:
     """Tests for the configuration loading."""
@@ -242,3 +330,174 @@ class TestConfigOptions:
             match="Only provide nuke executable or runner configuration/name.",
         ):
             _run_tests(arguments)
+
+
+class TestDistribution:
+    """Tests for the agent and distribute commands."""
+
+    def test_agent_uses_runner(self, runner: MagicMock, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the agent runs the tests with the runner of the main options and only listens on localhost."""
+        monkeypatch.delenv(AGENT_TOKEN_ENV, raising=False)
+        cli_testrunner = CliRunner()
+
+        with patch("nuketesting.runner.cli.Agent") as agent_mock:
+            agent_mock.return_value.address = ("127.0.0.1", 9000)
+            result = cli_testrunner.invoke(main, ["-n", "nuke_path", "agent", "--port", "9000"])
+
+        agent_mock.assert_called_once_with(runner.return_value, host="127.0.0.1", port=9000, token=None)
+        agent_mock.return_value.serve_forever.assert_called_once()
+        assert "Agent listening on 127.0.0.1:9000" in result.output
+        assert "Warning" not in result.output
+
+    def test_agent_token(self, runner: MagicMock, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the token of the environment is used and an agent on all interfaces without token warns."""
+        cli_testrunner = CliRunner()
+
+        with patch("nuketesting.runner.cli.Agent") as agent_mock:
+            agent_mock.return_value.address = ("0.0.0.0", 8765)
+            result = cli_testrunner.invoke(main, ["-n", "nuke_path", "agent", "--host", "0.0.0.0"])
+            monkeypatch.setenv(AGENT_TOKEN_ENV, "secret")
+            cli_testrunner.invoke(main, ["-n", "nuke_path", "agent", "--host", "0.0.0.0"])
+
+        assert "Warning: the agent accepts tests of every coordinator without a token." in result.output
+        assert agent_mock.call_args_list[-1] == call(runner.return_value, host="0.0.0.0", port=8765, token="secret")
+
+    def test_distribute_to_agents(self, sys_exit: MagicMock, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the test files with tests are split into shards for all agents."""
+        monkeypatch.setenv(AGENT_TOKEN_ENV, "secret")
+        (tmp_path / "test_a.py").write_text("def test_a():\n    pass\n")
+        (tmp_path / "test_empty.py").write_text("")
+        cli_testrunner = CliRunner()
+
+        with patch("nuketesting.runner.cli.Coordinator") as coordinator_mock:
+            coordinator_mock.return_value.run.return_value.exit_code = 1
+            cli_testrunner.invoke(
+                main,
+                ["-t", str(tmp_path), "-p", "-x", "distribute", "-a", "farm01:9000", "-a", "farm02"],
+            )
+
+        coordinator_mock.assert_called_once_with(
+            [("farm01", 9000), ("farm02", 8765)], pytest_args=("-x",), token="secret"
+        )
+        shards = coordinator_mock.return_value.run.call_args[0][0]
+        assert [shard.paths for shard in shards] == [[str(tmp_path / "test_a.py")]]
+        assert sys_exit.call_args_list[0] == call(1)
+
+
+class TestStats:
+    """Tests for the stats command."""
+
+    def test_stats_of_history(self, tmp_path: Path) -> None:
+        """Test that the stats of the given history are printed."""
+        history_file = tmp_path / "history.db"
+        with RunHistory(history_file) as history:
+            history.record_run([TestResult("test_a.py::test_slow", duration=2.0)], exit_code=0)
+
+        result = CliRunner().invoke(main, ["--history", str(history_file), "stats"])
+
+        assert "Slowest tests:" in result.output
+        assert "test_a.py::test_slow" in result.output
+
+    def test_no_history(self, tmp_path: Path) -> None:
+        """Test that a missing history is reported."""
+        with patch.object(click.Context, "fail") as fail_message:
+            CliRunner().invoke(main, ["stats"])
+            CliRunner().invoke(main, ["--history", str(tmp_path / "history.db"), "stats"])
+
+        assert "No history given" in fail_message.call_args_list[0][0][0]
+        assert "No history found" in fail_message.call_args_list[1][0][0]
+        assert not (tmp_path / "history.db").exists()
+
+
+class TestProfileScripts:
+    """Tests for the profile-scripts command."""
+
+    def test_scripts_split_over_workers(self, runner: MagicMock, sys_exit: MagicMock, tmp_path: Path) -> None:
+        """Test that the scripts of a directory are loaded by multiple Nuke processes."""
+        templates = tmp_path / "templates"
+        templates.mkdir()
+        for name in ("a.nk", "b.nk", "notes.txt"):
+            (templates / name).write_text(f"Root {{\n name {name}\n}}\n")
+        runner.return_value.run_in_terminal_mode = True
+        runner.return_value.execute_tests.return_value = 0
+
+        CliRunner().invoke(main, ["-n", "nuke_path", "profile-scripts", str(templates), "-w", "2", "--update"])
+
+        calls = runner.return_value.execute_tests.call_args_list
+        assert sorted(arguments[0] for arguments, _ in calls) == [str(templates / "a.nk"), str(templates / "b.nk")]
+        for arguments, _ in calls:
+            assert arguments[1] == ["-p", "nuketesting.benchmark.script_plugin", "--benchmark-update"]
+        assert sys_exit.call_args_list[0] == call(0)
+
+    @pytest.mark.parametrize(
+        ("exit_code_a", "exit_code_b", "expected"),
+        [(0, 0, 0), (0, 2, 2), (1, 5, 1), (0, -9, 1), (-11, 0, 1)],
+    )
+    def test_first_failed_exit_code(  # noqa: PLR0913
+        self,
+        runner: MagicMock,
+        sys_exit: MagicMock,
+        tmp_path: Path,
+        exit_code_a: int,
+        exit_code_b: int,
+        expected: int,
+    ) -> None:
+        """Test that the first failed worker sets the exit code and killed workers count as failed."""
+        for name in ("a.nk", "b.nk"):
+            (tmp_path / name).write_text(f"Root {{\n name {name}\n}}\n")
+        exit_codes = {str(tmp_path / "a.nk"): exit_code_a, str(tmp_path / "b.nk"): exit_code_b}
+        runner.return_value.run_in_terminal_mode = True
+        runner.return_value.execute_tests.side_effect = lambda path, _: exit_codes[path]
+
+        CliRunner().invoke(main, ["-n", "nuke_path", "profile-scripts", str(tmp_path), "-w", "2"])
+
+        assert sys_exit.call_args_list[0] == call(expected)
+
+    def test_workers_require_terminal_mode(self, runner: MagicMock, tmp_path: Path) -> None:
+        """Test that scripts are not loaded in parallel in the current interpreter."""
+        (tmp_path / "a.nk").write_text("")
+        runner.return_value.run_in_terminal_mode = False
+
+        with patch.object(click.Context, "fail") as fail_message:
+            CliRunner().invoke(main, ["-n", "nuke_path", "profile-scripts", str(tmp_path), "-w", "2"])
+
+        assert "terminal mode" in fail_message.call_args[0][0]
+        runner.return_value.execute_tests.assert_not_called()
+
+
+class TestCollect:
+    """Tests for the collect command."""
+
+    def test_static_collection_without_nuke(self, runner: MagicMock, tmp_path: Path) -> None:
+        """Test that statically collectable tests are listed without starting Nuke."""
+        (tmp_path / "test_a.py").write_text("def test_one():\n    pass\n")
+
+        result = CliRunner().invoke(main, ["-t", str(tmp_path), "collect"])
+
+        assert "test_a.py::test_one" in result.output
+        assert "1 tests collected" in result.output
+        runner.assert_not_called()
+
+    def test_dynamic_files_collected_in_nuke(self, runner: MagicMock, tmp_path: Path) -> None:
+        """Test that only the files with generated tests are collected by pytest in Nuke."""
+        (tmp_path / "test_a.py").write_text("def test_one():\n    pass\n")
+        (tmp_path / "test_b.py").write_text("def pytest_generate_tests(metafunc):\n    pass\n")
+
+        def collect_in_nuke(test_path: str, _: list[str]) -> int:
+            Path(os.environ[MANIFEST_ENV_FILE]).write_text("test_b.py::test_generated[1]\n")
+            return 0
+
+        runner.return_value.execute_tests.side_effect = collect_in_nuke
+        result = CliRunner().invoke(main, ["-n", "nuke_path", "-t", str(tmp_path), "collect"])
+
+        runner.return_value.execute_tests.assert_called_once_with(str(tmp_path / "test_b.py"), ["--collect-only", "-q"])
+        assert "test_a.py::test_one\ntest_b.py::test_generated[1]\n" in result.output
+
+    def test_static_only_lists_dynamic_files(self, runner: MagicMock, tmp_path: Path) -> None:
+        """Test that dynamic files are listed instead of collected with the static-only option."""
+        (tmp_path / "test_b.py").write_text("def pytest_generate_tests(metafunc):\n    pass\n")
+
+        result = CliRunner().invoke(main, ["-t", str(tmp_path), "collect", "--static-only"])
+
+        assert str(tmp_path / "test_b.py") in result.output
+        runner.assert_not_called()
@@ -48,6 +48,7 @@ def test_load_single_runner(runner_mock: MagicMock, config_file: MagicMock) -> N
         executable_args=["-test"],
         pytest_args=["-x"],
         run_in_terminal_mode=False,
+        name="test",
     )
     assert runner["test"] is runner_mock.return_value, "Runner was not added to the output"
 
@@ -66,6 +67,7 @@ def test_load_multiple_runners(runner_mock: MagicMock, config_file: MagicMock, n
             executable_args=[name],
             pytest_args=None,
             run_in_terminal_mode=True,
+            name=name,
         )
 
 
@@ -0,0 +1,181 @@
+"""Tests for distributing tests over agents on localhost."""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import pytest
+
+from nuketesting.runner.agent import Agent
+from nuketesting.runner.coordinator import Coordinator, Shard, collect_test_files, split_into_shards
+from nuketesting.runner.report import REPORT_ENV_FILE
+
+
+class FakeRunner:
+    """Runner that reports a passed test for every test path without starting Nuke."""
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def execute_tests(self, test_path: str | Path, extra_pytest_args: Sequence[str] = ()) -> int:
+        self.calls.append([str(test_path), *extra_pytest_args])
+        with Path(os.environ[REPORT_ENV_FILE]).open("a") as report:
+            for path in [test_path, *extra_pytest_args]:
+                if str(path).endswith(".py"):
+                    result = {"nodeid": f"{path}::test", "outcome": "passed", "duration": 0.0, "message": ""}
+                    report.write(json.dumps(result) + "\n")
+        return 0
+
+
+@pytest.fixture
+def agents() -> Iterator[list[tuple[Agent, FakeRunner]]]:
+    """Two agents on localhost."""
+    started = []
+    for _ in range(2):
+        runner = FakeRunner()
+        agent = Agent(runner, port=0, heartbeat_interval=0.01)
+        threading.Thread(target=agent.serve_forever, daemon=True).start()
+        started.append((agent, runner))
+    yield started
+    for agent, _ in started:
+        agent.shutdown()
+
+
+@pytest.fixture
+def dying_agent() -> Iterator[tuple[str, int]]:
+    """Address of an agent that closes the connection as soon as it receives a shard."""
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def accept() -> None:
+        connection, _ = server.accept()
+        connection.makefile("rb").readline()
+        connection.close()
+
+    threading.Thread(target=accept, daemon=True).start()
+    yield server.getsockname()
+    server.close()
+
+
+def test_split_into_shards(tmp_path: Path) -> None:
+    """Test that files are balanced by size over the shards."""
+    for name, size in [("test_a.py", 300), ("test_b.py", 200), ("test_c.py", 100), ("c_test.py", 100)]:
+        (tmp_path / name).write_text("#" * size)
+    (tmp_path / "helper.py").write_text("")
+
+    files = collect_test_files(tmp_path)
+    shards = split_into_shards(files, count=2)
+
+    assert len(files) == 4  # noqa: PLR2004
+    assert [[Path(path).name for path in shard.paths] for shard in shards] == [
+        ["test_a.py", "test_c.py"],
+        ["test_b.py", "c_test.py"],
+    ]
+
+
+def test_split_into_shards_by_durations(tmp_path: Path) -> None:
+    """Test that durations of earlier runs are preferred over the file size."""
+    for name in ["test_a.py", "test_b.py", "test_c.py", "test_new.py"]:
+        (tmp_path / "tests" / name).parent.mkdir(exist_ok=True)
+        (tmp_path / "tests" / name).write_text("")
+    durations = {
+        "tests/test_a.py::test_one": 1.0,
+        "tests/test_b.py::test_one": 4.0,
+        "tests/test_b.py::test_two": 2.0,
+        "tests/test_c.py::test_one": 3.0,
+    }
+
+    shards = split_into_shards(collect_test_files(tmp_path), count=2, durations=durations)
+
+    assert [[Path(path).name for path in shard.paths] for shard in shards] == [
+        ["test_b.py", "test_a.py"],
+        ["test_new.py", "test_c.py"],
+    ]
+
+
+def test_split_into_shards_by_test_count(tmp_path: Path) -> None:
+    """Test that the number of tests is preferred over the file size and new tests get the average duration."""
+    files = [tmp_path / name for name in ("test_a.py", "test_b.py", "test_c.py")]
+    for file in files:
+        file.write_text("")
+    test_ids = {
+        files[0]: ["test_a.py::test_one"],
+        files[1]: ["test_b.py::test_one", "test_b.py::test_two", "test_b.py::test_three"],
+        files[2]: ["test_c.py::test_one", "test_c.py::test_two"],
+    }
+
+    shards = split_into_shards(files, count=2, test_ids=test_ids)
+    assert [[Path(path).name for path in shard.paths] for shard in shards] == [
+        ["test_b.py"],
+        ["test_c.py", "test_a.py"],
+    ]
+
+    durations = {"test_a.py::test_one": 10.0, "test_b.py::test_one": 1.0, "test_c.py::test_one": 3.0}
+    shards = split_into_shards(files, count=2, durations=durations, test_ids=test_ids)
+    assert [[Path(path).name for path in shard.paths] for shard in shards] == [
+        ["test_b.py"],
+        ["test_a.py", "test_c.py"],
+    ]
+
+
+def test_shards_run_on_all_agents(agents: list[tuple[Agent, FakeRunner]]) -> None:
+    """Test that the shards are distributed and all results are collected."""
+    shards = [Shard(index, [f"/tests/test_{index}.py", f"/tests/test_{index}b.py"]) for index in range(6)]
+    coordinator = Coordinator([agent.address for agent, _ in agents], pytest_args=["-x"], timeout=5)
+    streamed = []
+
+    run = coordinator.run(shards, on_result=streamed.append)
+
+    assert run.exit_code == 0
+    assert sorted(result.nodeid for result in run.results) == sorted(
+        f"{path}::test" for shard in shards for path in shard.paths
+    )
+    assert sorted(result.nodeid for result in streamed) == sorted(result.nodeid for result in run.results)
+    assert all(calls[-1] == "-x" for _, runner in agents for calls in runner.calls)
+    assert sum(len(runner.calls) for _, runner in agents) == len(shards)
+
+
+def test_lost_agent_work_is_dispatched_again(
+    agents: list[tuple[Agent, FakeRunner]],
+    dying_agent: tuple[str, int],
+) -> None:
+    """Test that the shard of a lost agent runs on another agent."""
+    shards = [Shard(index, [f"/tests/test_{index}.py"]) for index in range(4)]
+    coordinator = Coordinator([dying_agent, agents[0][0].address], timeout=5)
+
+    run = coordinator.run(shards)
+
+    assert run.exit_code == 0
+    assert run.lost_agents == ["{}:{}".format(*dying_agent)]
+    assert sorted(run.exit_codes) == [shard.shard_id for shard in shards]
+    assert len(run.results) == len(shards)
+
+
+def test_all_agents_lost(dying_agent: tuple[str, int]) -> None:
+    """Test that shards without any remaining agent are reported as unfinished."""
+    run = Coordinator([dying_agent], timeout=5).run([Shard(0, ["/tests/test_a.py"]), Shard(1, ["/tests/test_b.py"])])
+
+    assert run.exit_code == 1
+    assert [shard.shard_id for shard in run.unfinished] == [0, 1]
+    assert "Shard 1 was not completed" in run.get_summary()
+
+
+def test_agent_requires_token() -> None:
+    """Test that an agent with a token only runs shards of coordinators that send the token."""
+    runner = FakeRunner()
+    agent = Agent(runner, port=0, heartbeat_interval=0.01, token="secret")
+    threading.Thread(target=agent.serve_forever, daemon=True).start()
+    shards = [Shard(0, ["/tests/test_a.py"])]
+    try:
+        rejected = Coordinator([agent.address], timeout=5, token="wrong").run(shards)
+        accepted = Coordinator([agent.address], timeout=5, token="secret").run(shards)
+    finally:
+        agent.shutdown()
+
+    assert rejected.lost_agents == ["{}:{}".format(*agent.address)]
+    assert accepted.exit_code == 0
+    assert runner.calls == [["/tests/test_a.py"]]
@@ -0,0 +1,90 @@
+"""Tests for the run history database."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from nuketesting.runner.history import RunHistory, format_stats
+from nuketesting.runner.report import TestResult
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def history(tmp_path: Path) -> RunHistory:
+    """History with three runs of a stable, a slowed down and a flaky test."""
+    with RunHistory(tmp_path / "history.db") as run_history:
+        for duration, flaky_outcome in [(1.0, "passed"), (1.2, "failed"), (3.0, "passed")]:
+            run_history.record_run(
+                [
+                    TestResult("test_a.py::test_stable", duration=0.5, runner="nuke15", peak_memory=2**20),
+                    TestResult("test_a.py::test_slower", duration=duration, runner="nuke15"),
+                    TestResult("test_b.py::test_flaky", outcome=flaky_outcome, duration=0.1, runner="nuke14"),
+                    TestResult("test_b.py::test_skip", outcome="skipped", runner="nuke14"),
+                ],
+                exit_code=0,
+            )
+        yield run_history
+
+
+def test_history_persists(tmp_path: Path) -> None:
+    """Test that runs are stored in the database file."""
+    filepath = tmp_path / "sub" / "history.db"
+    with RunHistory(filepath) as history:
+        history.record_run([TestResult("test_a.py::test_one", duration=2.0)], exit_code=0)
+
+    with RunHistory(filepath) as history:
+        assert history.get_durations() == {"test_a.py::test_one": 2.0}
+
+
+def test_slowest_tests(history: RunHistory) -> None:
+    """Test that the tests are sorted by their average duration of passed runs."""
+    slowest = history.slowest_tests()
+
+    assert [test.test_id for test in slowest] == [
+        "test_a.py::test_slower",
+        "test_a.py::test_stable",
+        "test_b.py::test_flaky",
+    ]
+    assert slowest[0].duration == pytest.approx(5.2 / 3)
+    assert slowest[1].peak_memory == 2**20
+    assert slowest[2].runs == 2  # noqa: PLR2004
+
+
+def test_slowdowns(history: RunHistory) -> None:
+    """Test that the latest run is compared to the median of the earlier runs."""
+    slowdowns = history.slowdowns()
+
+    assert [slowdown.test_id for slowdown in slowdowns] == ["test_a.py::test_slower"]
+    assert slowdowns[0].previous == pytest.approx(1.1)
+    assert slowdowns[0].ratio == pytest.approx(3.0 / 1.1)
+
+
+def test_flaky_tests(history: RunHistory) -> None:
+    """Test that tests with passed and failed runs are flaky, but skipped runs are ignored."""
+    flaky = history.flaky_tests()
+
+    assert [test.test_id for test in flaky] == ["test_b.py::test_flaky"]
+    assert flaky[0].rate == pytest.approx(1 / 3)
+
+
+def test_window_and_runner_filter(history: RunHistory) -> None:
+    """Test that only the latest runs of the runner are considered."""
+    assert history.flaky_tests(window=1) == []
+    assert history.get_durations(window=1, runner="nuke15") == {
+        "test_a.py::test_stable": 0.5,
+        "test_a.py::test_slower": 3.0,
+    }
+
+
+def test_format_stats(history: RunHistory) -> None:
+    """Test that all tables are formatted."""
+    stats = format_stats(history, limit=1)
+
+    assert "Slowest tests:" in stats
+    assert "test_a.py::test_slower" in stats
+    assert "2.73x" in stats
+    assert "33%  test_b.py::test_flaky" in stats
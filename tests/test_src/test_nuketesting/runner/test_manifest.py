@@ -0,0 +1,143 @@
+"""Tests for collecting test ids without importing the test modules."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from nuketesting.runner.manifest import (
+    MANIFEST_ENV_FILE,
+    DynamicCollectionError,
+    TestManifest,
+    collect_module,
+    collect_static,
+    find_rootdir,
+    get_manifest_arguments,
+    read_manifest,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+pytest_plugins = ["pytester"]
+
+TESTS = r"""
+import pytest
+
+def test_plain():
+    pass
+
+@pytest.mark.parametrize("size", [0, -1.5, "large", None, True, b"raw"])
+def test_values(size):
+    pass
+
+@pytest.mark.parametrize("pattern", [r"\(limit 100\)", "grün", "tab\t", b"\xff", pytest.param(1, id="a\\b")])
+def test_escaped(pattern):
+    pass
+
+@pytest.mark.parametrize("text", ["", "x"], ids=["é", None])
+def test_escaped_ids(text):
+    pass
+
+@pytest.mark.parametrize(("channel", "value"), [("red", [1]), pytest.param("green", {"a": 1}, id="custom")])
+@pytest.mark.parametrize("frame", [1001, 1002], ids=["first", None])
+def test_stacked(channel, value, frame):
+    pass
+
+@pytest.mark.parametrize("mode", ["fast", "slow"])
+class TestRender:
+    def test_render(self, mode):
+        pass
+
+    class TestNested:
+        def test_nested(self, mode):
+            pass
+
+class TestWithConstructor:
+    def __init__(self):
+        pass
+
+    def test_skipped(self):
+        pass
+
+def helper():
+    pass
+"""
+
+
+def test_static_ids_match_pytest(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the statically collected ids are the ids pytest collects."""
+    manifest_file = pytester.path / "manifest.txt"
+    monkeypatch.setenv(MANIFEST_ENV_FILE, str(manifest_file))
+    test_file = pytester.makepyfile(test_manifest=TESTS)
+
+    pytester.runpytest("-p", "nuketesting.runner.manifest", "--collect-only", "-W", "ignore")
+    manifest = collect_static([test_file], pytester.path)
+
+    assert manifest.dynamic_files == []
+    assert manifest.test_ids[test_file] == read_manifest(manifest_file)
+    assert "test_manifest.py::test_stacked[first-red-value0]" in manifest.test_ids[test_file]
+    assert "test_manifest.py::test_escaped[\\\\(limit 100\\\\)]" in manifest.test_ids[test_file]
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "CASES = [1, 2]\n@pytest.mark.parametrize('case', CASES)\ndef test_case(case): ...",
+        "@pytest.mark.parametrize('case', [1], ids=str)\ndef test_case(case): ...",
+        "@pytest.mark.parametrize('case', [1, '1'])\ndef test_case(case): ...",
+        "@pytest.fixture(params=[1, 2])\ndef size(request): ...\ndef test_size(size): ...",
+        "def pytest_generate_tests(metafunc): ...\ndef test_generated(value): ...",
+        "pytestmark = pytest.mark.parametrize('case', [1])\ndef test_case(case): ...",
+        "class TestDerived(Base):\n    pass",
+    ],
+    ids=["variable", "id function", "duplicate", "fixture", "hook", "pytestmark", "base class"],
+)
+def test_dynamic_modules(source: str) -> None:
+    """Test that tests which are only known at runtime are not guessed."""
+    with pytest.raises(DynamicCollectionError):
+        collect_module(source)
+
+
+def test_collect_static_falls_back_for_dynamic_files(tmp_path: Path) -> None:
+    """Test that files are dynamic if they or a conftest of their directory generate tests."""
+    (tmp_path / "pyproject.toml").write_text("")
+    static_file = tmp_path / "tests" / "test_static.py"
+    generated_file = tmp_path / "tests" / "generated" / "test_generated.py"
+    broken_file = tmp_path / "tests" / "test_broken.py"
+    generated_file.parent.mkdir(parents=True)
+    static_file.write_text("def test_one():\n    pass\n")
+    generated_file.write_text("def test_two(value):\n    pass\n")
+    (generated_file.parent / "conftest.py").write_text("def pytest_generate_tests(metafunc):\n    pass\n")
+    broken_file.write_text("def test_three(:\n")
+
+    rootdir = find_rootdir(tmp_path / "tests")
+    manifest = collect_static([static_file, generated_file, broken_file], rootdir)
+
+    assert rootdir == tmp_path
+    assert manifest.test_ids == {static_file: ["tests/test_static.py::test_one"]}
+    assert manifest.dynamic_files == [generated_file, broken_file]
+
+
+def test_add_collected_assigns_ids_to_dynamic_files(tmp_path: Path) -> None:
+    """Test that the ids collected by pytest are assigned to the dynamic files."""
+    generated_file = tmp_path / "tests" / "test_generated.py"
+    manifest = TestManifest(dynamic_files=[generated_file, tmp_path / "tests" / "test_failed.py"])
+
+    manifest.add_collected(["tests/test_generated.py::test_two[1]", "tests/test_generated.py::test_two[2]"])
+
+    assert manifest.test_ids[generated_file] == [
+        "tests/test_generated.py::test_two[1]",
+        "tests/test_generated.py::test_two[2]",
+    ]
+    assert manifest.dynamic_files == [tmp_path / "tests" / "test_failed.py"]
+
+
+def test_manifest_arguments(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the plugin is only loaded if a manifest file is configured."""
+    monkeypatch.delenv(MANIFEST_ENV_FILE, raising=False)
+    assert get_manifest_arguments() == []
+
+    monkeypatch.setenv(MANIFEST_ENV_FILE, "manifest.txt")
+    assert get_manifest_arguments() == ["-p", "nuketesting.runner.manifest"]
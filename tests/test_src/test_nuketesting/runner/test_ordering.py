@@ -0,0 +1,112 @@
+"""Tests for running the previously failed tests first."""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from nuketesting.runner.ordering import (
+    ORDER_ENV_MODE,
+    STATE_ENV_FILE,
+    TestState,
+    get_order_info,
+    get_ordering_arguments,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+pytest_plugins = ["pytester"]
+
+TESTS = """
+import os
+
+def test_first():
+    pass
+
+def test_second():
+    assert not os.getenv("FAIL_SECOND")
+
+def test_third():
+    assert not os.getenv("FAIL_THIRD")
+"""
+
+
+@pytest.fixture
+def state_file(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """State file that is configured in the environment."""
+    filepath = pytester.path / "state" / "test_state.json"
+    monkeypatch.setenv(STATE_ENV_FILE, str(filepath))
+    pytester.makepyfile(test_order=TESTS)
+    return filepath
+
+
+def _get_executed_tests(result: pytest.RunResult) -> list[str]:
+    """Get the names of the executed tests in the order of execution."""
+    return [line.split("::")[1].split()[0] for line in result.outlines if "::test_" in line]
+
+
+def test_failed_tests_recorded(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch, state_file: Path) -> None:
+    """Test that failed tests are recorded and forgotten once they pass again."""
+    monkeypatch.setenv("FAIL_SECOND", "1")
+    monkeypatch.setenv("FAIL_THIRD", "1")
+    pytester.runpytest("-p", "nuketesting.runner.ordering")
+    assert TestState.load(state_file).failed == {"test_order.py::test_second", "test_order.py::test_third"}
+
+    monkeypatch.delenv("FAIL_THIRD")
+    pytester.runpytest("-p", "nuketesting.runner.ordering")
+
+    state = json.loads(state_file.read_text())
+    assert state["failed"] == ["test_order.py::test_second"]
+    assert state["last_run"] > 0
+
+
+def test_failed_first(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch, state_file: Path) -> None:
+    """Test that the failed tests run before all other tests."""
+    TestState({"test_order.py::test_third"}).save(state_file)
+    monkeypatch.setenv(ORDER_ENV_MODE, "failed-first")
+
+    result = pytester.runpytest("-p", "nuketesting.runner.ordering", "-v")
+
+    assert _get_executed_tests(result) == ["test_third", "test_first", "test_second"]
+    result.stdout.fnmatch_lines(["ordering: running 1 previously failed tests first"])
+
+
+def test_changed_files_first(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch, state_file: Path) -> None:
+    """Test that tests of files that changed since the last run come before unchanged files."""
+    pytester.makepyfile(test_changed="def test_changed():\n    pass\n")
+    os.utime(pytester.path / "test_order.py", (0, 0))
+    TestState({"test_order.py::test_third"}, last_run=1000.0).save(state_file)
+    monkeypatch.setenv(ORDER_ENV_MODE, "failed-first")
+
+    result = pytester.runpytest("-p", "nuketesting.runner.ordering", "-v")
+
+    assert _get_executed_tests(result) == ["test_third", "test_changed", "test_first", "test_second"]
+
+
+def test_last_failed_only(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch, state_file: Path) -> None:
+    """Test that only the failed tests run and all tests run without failures."""
+    TestState({"test_order.py::test_second"}).save(state_file)
+    monkeypatch.setenv(ORDER_ENV_MODE, "last-failed")
+
+    result = pytester.runpytest("-p", "nuketesting.runner.ordering")
+    result.assert_outcomes(passed=1, deselected=2)
+
+    result = pytester.runpytest("-p", "nuketesting.runner.ordering")
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(["ordering: no previously failed tests, running all tests"])
+
+
+def test_get_order_info(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Test that the configuration enables the plugin and invalid modes are rejected."""
+    monkeypatch.delenv(STATE_ENV_FILE, raising=False)
+    assert get_ordering_arguments() == []
+
+    monkeypatch.setenv(STATE_ENV_FILE, str(tmp_path))
+    assert get_ordering_arguments() == ["-p", "nuketesting.runner.ordering"]
+    assert get_order_info(tmp_path / "state.json") == {STATE_ENV_FILE: str(tmp_path / "state.json")}
+    with pytest.raises(ValueError, match="Unknown order mode 'random'"):
+        get_order_info(tmp_path, "random")
@@ -0,0 +1,75 @@
+"""Tests for profiling tests inside the nuke runner."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock
+
+import pytest
+
+from nuketesting.runner.profiling import (
+    PROFILE_ENV_DIR,
+    PROFILE_ENV_MODE,
+    ProfilerPlugin,
+    SamplingProfiler,
+    get_profile_info,
+    get_profiling_arguments,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _busy_wait(duration: float) -> None:
+    """Keep the current thread busy for the duration in seconds."""
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profiling_arguments_from_environment(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Test that the plugin is only loaded if profiling is configured in the environment."""
+    monkeypatch.delenv(PROFILE_ENV_MODE, raising=False)
+    assert get_profiling_arguments() == []
+
+    info = get_profile_info("sampling", tmp_path)
+    assert info == {PROFILE_ENV_MODE: "sampling", PROFILE_ENV_DIR: str(tmp_path)}
+    monkeypatch.setenv(PROFILE_ENV_MODE, "sampling")
+    assert get_profiling_arguments() == ["-p", "nuketesting.runner.profiling"]
+
+
+def test_unknown_profile_mode() -> None:
+    """Test that only supported profilers are accepted."""
+    with pytest.raises(ValueError, match="Unknown profile mode 'magic'"):
+        get_profile_info("magic", "profiles")
+
+
+def test_sampling_profiler_records_stacks(tmp_path: Path) -> None:
+    """Test that the sampling profiler records the function that keeps the thread busy."""
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    _busy_wait(0.05)
+    profiler.stop()
+
+    assert profiler.get_leaf_counts().most_common(1)[0][0].startswith("_busy_wait ")
+    profiler.save(tmp_path / "profile.collapsed")
+    stack, count = (tmp_path / "profile.collapsed").read_text().splitlines()[0].rsplit(" ", 1)
+    assert "test_sampling_profiler_records_stacks" in stack
+    assert int(count) > 0
+
+
+@pytest.mark.parametrize(("mode", "suffix"), [("cprofile", ".pstats"), ("sampling", ".collapsed")])
+def test_profiler_plugin_writes_profile_per_test(mode: str, suffix: str, tmp_path: Path) -> None:
+    """Test that each test writes its own profile and the summary contains the hottest function."""
+    plugin = ProfilerPlugin(mode, tmp_path)
+    item = MagicMock(nodeid="tests/test_blur.py::test_size[10]")
+
+    hook = plugin.pytest_runtest_call(item)
+    next(hook)
+    _busy_wait(0.05)
+    with pytest.raises(StopIteration):
+        next(hook)
+
+    assert (tmp_path / f"tests_test_blur.py_test_size_10_{suffix}").is_file()
+    assert "_busy_wait" in plugin.get_summary()
@@ -0,0 +1,73 @@
+"""Tests for the JSON lines report of test results."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from nuketesting.runner.report import REPORT_ENV_FILE, TestResult, get_report_arguments, read_results
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+pytest_plugins = ["pytester"]
+
+
+def test_report_plugin_writes_results(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that every test writes one result with the combined outcome of all phases."""
+    report_file = pytester.path / "report.jsonl"
+    monkeypatch.setenv(REPORT_ENV_FILE, str(report_file))
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.fixture
+        def broken():
+            raise RuntimeError("broken fixture")
+
+        def test_pass():
+            pass
+
+        def test_fail():
+            assert 1 == 2
+
+        @pytest.mark.skip(reason="not today")
+        def test_skip():
+            pass
+
+        def test_error(broken):
+            pass
+        """
+    )
+
+    pytester.runpytest(*get_report_arguments())
+
+    results, offset = read_results(report_file)
+    assert {result.nodeid.split("::")[-1]: result.outcome for result in results} == {
+        "test_pass": "passed",
+        "test_fail": "failed",
+        "test_skip": "skipped",
+        "test_error": "error",
+    }
+    assert "assert 1 == 2" in next(result for result in results if result.outcome == "failed").message
+    assert offset == report_file.stat().st_size
+
+
+def test_read_results_ignores_incomplete_lines(tmp_path: Path) -> None:
+    """Test that a line that is still written is read on the next call."""
+    report_file = tmp_path / "report.jsonl"
+    report_file.write_text('{"nodeid": "test_a", "outcome": "passed", "duration": 0.1, "message": ""}\n{"nodeid"')
+
+    results, offset = read_results(report_file)
+
+    assert results == [TestResult("test_a", duration=0.1)]
+    assert read_results(report_file, offset) == ([], offset)
+
+
+def test_report_arguments_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the plugin is only loaded if a report file is configured."""
+    monkeypatch.delenv(REPORT_ENV_FILE, raising=False)
+    assert get_report_arguments() == []
+    monkeypatch.setenv(REPORT_ENV_FILE, "report.jsonl")
+    assert get_report_arguments() == ["-p", "nuketesting.runner.report"]
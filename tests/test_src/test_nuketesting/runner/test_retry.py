@@ -0,0 +1,146 @@
+"""Tests for retrying failed tests in the same process."""
+
+from __future__ import annotations
+
+import sys
+import types
+
+import pytest
+
+from nuketesting.runner.retry import RETRIES_ENV, get_retry_arguments, get_retry_info
+
+pytest_plugins = ["pytester"]
+
+TESTS = """
+import pytest
+
+ATTEMPTS = {"flaky": 0, "marked": 0}
+
+@pytest.fixture(scope="module")
+def expensive():
+    ATTEMPTS.setdefault("module_setups", 0)
+    ATTEMPTS["module_setups"] += 1
+    return ATTEMPTS
+
+def test_stable(expensive):
+    pass
+
+def test_flaky(expensive):
+    ATTEMPTS["flaky"] += 1
+    assert ATTEMPTS["flaky"] == 2
+
+def test_broken(expensive):
+    assert False
+
+@pytest.mark.nuke_retries(3)
+def test_marked(expensive):
+    ATTEMPTS["marked"] += 1
+    assert ATTEMPTS["marked"] == 4
+
+@pytest.mark.nuke_retries(0)
+def test_no_retry(expensive):
+    assert False
+
+def test_module_fixture_set_up_again(expensive):
+    assert expensive["module_setups"] > 1
+"""
+
+NODE_TESTS = """
+import nuke
+import pytest
+
+ATTEMPTS = []
+
+@pytest.fixture(scope="module")
+def constant():
+    return nuke.createNode("Constant")
+
+def test_flaky_render(constant):
+    ATTEMPTS.append(constant)
+    assert constant.alive
+    assert len(ATTEMPTS) == 2
+"""
+
+
+class FakeNode:
+    """Node that is removed by clearing the script."""
+
+    def __init__(self):
+        self.alive = True
+
+
+class FakeNuke(types.ModuleType):
+    """Stand-in for the nuke module that removes all created nodes on `scriptClear`."""
+
+    def __init__(self):
+        super().__init__("nuke")
+        self.created: list[FakeNode] = []
+
+    def createNode(self, node_class: str) -> FakeNode:  # noqa: N802
+        self.created.append(FakeNode())
+        return self.created[-1]
+
+    def scriptClear(self) -> None:  # noqa: N802
+        for node in self.created:
+            node.alive = False
+
+    def clearRAMCache(self) -> None:  # noqa: N802
+        pass
+
+
+def test_failed_tests_retried(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that failed tests run again and are reported as flaky or failed."""
+    monkeypatch.setenv(RETRIES_ENV, "1")
+    pytester.makepyfile(test_retry=TESTS)
+
+    result = pytester.runpytest("-p", "nuketesting.runner.retry")
+
+    result.assert_outcomes(passed=2, failed=2)
+    assert result.parseoutcomes()["flaky"] == 2  # noqa: PLR2004
+    result.stdout.fnmatch_lines(
+        [
+            "*retries*",
+            "FLAKY test_retry.py::test_flaky (passed on attempt 2)",
+            "FLAKY test_retry.py::test_marked (passed on attempt 4)",
+            "FAILED test_retry.py::test_broken (failed all 2 attempts)",
+        ]
+    )
+    result.stdout.no_fnmatch_line("*test_no_retry (failed all*")
+
+
+def test_module_fixture_recreated_after_clearing_the_script(
+    pytester: pytest.Pytester,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a retry gets new nodes from module fixtures instead of the removed ones."""
+    monkeypatch.setenv(RETRIES_ENV, "1")
+    monkeypatch.setitem(sys.modules, "nuke", FakeNuke())
+    pytester.makepyfile(test_retry=NODE_TESTS)
+
+    result = pytester.runpytest_inprocess("-p", "nuketesting.runner.retry")
+
+    assert result.parseoutcomes()["flaky"] == 1
+    result.stdout.fnmatch_lines(["FLAKY test_retry.py::test_flaky_render (passed on attempt 2)"])
+
+
+def test_marker_without_retries(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the marker enables retries if no retries are configured."""
+    monkeypatch.setenv(RETRIES_ENV, "0")
+    pytester.makepyfile(test_retry=TESTS)
+
+    result = pytester.runpytest("-p", "nuketesting.runner.retry", "-k", "marked or flaky")
+
+    result.assert_outcomes(failed=1)
+    assert result.parseoutcomes()["flaky"] == 1
+
+
+def test_get_retry_info(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the configuration enables the plugin and negative retries are rejected."""
+    monkeypatch.delenv(RETRIES_ENV, raising=False)
+    assert get_retry_arguments() == []
+
+    monkeypatch.setenv(RETRIES_ENV, "0")
+    assert get_retry_arguments() == ["-p", "nuketesting.runner.retry"]
+    assert get_retry_info(2) == {RETRIES_ENV: "2"}
+    with pytest.raises(ValueError, match="can't be negative"):
+        get_retry_info(-1)
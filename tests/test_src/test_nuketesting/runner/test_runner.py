@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+import os
 import re
+import sys
 from pathlib import Path
 from typing import NamedTuple
 from unittest.mock import ANY, MagicMock, patch
 
 import pytest
 
-from nuketesting.datamodel.constants import RUN_TESTS_SCRIPT
+from nuketesting.datamodel.constants import RUN_TESTS_SCRIPT, RUNNER_NAME_ENV
 from nuketesting.runner.runner import Runner, RunnerException
 
 # ruff: noqa: SLF001
@@ -208,3 +210,39 @@ def test__clean_executable_args(test_args: list[str], expected_args: list[str])
     runner = Runner(nuke_executable="", executable_args=test_args)
 
     assert runner._executable_args == expected_args
+
+
+@patch.object(Runner, "_check_nuke_executable", MagicMock())
+@patch("subprocess.check_call")
+def test_runner_name_environment(process_mock: MagicMock) -> None:
+    """Test that the runner name is forwarded to the Nuke process."""
+    runner = Runner(nuke_executable="nuke", name="nuke15")
+
+    with patch(
+        "nuketesting.runner.runner.Runner._get_packages_directory",
+        return_value="test_packages",
+    ):
+        runner.execute_tests("")
+
+    assert process_mock.call_args[1]["env"][RUNNER_NAME_ENV] == "nuke15"
+
+
+@pytest.mark.parametrize("previous_name", [None, "other"])
+@patch.object(Runner, "_check_nuke_executable", MagicMock())
+@patch.object(Runner, "_find_nuke_python_package", MagicMock(return_value=Path("nuke_python")))
+def test_runner_name_environment_native(monkeypatch: pytest.MonkeyPatch, previous_name: str | None) -> None:
+    """Test that the runner name is only set while the tests run in the current interpreter."""
+    monkeypatch.setitem(sys.modules, "nuke", MagicMock())
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    if previous_name is None:
+        monkeypatch.delenv(RUNNER_NAME_ENV, raising=False)
+    else:
+        monkeypatch.setenv(RUNNER_NAME_ENV, previous_name)
+    runner = Runner(nuke_executable="nuke", run_in_terminal_mode=False, name="nuke15")
+    names = []
+
+    with patch("nuketesting.runner.runner.pytest.main", lambda _: names.append(os.getenv(RUNNER_NAME_ENV)) or 0):
+        assert runner.execute_tests("") == 0
+
+    assert names == ["nuke15"]
+    assert os.getenv(RUNNER_NAME_ENV) == previous_name